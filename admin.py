@@ -0,0 +1,117 @@
+# Hidden admin page with instrumentation metrics
+import json
+import os
+import streamlit as st
+from instrumentation import METRICS_ENABLED, prometheus_text, reset_metrics, snapshot
+
+# Usernames allowed to open the page via ``?admin=metrics``.
+METRICS_ADMIN_USERS = frozenset(
+    name.strip()
+    for name in os.getenv("METRICS_ADMIN_USERS", "").split(",")
+    if name.strip()
+)
+
+
+def is_metrics_admin(user) -> bool:
+    return bool(user) and user in METRICS_ADMIN_USERS
+
+
+def metrics_admin_page():
+    st.title("Performance Metrics")
+    _instrumentation_metrics()
+    _process_stats()
+
+
+def _process_stats():
+    # Always-on counters kept by the modules themselves, since process start.
+    from llm_client import client_stats
+    from llm_response import parse_stats
+    from prompt_builder import prompt_stats
+
+    st.markdown("### LLM clients")
+    st.caption("Clients built versus served warm from the shared pool.")
+    st.dataframe([client_stats()], width="stretch", hide_index=True)
+    _stats_table(
+        "Prompts",
+        "Estimated prompt tokens; tokens saved versus indented JSON are only "
+        "measured with METRICS_ENABLED=1.",
+        prompt_stats(),
+    )
+    _stats_table(
+        "LLM responses",
+        "How replies were parsed: cleanly, after repair, failed or retried.",
+        parse_stats(),
+    )
+
+
+def _stats_table(title: str, caption: str, stats: dict):
+    """Render ``{kind: {name: value}}`` stats as one row per kind."""
+    st.markdown(f"### {title}")
+    if not stats:
+        st.caption("No samples recorded yet.")
+        return
+    st.caption(caption)
+    st.dataframe(
+        [{"kind": kind, **values} for kind, values in sorted(stats.items())],
+        width="stretch",
+        hide_index=True,
+    )
+
+
+def _instrumentation_metrics():
+    if not METRICS_ENABLED:
+        st.info("Instrumentation is off. Start the app with METRICS_ENABLED=1.")
+        return
+    data = snapshot()
+    if not data["histograms"] and not data["counters"]:
+        st.caption("No samples recorded yet.")
+        return
+
+    rows = [
+        {
+            "metric": h["name"],
+            "labels": ", ".join(f"{k}={v}" for k, v in h["labels"].items()),
+            "count": h["count"],
+            "total ms": round(h["sum"] * 1000, 2),
+            "mean ms": round(h["sum"] / h["count"] * 1000, 3),
+            "p50 ms ≤": round(h["p50"] * 1000, 3),
+            "p95 ms ≤": round(h["p95"] * 1000, 3),
+            "max ms": round(h["max"] * 1000, 3),
+        }
+        for h in data["histograms"]
+    ]
+    # Slowest overall first: where the time actually goes.
+    rows.sort(key=lambda row: row["total ms"], reverse=True)
+    st.markdown("### Timings")
+    st.dataframe(rows, width="stretch", hide_index=True)
+    if data["counters"]:
+        st.markdown("### Counters")
+        st.dataframe(
+            [
+                {
+                    "metric": c["name"],
+                    "labels": ", ".join(f"{k}={v}" for k, v in c["labels"].items()),
+                    "value": c["value"],
+                }
+                for c in data["counters"]
+            ],
+            width="stretch",
+            hide_index=True,
+        )
+
+    text = prometheus_text()
+    col1, col2, col3 = st.columns(3)
+    col1.download_button(
+        "Download Prometheus text", text, "metrics.prom", mime="text/plain"
+    )
+    col2.download_button(
+        "Download JSON",
+        json.dumps(data, indent=2),
+        "metrics.json",
+        mime="application/json",
+    )
+    if col3.button("Reset metrics"):
+        reset_metrics()
+        st.rerun()
+    with st.expander("Prometheus text"):
+        st.code(text, language="text")
@@ -1,36 +1,55 @@
 # Main entry point for Streamlit app
+import importlib
 import streamlit as st
+from admin import is_metrics_admin, metrics_admin_page
 from auth import login_page, logout, get_current_user
-from resume_builder import resume_builder_page
-from resume_adapter import resume_adapter_page
-from resume_enhancer import resume_enhancer_page
-from resume_export_pdf import resume_export_pdf_page
+from instrumentation import timed
+from utils import init_db
 
-# Sidebar navigation
+# Sidebar navigation: page name -> (module, function). Page modules are
+# imported on first navigation, so a session that only logs in never loads
+# the LLM client or ReportLab.
 PAGES = {
-    "Login/Logout": login_page,
-    "Resume Builder": resume_builder_page,
-    "Job Adaptation": resume_adapter_page,
-    "Resume Enhancer": resume_enhancer_page,
-    "Export PDF": resume_export_pdf_page,
+    "Login/Logout": ("auth", "login_page"),
+    "Resume Builder": ("resume_builder", "resume_builder_page"),
+    "Job Adaptation": ("resume_adapter", "resume_adapter_page"),
+    "Resume Enhancer": ("resume_enhancer", "resume_enhancer_page"),
+    "Export PDF": ("resume_export_pdf", "resume_export_pdf_page"),
 }
 
 
+def load_page(name: str):
+    """Import the module behind page ``name`` (once per process) and return
+    its page function."""
+    module_name, function_name = PAGES[name]
+    with timed("page_import_seconds", page=name):
+        module = importlib.import_module(module_name)
+    return getattr(module, function_name)
+
+
 def main():
+    # Schemas are bootstrapped once per process; later reruns are a no-op.
+    init_db()
     st.sidebar.title("Navigation")
     selection = st.sidebar.radio("Go to", list(PAGES.keys()))
     user = get_current_user()
-    if selection == "Login/Logout":
-        login_page()
-        if user:
-            if st.sidebar.button("Logout"):
-                logout()
-    else:
-        if not user:
-            st.warning("Please log in to access this feature.")
+    if st.query_params.get("admin") == "metrics" and is_metrics_admin(user):
+        # Hidden page: not in the navigation, only for configured admins.
+        with timed("page_render_seconds", page="Metrics"):
+            metrics_admin_page()
+        return
+    with timed("page_render_seconds", page=selection):
+        if selection == "Login/Logout":
             login_page()
+            if user:
+                if st.sidebar.button("Logout"):
+                    logout()
         else:
-            PAGES[selection]()
+            if not user:
+                st.warning("Please log in to access this feature.")
+                login_page()
+            else:
+                load_page(selection)()
 
 
 if __name__ == "__main__":
@@ -1,37 +1,90 @@
 # User authentication logic
-import bcrypt
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-from utils import get_db_connection
+from utils import get_db_connection, register_schema
 
 DB_PATH = "db/users.db"
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", str(7 * 24 * 3600)))
+# The browser keeps its session token in this cookie.
+SESSION_COOKIE_NAME = os.getenv("SESSION_COOKIE_NAME", "resume_session")
+# bcrypt is deliberately slow; cap how many hashes run at once.
+AUTH_BCRYPT_WORKERS = int(os.getenv("AUTH_BCRYPT_WORKERS", "0")) or min(
+    4, os.cpu_count() or 1
+)
+
+register_schema(
+    DB_PATH,
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        password BLOB NOT NULL
+    );
+    -- Only a hash of each token is stored, so a leaked DB cannot log anyone in.
+    CREATE TABLE IF NOT EXISTS sessions (
+        token_hash TEXT PRIMARY KEY,
+        username TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at);
+    """,
+)
+
+_bcrypt_executor = None
+_bcrypt_lock = threading.Lock()
 
 # Helper functions for password hashing
 
 
 def hash_password(password: str) -> bytes:
+    import bcrypt
+
     return bcrypt.hashpw(password.encode(), bcrypt.gensalt())
 
 
 def check_password(password: str, hashed: bytes) -> bool:
+    import bcrypt
+
     return bcrypt.checkpw(password.encode(), hashed)
 
 
+def _run_bcrypt(func, *args):
+    """Run a bcrypt helper on the bounded worker pool and wait for it.
+
+    Keeps bcrypt off Streamlit's script threads and limits how many hashes
+    compete for CPU when many users log in at once.
+    """
+    global _bcrypt_executor
+    with _bcrypt_lock:
+        if _bcrypt_executor is None:
+            _bcrypt_executor = ThreadPoolExecutor(
+                max_workers=AUTH_BCRYPT_WORKERS, thread_name_prefix="bcrypt"
+            )
+    return _bcrypt_executor.submit(func, *args).result()
+
+
 # Database functions
 
 
 def create_user(username: str, password: str) -> bool:
     conn = get_db_connection(DB_PATH)
     c = conn.cursor()
-    c.execute("SELECT * FROM users WHERE username=?", (username,))
+    c.execute("SELECT 1 FROM users WHERE username=?", (username,))
     if c.fetchone():
         return False
-    hashed = hash_password(password)
-    c.execute(
-        "INSERT INTO users (username, password) VALUES (?, ?)", (username, hashed)
-    )
-    conn.commit()
-    conn.close()
-    return True
+    hashed = _run_bcrypt(hash_password, password)
+    with conn:
+        c.execute(
+            "INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)",
+            (username, hashed),
+        )
+    return c.rowcount == 1
 
 
 def authenticate_user(username: str, password: str) -> bool:
@@ -39,15 +92,68 @@ def authenticate_user(username: str, password: str) -> bool:
     c = conn.cursor()
     c.execute("SELECT password FROM users WHERE username=?", (username,))
     row = c.fetchone()
-    conn.close()
-    if row and check_password(password, row[0]):
+    if row and _run_bcrypt(check_password, password, row[0]):
         return True
     return False
 
 
+# Server-side login sessions
+
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def create_session(username: str) -> str:
+    """Start a login session for ``username`` and return its secret token."""
+    token = secrets.token_urlsafe(32)
+    now = time.time()
+    conn = get_db_connection(DB_PATH)
+    with conn:
+        conn.execute("DELETE FROM sessions WHERE expires_at<=?", (now,))
+        conn.execute(
+            "INSERT INTO sessions (token_hash, username, created_at, expires_at) "
+            "VALUES (?, ?, ?, ?)",
+            (_token_hash(token), username, now, now + SESSION_TTL_SECONDS),
+        )
+    return token
+
+
+def resolve_session(token: str):
+    """Return the user of an unexpired session ``token``, or None."""
+    if not token:
+        return None
+    conn = get_db_connection(DB_PATH)
+    row = conn.execute(
+        "SELECT username FROM sessions WHERE token_hash=? AND expires_at>?",
+        (_token_hash(token), time.time()),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def revoke_session(token: str):
+    conn = get_db_connection(DB_PATH)
+    with conn:
+        conn.execute("DELETE FROM sessions WHERE token_hash=?", (_token_hash(token),))
+
+
 # Streamlit session management
 
 
+def _set_session_cookie(token: str, max_age: float):
+    # Streamlit cannot set cookies from the server, so a script sets it in the
+    # page; st.context.cookies reads it on the next connection.
+    cookie = (
+        f"{SESSION_COOKIE_NAME}={token}; Max-Age={int(max_age)}; "
+        "Path=/; SameSite=Strict"
+    )
+    st.html(
+        f"<script>document.cookie = {json.dumps(cookie)} + "
+        "(location.protocol === 'https:' ? '; Secure' : '');</script>",
+        unsafe_allow_javascript=True,
+    )
+
+
 def login_page():
     st.title("Login / Signup")
     mode = st.radio("Select mode", ["Login", "Sign Up"])
@@ -61,16 +167,34 @@ def login_page():
                 st.error("Username already exists.")
         else:
             if authenticate_user(username, password):
+                token = create_session(username)
                 st.session_state["user"] = username
+                st.session_state["session_token"] = token
+                # Keeps the login across refreshes and reconnects.
+                _set_session_cookie(token, SESSION_TTL_SECONDS)
                 st.success("Logged in!")
             else:
                 st.error("Invalid credentials.")
 
 
 def get_current_user():
-    return st.session_state.get("user")
+    user = st.session_state.get("user")
+    if user:
+        return user
+    # A new websocket session: restore the login from the session token
+    # instead of asking for the password (and paying for bcrypt) again.
+    token = st.context.cookies.get(SESSION_COOKIE_NAME)
+    user = resolve_session(token) if isinstance(token, str) else None
+    if user:
+        st.session_state["user"] = user
+        st.session_state["session_token"] = token
+    return user
 
 
 def logout():
+    token = st.session_state.pop("session_token", None)
+    if token:
+        revoke_session(token)
+    _set_session_cookie("", 0)
     st.session_state.pop("user", None)
     st.success("Logged out.")
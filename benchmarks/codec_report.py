@@ -0,0 +1,181 @@
+"""Codec report: database size and encode/decode throughput per blob codec.
+
+Run from the repository root::
+
+    python benchmarks/codec_report.py
+    python benchmarks/codec_report.py --resumes 2000 --output codecs.json
+
+Each available codec (see ``resume_storage.CODECS``) is measured in a fresh
+interpreter with its own temporary database: the resumes are saved with the
+plain ``json`` codec, re-encoded with ``migrate_blobs()`` as an existing
+database would be, and the vacuumed file size and ``load_resumes`` time are
+recorded. Encode/decode throughput is measured on the distinct sections in
+memory and reported in MB/s of compact JSON; encoding includes the
+``json.dumps`` that every save performs to hash a section.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from run_benchmarks import sample_resume  # noqa: E402
+
+USER = "codec_bench"
+
+
+def corpus(count: int) -> dict:
+    """``count`` resumes of varying size, sharing some sections like real ones."""
+    return {
+        f"resume_{i}": sample_resume(i, entries=1 + i % 8, bullets=1 + i % 5)
+        for i in range(count)
+    }
+
+
+def _best(func, repeat: int, setup=None) -> float:
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure_codec(codec_name: str, count: int, repeat: int) -> dict:
+    """Run inside a worker process whose working directory is a temp dir."""
+    import resume_storage
+    from utils import close_db_connections
+
+    codec = resume_storage.CODECS[codec_name]
+    resumes = corpus(count)
+    sections = {}
+    for resume in resumes.values():
+        for value in resume.values():
+            sections.setdefault(resume_storage._dumps(value), value)
+    json_bytes = sum(len(text.encode("utf-8")) for text in sections)
+    values = list(sections.values())
+    dumps = resume_storage._dumps
+    encoded = [codec.encode(value, dumps(value)) for value in values]
+    # Includes the JSON text every save computes to hash a section.
+    encode_s = _best(
+        lambda: [codec.encode(value, dumps(value)) for value in values], repeat
+    )
+    decode_s = _best(lambda: [codec.decode(data) for data in encoded], repeat)
+
+    resume_storage.RESUME_CODEC = "json"
+    resume_storage.save_resumes(USER, resumes)
+    start = time.perf_counter()
+    resume_storage.migrate_blobs(codec_name)
+    migrate_s = time.perf_counter() - start
+    # Decoding is what differs between codecs, so bypass the resume cache.
+    load_s = _best(
+        lambda: resume_storage.load_resumes(USER),
+        repeat,
+        setup=resume_storage.clear_resume_cache,
+    )
+    conn = resume_storage.get_db_connection(resume_storage.DB_PATH)
+    blobs, stored_bytes = conn.execute(
+        "SELECT count(*), sum(length(data)) FROM resume_blobs"
+    ).fetchone()
+    close_db_connections()
+
+    db = sqlite3.connect(resume_storage.DB_PATH)
+    db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    db.execute("VACUUM")
+    db.close()
+    return {
+        "codec": codec_name,
+        "resumes": count,
+        "blobs": blobs,
+        "json_bytes": json_bytes,
+        "stored_bytes": stored_bytes,
+        "db_bytes": os.path.getsize(resume_storage.DB_PATH),
+        "encode_mb_s": json_bytes / encode_s / 1e6,
+        "decode_mb_s": json_bytes / decode_s / 1e6,
+        "migrate_seconds": migrate_s,
+        "load_resumes_ms": load_s * 1000,
+    }
+
+
+def run_worker(codec_name: str, count: int, repeat: int) -> dict:
+    env = dict(os.environ, RESUME_CODEC_MIGRATE="0", METRICS_ENABLED="0")
+    with tempfile.TemporaryDirectory(prefix="resume-codec-") as workdir:
+        output = subprocess.run(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--worker",
+                codec_name,
+                "--resumes",
+                str(count),
+                "--repeat",
+                str(repeat),
+            ],
+            cwd=workdir,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def print_report(results):
+    out = sys.stderr
+    header = (
+        f"{'codec':<14} {'stored':>10} {'db file':>10} {'encode':>11} "
+        f"{'decode':>11} {'migrate':>9} {'load_resumes':>13}"
+    )
+    print(header, file=out)
+    for row in results:
+        print(
+            f"{row['codec']:<14} {row['stored_bytes'] / 1024:8.0f}KB "
+            f"{row['db_bytes'] / 1024:8.0f}KB {row['encode_mb_s']:7.1f}MB/s "
+            f"{row['decode_mb_s']:7.1f}MB/s {row['migrate_seconds']:8.2f}s "
+            f"{row['load_resumes_ms']:10.1f}ms",
+            file=out,
+        )
+    if results:
+        print(
+            f"\n{results[0]['resumes']} resumes, {results[0]['blobs']} distinct "
+            f"sections, {results[0]['json_bytes'] / 1024:.0f}KB of compact JSON",
+            file=out,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=1000, help="resumes saved")
+    parser.add_argument("--repeat", type=int, default=5, help="best-of runs")
+    parser.add_argument("--codec", action="append", help="only these codecs")
+    parser.add_argument("--output", help="also write the report as JSON")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(measure_codec(args.worker, args.resumes, args.repeat)))
+        return
+
+    from resume_storage import CODECS
+
+    results = [
+        run_worker(name, args.resumes, args.repeat) for name in args.codec or CODECS
+    ]
+    print_report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# Stand-in chat model for exercising the LLM code paths without Groq
+import json
+import re
+import time
+
+
+class FakeMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeChatModel:
+    """Minimal ``invoke``/``stream`` chat model with configurable latency.
+
+    The reply echoes the JSON embedded in the prompt (with every string value
+    suffixed by ``" (rewritten)"``) plus a ``feedback`` field, after waiting
+    ``latency`` seconds for the first token and ``per_token`` per token.
+    """
+
+    def __init__(self, latency: float = 0.0, per_token: float = 0.0):
+        self.latency = latency
+        self.per_token = per_token
+        self.calls = 0
+
+    def _reply(self, prompt: str) -> str:
+        self.calls += 1
+        return fake_reply(prompt)
+
+    def invoke(self, prompt: str, **kwargs) -> FakeMessage:
+        reply = self._reply(prompt)
+        time.sleep(self.latency + self.per_token * len(reply) / 4)
+        return FakeMessage(reply)
+
+    def stream(self, prompt: str):
+        reply = self._reply(prompt)
+        time.sleep(self.latency)
+        for i in range(0, len(reply), 16):
+            time.sleep(self.per_token * 4)
+            yield FakeMessage(reply[i : i + 16])
+
+
+def fake_reply(prompt: str) -> str:
+    """The templated JSON answer to ``prompt`` (see ``FakeChatModel``)."""
+    match = re.search(r"^\{.*\}$", prompt, re.MULTILINE)
+    data = json.loads(match.group(0)) if match else {}
+    data = _rewrite(data)
+    data["feedback"] = "Quantify more achievements."
+    return json.dumps(data)
+
+
+def _rewrite(value):
+    if isinstance(value, dict):
+        return {k: _rewrite(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_rewrite(v) for v in value]
+    if isinstance(value, str):
+        return value + " (rewritten)"
+    return value
@@ -0,0 +1,350 @@
+"""Local stand-in for the Groq chat-completions API, for offline load tests.
+
+Start it and point the app (or the benchmarks) at it::
+
+    python benchmarks/fake_llm_server.py --port 8765 --latency 0.3 --tps 200
+    GROQ_API_BASE=http://127.0.0.1:8765 GROQ_API_KEY=fake streamlit run app.py
+
+Replies are templated from the prompt like ``FakeChatModel`` (the resume JSON
+echoed back with rewritten strings plus ``feedback``), or taken in turn from
+a ``--script`` JSON file. Each script entry is either the reply text or an
+object with optional ``content``, ``status`` and ``latency`` keys, so error
+sequences can be replayed exactly. Like Groq, streamed requests in JSON mode
+are rejected with HTTP 400. ``GET /stats`` returns request counters.
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_llm import fake_reply  # noqa: E402
+
+CHARS_PER_TOKEN = 4
+
+
+class FakeLLMConfig:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        tokens_per_second: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        script=None,
+        seed=None,
+    ):
+        self.latency = latency
+        # 0 means "no throttling": the whole reply is sent at once.
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.script = itertools.cycle(script) if script else None
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "completed": 0,
+            "streamed": 0,
+            "errors": 0,
+            "rate_limited": 0,
+            "in_flight": 0,
+            "max_in_flight": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        }
+
+    def count(self, **deltas):
+        with self.lock:
+            for name, delta in deltas.items():
+                self.stats[name] += delta
+            self.stats["max_in_flight"] = max(
+                self.stats["max_in_flight"], self.stats["in_flight"]
+            )
+
+    def next_reply(self, prompt: str) -> dict:
+        """Return ``{"status", "content", "latency"}`` for the next request."""
+        with self.lock:
+            entry = next(self.script) if self.script else None
+            roll = self.random.random()
+        if isinstance(entry, str):
+            entry = {"content": entry}
+        reply = {"status": 200, "latency": self.latency, **(entry or {})}
+        if reply["status"] == 200:
+            if roll < self.rate_limit_rate:
+                reply["status"] = 429
+            elif roll < self.rate_limit_rate + self.error_rate:
+                reply["status"] = 500
+        if reply["status"] == 200 and "content" not in reply:
+            reply["content"] = fake_reply(prompt)
+        return reply
+
+
+def _tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def _prompt_text(body: dict) -> str:
+    parts = []
+    for message in body.get("messages") or []:
+        content = message.get("content")
+        if isinstance(content, list):
+            content = "".join(p.get("text", "") for p in content if isinstance(p, dict))
+        parts.append(content or "")
+    return "\n".join(parts)
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; without this, Nagle's algorithm
+    # and delayed ACKs add ~40 ms to every keep-alive response.
+    disable_nagle_algorithm = True
+    config: FakeLLMConfig  # set on the subclass built by make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            with self.config.lock:
+                stats = dict(self.config.stats)
+            self._send_json(200, stats)
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+
+        response_format = body.get("response_format") or {}
+        if body.get("stream") and response_format.get("type") in (
+            "json_object",
+            "json_schema",
+        ):
+            # Groq rejects this combination, so the fake server does too.
+            self.config.count(requests=1, errors=1)
+            self._send_json(
+                400,
+                {
+                    "error": {
+                        "message": "response_format does not support streaming",
+                        "type": "invalid_request_error",
+                    }
+                },
+            )
+            return
+
+        config = self.config
+        prompt = _prompt_text(body)
+        reply = config.next_reply(prompt)
+        config.count(requests=1, in_flight=1)
+        try:
+            time.sleep(reply["latency"])
+            if reply["status"] == 429:
+                config.count(rate_limited=1)
+                self._send_json(
+                    429,
+                    {
+                        "error": {
+                            "message": "Rate limit reached (fake server).",
+                            "type": "tokens",
+                            "code": "rate_limit_exceeded",
+                        }
+                    },
+                    {"Retry-After": f"{config.retry_after:g}"},
+                )
+            elif reply["status"] != 200:
+                config.count(errors=1)
+                self._send_json(
+                    reply["status"],
+                    {
+                        "error": {
+                            "message": "Injected failure (fake server).",
+                            "type": "internal_server_error",
+                        }
+                    },
+                )
+            elif body.get("stream"):
+                self._stream(body, prompt, reply["content"])
+            else:
+                self._complete(body, prompt, reply["content"])
+        finally:
+            config.count(in_flight=-1)
+
+    def _usage(self, prompt: str, content: str) -> dict:
+        prompt_tokens, completion_tokens = _tokens(prompt), _tokens(content)
+        self.config.count(
+            completed=1,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def _complete(self, body: dict, prompt: str, content: str):
+        if self.config.tokens_per_second:
+            time.sleep(_tokens(content) / self.config.tokens_per_second)
+        self._send_json(
+            200,
+            {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": self._usage(prompt, content),
+            },
+        )
+
+    def _stream(self, body: dict, prompt: str, content: str):
+        self.config.count(streamed=1)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        def event(delta, finish_reason=None, **extra):
+            payload = {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body.get("model", "fake"),
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+                **extra,
+            }
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+            self.wfile.flush()
+
+        tps = self.config.tokens_per_second
+        event({"role": "assistant", "content": ""})
+        for i in range(0, len(content), CHARS_PER_TOKEN):
+            if tps:
+                time.sleep(1 / tps)
+            event({"content": content[i : i + CHARS_PER_TOKEN]})
+        event({}, "stop", x_groq={"usage": self._usage(prompt, content)})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def make_server(config: FakeLLMConfig, host: str = "127.0.0.1", port: int = 0):
+    """Build (but do not start) a server; ``port=0`` picks a free port."""
+    handler = type("Handler", (FakeLLMHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(config: FakeLLMConfig, host: str = "127.0.0.1", port: int = 0):
+    """Serve in a daemon thread; return ``(server, base_url)``.
+
+    Call ``server.shutdown()`` when done.
+    """
+    server = make_server(config, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="time to first token (s)"
+    )
+    parser.add_argument(
+        "--tps",
+        type=float,
+        default=0.0,
+        help="completion tokens per second per request (0 = unthrottled)",
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="fraction of HTTP 500 replies"
+    )
+    parser.add_argument(
+        "--rate-limit-rate",
+        type=float,
+        default=0.0,
+        help="fraction of HTTP 429 replies",
+    )
+    parser.add_argument(
+        "--retry-after",
+        type=float,
+        default=1.0,
+        help="Retry-After seconds sent with 429 replies",
+    )
+    parser.add_argument("--script", help="JSON file with a list of replies to cycle")
+    parser.add_argument("--seed", type=int, help="seed for error injection")
+    args = parser.parse_args(argv)
+
+    script = None
+    if args.script:
+        with open(args.script) as f:
+            script = json.load(f)
+    config = FakeLLMConfig(
+        latency=args.latency,
+        tokens_per_second=args.tps,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        script=script,
+        seed=args.seed,
+    )
+    server = make_server(config, args.host, args.port)
+    print(
+        f"Fake Groq API on http://{args.host}:{server.server_address[1]} "
+        "(set GROQ_API_BASE to this URL)",
+        file=sys.stderr,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,476 @@
+"""Benchmark suite for storage, PDF rendering, auth and the LLM pipeline.
+
+Run from the repository root::
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --quick --compare bench.json
+
+Every benchmark runs against throw-away databases in a temporary directory,
+and the LLM benchmarks use ``FakeChatModel`` instead of Groq. Results are
+written as JSON so runs from different commits can be compared.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_llm import FakeChatModel  # noqa: E402
+
+GROUPS = ("storage", "pdf", "auth", "llm")
+
+
+def sample_resume(i: int = 0, entries: int = 3, bullets: int = 3) -> dict:
+    """A realistic resume; ``entries``/``bullets`` scale its size."""
+    return {
+        "contact": {
+            "full_name": f"Candidate {i}",
+            "phone": "+1 555 0100",
+            "email": f"candidate{i}@example.com",
+            "location": "Berlin, Germany",
+            "linkedin": "https://linkedin.com/in/example",
+            "github": "https://github.com/example",
+        },
+        "summary": "Backend engineer focused on data-intensive systems. " * 3,
+        "experience": [
+            {
+                "company": f"Company {j}",
+                "title": "Senior Software Engineer",
+                "bullets": [
+                    f"Reduced p95 latency of service {k} by {10 + k}% via caching"
+                    for k in range(bullets)
+                ],
+                "start": "2019",
+                "end": "Present" if j == 0 else "2021",
+                "present": j == 0,
+                "tech_stack": "Python, PostgreSQL, Kafka, Kubernetes",
+            }
+            for j in range(entries)
+        ],
+        "education": [
+            {
+                "school": "TU Munich",
+                "degree": "MSc",
+                "field": "Computer Science",
+                "start": "2014",
+                "end": "2016",
+            }
+        ],
+        "projects": [
+            {
+                "title": f"Project {j}",
+                "bullets": ["Built an open-source profiler" for _ in range(bullets)],
+                "start": "2020",
+                "end": "2021",
+                "tech_stack": "Rust",
+            }
+            for j in range(max(1, entries // 2))
+        ],
+        "skills": "Python, Go, Rust, SQL, Distributed Systems",
+        "certificates": [{"name": "AWS SA Pro", "issuer": "AWS", "date": "2022"}],
+        "publications": [],
+    }
+
+
+class Recorder:
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.results = []
+
+    def measure(self, name: str, func, params=None, repeat=None, setup=None):
+        """Time ``func()`` ``repeat`` times (after ``setup()`` each time)."""
+        timings = []
+        for _ in range(repeat or self.repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        self.add(name, timings, params)
+
+    def add(self, name: str, timings, params=None):
+        timings = sorted(timings)
+        result = {
+            "name": name,
+            "params": params or {},
+            "runs": len(timings),
+            "mean_s": statistics.fmean(timings),
+            "median_s": statistics.median(timings),
+            "p95_s": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+            "min_s": timings[0],
+        }
+        self.results.append(result)
+        label = " ".join(f"{k}={v}" for k, v in result["params"].items())
+        print(
+            f"{name:<32} {label:<28} median {result['median_s'] * 1000:10.3f} ms",
+            file=sys.stderr,
+        )
+
+
+def bench_storage(rec: Recorder, sizes):
+    import resume_storage
+    from utils import validate_resume_name
+
+    for n in sizes:
+        user = f"bench_{n}"
+        # Distinct resumes of varying size (sharing some sections, like real
+        # ones), so saves keep writing new blobs instead of only references.
+        resumes = [
+            sample_resume(i, entries=1 + i % 8, bullets=1 + i % 5) for i in range(n)
+        ]
+        timings = []
+        for i, resume in enumerate(resumes):
+            start = time.perf_counter()
+            resume_storage.save_resume(user, f"resume_{i}", resume)
+            timings.append(time.perf_counter() - start)
+        rec.add("save_resume", timings, {"resumes": n, "per": "op"})
+        rec.measure(
+            "load_resumes_cold",
+            lambda: resume_storage.load_resumes(user),
+            {"resumes": n},
+            setup=resume_storage.clear_resume_cache,
+        )
+        rec.measure(
+            "load_resumes_warm",
+            lambda: resume_storage.load_resumes(user),
+            {"resumes": n},
+        )
+        rec.measure(
+            "list_resumes_cold",
+            lambda: resume_storage.list_resumes(user),
+            {"resumes": n},
+            setup=resume_storage.clear_resume_cache,
+        )
+        rec.measure(
+            "list_resumes_warm",
+            lambda: resume_storage.list_resumes(user),
+            {"resumes": n},
+        )
+        last = f"resume_{n - 1}"
+        rec.measure(
+            "get_resume_cold",
+            lambda: resume_storage.get_resume(user, last),
+            {"resumes": n},
+            setup=resume_storage.clear_resume_cache,
+        )
+        rec.measure(
+            "get_resume_warm",
+            lambda: resume_storage.get_resume(user, last),
+            {"resumes": n},
+        )
+        rec.measure(
+            "search_resumes",
+            lambda: resume_storage.search_resumes(user, "kafka caching"),
+            {"resumes": n},
+        )
+
+    # One-field edits to a large resume: with versioning each save writes a
+    # small patch row instead of the whole document.
+    user = "bench_edits"
+    resume = sample_resume(entries=40, bullets=8)
+    resume_storage.save_resume(user, "large", resume)
+    edits = iter(range(10**9))
+
+    def edit():
+        resume["summary"] = f"Summary revision {next(edits)}"
+        resume_storage.save_resume(user, "large", resume)
+
+    rec.measure(
+        "save_resume_small_edit",
+        edit,
+        {"versioning": int(resume_storage.RESUME_VERSIONING)},
+    )
+    copies = iter(range(10**9))
+    rec.measure(
+        "duplicate_resume",
+        lambda: resume_storage.duplicate_resume(user, "large", f"copy_{next(copies)}"),
+        {"size": "large"},
+    )
+    rec.measure(
+        "get_resume_versioned_cold",
+        lambda: resume_storage.get_resume(user, "large"),
+        {"snapshot_every": resume_storage.RESUME_SNAPSHOT_EVERY},
+        setup=resume_storage.clear_resume_cache,
+    )
+
+    names = [f"resume_{i}" for i in range(1000)] + ["ab", "bad name!"] * 10
+    rec.measure(
+        "validate_resume_name",
+        lambda: [validate_resume_name(name) for name in names],
+        {"names": len(names)},
+    )
+
+
+def bench_pdf(rec: Recorder, quick: bool):
+    import resume_export_pdf
+    from resume_model import Resume
+
+    cases = {"small": sample_resume(), "large": sample_resume(entries=40, bullets=8)}
+    if not quick:
+        cases["huge"] = sample_resume(entries=200, bullets=10)
+    cases = {label: Resume.from_dict(data) for label, data in cases.items()}
+    for label, resume in cases.items():
+        rec.measure(
+            "render_pdf",
+            lambda: resume_export_pdf.render_pdf(resume),
+            {"size": label},
+            repeat=max(1, rec.repeat // 5),
+        )
+        resume_export_pdf.generate_pdf(resume)
+        rec.measure(
+            "generate_pdf_cached",
+            lambda: resume_export_pdf.generate_pdf(resume),
+            {"size": label},
+        )
+
+
+def bench_auth(rec: Recorder):
+    import auth
+
+    auth.create_user("bench_user", "correct horse battery staple")
+    rec.measure(
+        "hash_password",
+        lambda: auth.hash_password("correct horse battery staple"),
+        {"bcrypt_rounds": 12},
+        repeat=max(1, rec.repeat // 5),
+    )
+    rec.measure(
+        "authenticate_user",
+        lambda: auth.authenticate_user("bench_user", "correct horse battery staple"),
+        repeat=max(1, rec.repeat // 5),
+    )
+    rec.measure(
+        "authenticate_user_unknown",
+        lambda: auth.authenticate_user("nobody", "x"),
+    )
+    token = auth.create_session("bench_user")
+    rec.measure("resolve_session", lambda: auth.resolve_session(token))
+
+    def concurrent_logins():
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(
+                pool.map(
+                    lambda _: auth.authenticate_user(
+                        "bench_user", "correct horse battery staple"
+                    ),
+                    range(16),
+                )
+            )
+
+    rec.measure(
+        "authenticate_user_concurrent",
+        concurrent_logins,
+        {"logins": 16, "bcrypt_workers": auth.AUTH_BCRYPT_WORKERS},
+        repeat=1,
+    )
+
+
+def bench_llm(rec: Recorder, latency: float, per_token: float):
+    import resume_adapter
+    import resume_enhancer
+    from resume_model import Resume
+
+    llm = FakeChatModel(latency=latency, per_token=per_token)
+    resume_adapter.get_llm = resume_enhancer.get_llm = lambda *a, **k: llm
+    resume = Resume.from_dict(sample_resume(entries=5, bullets=4))
+    job_desc = "Senior Python engineer\n- 5+ years experience\n- Kafka required\n" * 5
+    params = {"latency_s": latency, "per_token_s": per_token}
+    repeat = max(1, rec.repeat // 5)
+
+    rec.measure(
+        "adapt_resume",
+        lambda: resume_adapter.adapt_resume(resume, job_desc, "fake", use_cache=False),
+        params,
+        repeat=repeat,
+    )
+    rec.measure(
+        "adapt_resume_cached",
+        lambda: resume_adapter.adapt_resume(resume, job_desc, "fake", use_cache=True),
+        params,
+    )
+    rec.measure(
+        "adapt_resume_streaming",
+        lambda: resume_adapter.adapt_resume(
+            resume, job_desc, "fake", use_cache=False, on_section=lambda k, v: None
+        ),
+        params,
+        repeat=repeat,
+    )
+    jobs = [f"{job_desc}\nPosting {i}" for i in range(8)]
+    for workers in (1, 8):
+        rec.measure(
+            "adapt_resume_batch",
+            lambda: list(
+                resume_adapter.adapt_resume_batch(
+                    resume, jobs, "fake", max_workers=workers, use_cache=False
+                )
+            ),
+            dict(params, jobs=len(jobs), workers=workers),
+            repeat=repeat,
+        )
+    rec.measure(
+        "enhance_resume",
+        lambda: resume_enhancer.enhance_resume(resume, "fake", use_cache=False),
+        params,
+        repeat=repeat,
+    )
+    resume_enhancer.enhance_resume(resume, "fake")
+    edited = Resume.from_dict(resume.to_dict())
+    edited.summary += " Edited."
+    rec.measure(
+        "enhance_resume_one_section_changed",
+        lambda: resume_enhancer.enhance_resume(edited, "fake"),
+        params,
+    )
+
+
+def bench_llm_client(rec: Recorder, latency: float):
+    """Real ``get_llm`` clients against ``fake_llm_server``: a fresh client
+    (and HTTP connection) per call versus the pooled, warm one."""
+    import llm_client
+    from fake_llm_server import FakeLLMConfig, start_in_thread
+
+    server, base_url = start_in_thread(FakeLLMConfig(latency=latency))
+    llm_client.GROQ_API_BASE = base_url
+    prompt = json.dumps(sample_resume())
+    params = {"latency_s": latency}
+
+    def call():
+        llm_client.get_llm("fake", model_name="fake-model").invoke(prompt)
+
+    try:
+        llm_client.reset_clients()
+        rec.measure(
+            "llm_call_cold_client", call, params, setup=llm_client.reset_clients
+        )
+        llm_client.reset_clients()
+        before = llm_client.client_stats()
+        rec.measure("llm_call_warm_client", call, params)
+        stats = llm_client.client_stats()
+        print(
+            f"{'':<32} warm clients: {stats['created'] - before['created']} created, "
+            f"{stats['reused'] - before['reused']} reused",
+            file=sys.stderr,
+        )
+    finally:
+        llm_client.reset_clients()
+        server.shutdown()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = {
+            (r["name"], json.dumps(r["params"], sort_keys=True)): r
+            for r in json.load(f)["results"]
+        }
+    print(
+        f"\n{'benchmark':<60} {'before':>10} {'after':>10} {'change':>8}",
+        file=sys.stderr,
+    )
+    for r in results:
+        key = (r["name"], json.dumps(r["params"], sort_keys=True))
+        if key not in baseline:
+            continue
+        before, after = baseline[key]["median_s"], r["median_s"]
+        change = (after - before) / before * 100 if before else 0.0
+        label = f"{r['name']} {key[1]}"[:60]
+        print(
+            f"{label:<60} {before * 1000:9.2f}ms {after * 1000:9.2f}ms {change:+7.1f}%",
+            file=sys.stderr,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="print changes against a previous JSON run")
+    parser.add_argument(
+        "--quick", action="store_true", help="smaller sizes, fewer runs"
+    )
+    parser.add_argument(
+        "--only", choices=GROUPS, action="append", help="run only these groups"
+    )
+    parser.add_argument("--repeat", type=int, help="runs per benchmark")
+    parser.add_argument(
+        "--llm-latency",
+        type=float,
+        default=0.05,
+        help="fake LLM time to first token (s)",
+    )
+    parser.add_argument(
+        "--llm-per-token",
+        type=float,
+        default=0.0,
+        help="fake LLM time per output token (s)",
+    )
+    args = parser.parse_args(argv)
+
+    groups = args.only or GROUPS
+    sizes = (10, 100, 1000) if args.quick else (10, 100, 1000, 10000)
+    rec = Recorder(args.repeat or (5 if args.quick else 20))
+
+    output = os.path.abspath(args.output) if args.output else None
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+    with tempfile.TemporaryDirectory(prefix="resume-bench-") as workdir:
+        # Every module resolves its db/ paths relative to the working directory.
+        os.chdir(workdir)
+        if "storage" in groups:
+            bench_storage(rec, sizes)
+        if "pdf" in groups:
+            bench_pdf(rec, args.quick)
+        if "auth" in groups:
+            bench_auth(rec)
+        if "llm" in groups:
+            bench_llm(rec, args.llm_latency, args.llm_per_token)
+            bench_llm_client(rec, args.llm_latency)
+        from utils import close_db_connections
+
+        close_db_connections()
+        os.chdir(REPO_ROOT)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "quick": args.quick,
+        },
+        "results": rec.results,
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if compare_path:
+        compare(rec.results, compare_path)
+
+
+if __name__ == "__main__":
+    main()
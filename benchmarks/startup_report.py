@@ -0,0 +1,157 @@
+"""Startup-time report: what importing the app costs, broken down by import.
+
+Run from the repository root::
+
+    python benchmarks/startup_report.py
+    python benchmarks/startup_report.py --top 30 --output startup.json
+
+Each measurement runs in a fresh interpreter. The report lists the slowest
+imports pulled in by ``import app`` (from ``python -X importtime``), the heavy
+dependencies loaded at startup, the extra cost of each page module when a
+session first navigates to it, and the cost of the deferred dependencies.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("streamlit", "langchain_groq", "httpx", "reportlab", "bcrypt")
+PAGE_MODULES = (
+    "auth",
+    "resume_builder",
+    "resume_adapter",
+    "resume_enhancer",
+    "resume_export_pdf",
+)
+
+_TIMED_IMPORT = """
+import json, sys, time
+for name in {before!r}:
+    __import__(name)
+already = set(sys.modules)
+start = time.perf_counter()
+__import__({module!r})
+elapsed = time.perf_counter() - start
+loaded = [m for m in {heavy!r} if m in sys.modules and m not in already]
+print(json.dumps({{"seconds": elapsed, "loaded": loaded}}))
+"""
+
+
+def _python(code: str, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def timed_import(module: str, before=(), repeat: int = 3) -> dict:
+    """Best-of-``repeat`` wall time of importing ``module`` after ``before``,
+    with the heavy modules it newly loaded."""
+    runs = []
+    for _ in range(repeat):
+        code = _TIMED_IMPORT.format(
+            before=tuple(before), module=module, heavy=HEAVY_MODULES
+        )
+        runs.append(json.loads(_python(code).stdout.strip().splitlines()[-1]))
+    best = min(runs, key=lambda run: run["seconds"])
+    return {"module": module, "seconds": best["seconds"], "loaded": best["loaded"]}
+
+
+def import_breakdown(module: str):
+    """Parse ``-X importtime`` for ``module`` into per-import rows."""
+    stderr = _python(f"import {module}", "-X", "importtime").stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # "import time:   self |   cumulative |   <indent>name"
+        head, cumulative_us, name = line.split("|", 2)
+        self_us = head.split(":", 1)[1]
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append(
+            {
+                "module": name.strip(),
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": depth,
+            }
+        )
+    return rows
+
+
+def build_report(top: int, repeat: int) -> dict:
+    breakdown = import_breakdown("app")
+    by_cost = sorted(breakdown, key=lambda row: row["cumulative_ms"], reverse=True)
+    startup = timed_import("app", repeat=repeat)
+    return {
+        "startup_seconds": startup["seconds"],
+        "heavy_modules_at_startup": startup["loaded"],
+        # What app.py imports itself, and the costliest packages overall.
+        "direct_imports": [row for row in by_cost if row["depth"] == 1][:top],
+        "slowest_packages": [row for row in by_cost if "." not in row["module"]][:top],
+        "first_navigation": [
+            timed_import(name, ("app",), repeat) for name in PAGE_MODULES
+        ],
+        "deferred_dependencies": [
+            timed_import(name, ("app",), repeat)
+            for name in HEAVY_MODULES
+            if name not in startup["loaded"]
+        ],
+    }
+
+
+def print_report(report: dict):
+    out = sys.stderr
+    print(f"import app: {report['startup_seconds'] * 1000:.1f} ms", file=out)
+    print(
+        "heavy modules loaded at startup: "
+        + (", ".join(report["heavy_modules_at_startup"]) or "none"),
+        file=out,
+    )
+    for title, key in (
+        ("imported by app.py", "direct_imports"),
+        ("slowest packages", "slowest_packages"),
+    ):
+        print(f"\n{title:<40} {'cumulative':>12} {'self':>10}", file=out)
+        for row in report[key]:
+            print(
+                f"{row['module']:<40} {row['cumulative_ms']:10.1f}ms "
+                f"{row['self_ms']:8.1f}ms",
+                file=out,
+            )
+    for title, key in (
+        ("first navigation (after app)", "first_navigation"),
+        ("deferred dependencies (after app)", "deferred_dependencies"),
+    ):
+        print(f"\n{title:<40} {'import':>12}  newly loads", file=out)
+        for row in report[key]:
+            print(
+                f"{row['module']:<40} {row['seconds'] * 1000:10.1f}ms  "
+                + ", ".join(row["loaded"]),
+                file=out,
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=15, help="imports to list")
+    parser.add_argument("--repeat", type=int, default=3, help="best-of runs")
+    parser.add_argument("--output", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = build_report(args.top, args.repeat)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
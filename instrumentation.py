@@ -0,0 +1,280 @@
+# Optional timing instrumentation: histograms of page, SQL, LLM and PDF latency
+import atexit
+import bisect
+import contextlib
+import functools
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+# Off by default; every hook below is a cheap no-op unless this is set.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") not in ("0", "false", "False", "")
+# Append a JSON snapshot to this file every METRICS_LOG_INTERVAL seconds.
+METRICS_LOG_PATH = os.getenv("METRICS_LOG_PATH") or None
+METRICS_LOG_INTERVAL = float(os.getenv("METRICS_LOG_INTERVAL", "60"))
+
+METRIC_PREFIX = "resume_app_"
+# Upper bounds in seconds, from sub-millisecond SQL to slow LLM calls.
+BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    math.inf,
+)
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_null_timer = contextlib.nullcontext()
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(bound, self.max)
+        return self.max
+
+
+def _key(name: str, labels: dict):
+    return name, tuple(sorted(labels.items()))
+
+
+def observe(name: str, seconds: float, **labels):
+    """Record one ``seconds`` sample in the histogram ``name{labels}``."""
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = _Histogram()
+        histogram.observe(seconds)
+
+
+def inc(name: str, value: float = 1, **labels):
+    """Add ``value`` to the counter ``name{labels}``."""
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+def timed(name: str, **labels):
+    """Context manager that records its duration in ``name{labels}``.
+
+    Failed and interrupted blocks (e.g. ``st.stop()``) are recorded too.
+    """
+    if not METRICS_ENABLED:
+        return _null_timer
+    return _Timer(name, labels)
+
+
+def snapshot() -> dict:
+    """Return every histogram and counter as JSON-serializable dicts."""
+    with _lock:
+        histograms = [
+            {
+                "name": name,
+                "labels": dict(labels),
+                "count": h.count,
+                "sum": h.sum,
+                "max": h.max,
+                "p50": h.quantile(0.5),
+                "p95": h.quantile(0.95),
+                "buckets": {
+                    ("+Inf" if math.isinf(b) else repr(b)): c
+                    for b, c in zip(BUCKETS, h.counts)
+                },
+            }
+            for (name, labels), h in sorted(_histograms.items())
+        ]
+        counters = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(_counters.items())
+        ]
+    return {"timestamp": time.time(), "histograms": histograms, "counters": counters}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels_text(labels, extra=()) -> str:
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def prometheus_text() -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        histograms = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+    typed = set()
+    for (name, labels), h in histograms:
+        full = METRIC_PREFIX + name
+        if full not in typed:
+            typed.add(full)
+            lines.append(f"# TYPE {full} histogram")
+        cumulative = 0
+        for bound, count in zip(BUCKETS, h.counts):
+            cumulative += count
+            le = "+Inf" if math.isinf(bound) else repr(bound)
+            lines.append(
+                f"{full}_bucket{_labels_text(labels, [('le', le)])} {cumulative}"
+            )
+        lines.append(f"{full}_sum{_labels_text(labels)} {h.sum}")
+        lines.append(f"{full}_count{_labels_text(labels)} {h.count}")
+    for (name, labels), value in counters:
+        full = METRIC_PREFIX + name
+        if full not in typed:
+            typed.add(full)
+            lines.append(f"# TYPE {full} counter")
+        lines.append(f"{full}{_labels_text(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def write_json_log(path: str = None):
+    """Append a :func:`snapshot` as one JSON line to ``path``."""
+    path = path or METRICS_LOG_PATH
+    if not path:
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(snapshot()) + "\n")
+
+
+def _log_periodically():
+    while True:
+        time.sleep(METRICS_LOG_INTERVAL)
+        write_json_log()
+
+
+if METRICS_ENABLED and METRICS_LOG_PATH:
+    threading.Thread(target=_log_periodically, daemon=True, name="metrics-log").start()
+    atexit.register(write_json_log)
+
+
+# SQLite hooks: ``utils`` opens connections with this factory when enabled.
+
+
+@functools.lru_cache(maxsize=1024)
+def _query_label(sql: str) -> str:
+    return " ".join(sql.split())[:80]
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that times statement execution and row fetching."""
+
+    def _timed(self, phase: str, sql: str = None):
+        if sql is not None:
+            self._query = _query_label(sql)
+        return timed(
+            "sqlite_query_seconds",
+            db=self.connection.metrics_label,
+            phase=phase,
+            query=getattr(self, "_query", ""),
+        )
+
+    def execute(self, sql, parameters=()):
+        with self._timed("execute", sql):
+            return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        with self._timed("execute", sql):
+            return super().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        with self._timed("execute", "<script>"):
+            return super().executescript(sql_script)
+
+    def fetchone(self):
+        with self._timed("fetch"):
+            return super().fetchone()
+
+    def fetchmany(self, size=None):
+        with self._timed("fetch"):
+            return super().fetchmany(self.arraysize if size is None else size)
+
+    def fetchall(self):
+        with self._timed("fetch"):
+            return super().fetchall()
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose shortcut methods go through :class:`InstrumentedCursor`."""
+
+    metrics_label = "sqlite"
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
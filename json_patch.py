@@ -0,0 +1,130 @@
+# Minimal JSON Patch (RFC 6902) diff and apply for resume documents
+import copy
+
+
+def _escape(token) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(old, new, path: str = ""):
+    """Return JSON Patch operations (add/remove/replace) turning ``old`` into
+    ``new``. Returns an empty list when they are equal."""
+    ops = []
+    _diff(old, new, path, ops)
+    return ops
+
+
+def _diff(old, new, path, ops):
+    if old == new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key in old:
+                _diff(old[key], value, child, ops)
+            else:
+                ops.append({"op": "add", "path": child, "value": value})
+    elif isinstance(old, list) and isinstance(new, list):
+        _diff_lists(old, new, path, ops)
+    else:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def _diff_lists(old, new, path, ops):
+    # Unchanged head and tail; a single inserted or removed run in between
+    # (adding or deleting one entry) then costs one op per item.
+    limit = min(len(old), len(new))
+    head = 0
+    while head < limit and old[head] == new[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and old[-1 - tail] == new[-1 - tail]:
+        tail += 1
+    old_mid, new_mid = len(old) - head - tail, len(new) - head - tail
+    if old_mid == 0:
+        for i in range(new_mid):
+            ops.append(
+                {"op": "add", "path": f"{path}/{head + i}", "value": new[head + i]}
+            )
+        return
+    if new_mid == 0:
+        for _ in range(old_mid):
+            ops.append({"op": "remove", "path": f"{path}/{head}"})
+        return
+    # Otherwise edit the overlapping items in place and trim or extend the end.
+    for i in range(limit):
+        _diff(old[i], new[i], f"{path}/{i}", ops)
+    for i in range(len(old) - 1, limit - 1, -1):
+        ops.append({"op": "remove", "path": f"{path}/{i}"})
+    for i in range(limit, len(new)):
+        ops.append({"op": "add", "path": f"{path}/{i}", "value": new[i]})
+
+
+def _split(path: str):
+    if not path:
+        return []
+    if not path.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer: {path!r}")
+    return [_unescape(token) for token in path[1:].split("/")]
+
+
+def _index(container: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    index = int(token)
+    if not 0 <= index <= len(container) - (0 if allow_end else 1):
+        raise ValueError(f"List index out of range: {token}")
+    return index
+
+
+def apply_patch(document, ops, in_place: bool = False):
+    """Apply JSON Patch ``ops`` to ``document`` and return the result.
+
+    The document is copied first unless ``in_place`` is set. Raises
+    ``ValueError`` for paths that do not exist.
+    """
+    if not in_place:
+        document = copy.deepcopy(document)
+    for op in ops:
+        tokens = _split(op["path"])
+        if not tokens:
+            if op["op"] == "remove":
+                raise ValueError("Cannot remove the document root")
+            document = copy.deepcopy(op["value"])
+            continue
+        parent = document
+        try:
+            for token in tokens[:-1]:
+                parent = parent[
+                    _index(parent, token) if isinstance(parent, list) else token
+                ]
+        except (KeyError, IndexError, TypeError) as e:
+            raise ValueError(f"Path not found: {op['path']}") from e
+        last = tokens[-1]
+        value = copy.deepcopy(op.get("value"))
+        if isinstance(parent, list):
+            if op["op"] == "add":
+                parent.insert(_index(parent, last, allow_end=True), value)
+            elif op["op"] == "remove":
+                del parent[_index(parent, last)]
+            else:
+                parent[_index(parent, last)] = value
+        elif isinstance(parent, dict):
+            if op["op"] == "remove":
+                if last not in parent:
+                    raise ValueError(f"Path not found: {op['path']}")
+                del parent[last]
+            else:
+                if op["op"] == "replace" and last not in parent:
+                    raise ValueError(f"Path not found: {op['path']}")
+                parent[last] = value
+        else:
+            raise ValueError(f"Path not found: {op['path']}")
+    return document
@@ -0,0 +1,183 @@
+# Persistent cache for LLM adapt/enhance responses
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from utils import get_db_connection, register_schema
+
+DB_PATH = "db/llm_cache.db"
+
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Lookups only read. Hit/miss counts and last_used updates are kept in memory
+# and written in one transaction at most this often (or with the next put).
+LLM_CACHE_FLUSH_SECONDS = float(os.getenv("LLM_CACHE_FLUSH_SECONDS", "30"))
+
+register_schema(
+    DB_PATH,
+    """
+    CREATE TABLE IF NOT EXISTS llm_cache (
+        key TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        response TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        last_used REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used);
+    CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache (created_at);
+    CREATE TABLE IF NOT EXISTS llm_cache_stats (
+        kind TEXT PRIMARY KEY,
+        hits INTEGER NOT NULL DEFAULT 0,
+        misses INTEGER NOT NULL DEFAULT 0
+    );
+    """,
+)
+
+
+def canonical_json(data) -> str:
+    """Serialize ``data`` deterministically (sorted keys, no whitespace)."""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def make_key(
+    kind: str,
+    resume: dict,
+    job_desc: str,
+    model_name: str,
+    temperature: float,
+    prompt_version: str,
+) -> str:
+    """Hash everything that influences the LLM output into a cache key."""
+    material = canonical_json(
+        [kind, resume, job_desc or "", model_name, temperature, prompt_version]
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+# Unflushed ``{(kind, "hits"|"misses"): n}`` and ``{key: last_used}``.
+_counts = Counter()
+_touched = {}
+_flushed_at = time.monotonic()
+_lock = threading.Lock()
+
+
+def _take_pending():
+    global _flushed_at
+    with _lock:
+        counts, touched = dict(_counts), dict(_touched)
+        _counts.clear()
+        _touched.clear()
+        _flushed_at = time.monotonic()
+    return counts, touched
+
+
+def _write_pending(conn, counts: dict, touched: dict):
+    conn.executemany(
+        "INSERT INTO llm_cache_stats (kind, hits, misses) VALUES (?, ?, ?) "
+        "ON CONFLICT(kind) DO UPDATE SET hits = hits + excluded.hits, "
+        "misses = misses + excluded.misses",
+        [
+            (kind, counts.get((kind, "hits"), 0), counts.get((kind, "misses"), 0))
+            for kind in {kind for kind, _ in counts}
+        ],
+    )
+    conn.executemany(
+        "UPDATE llm_cache SET last_used=max(last_used, ?) WHERE key=?",
+        [(last_used, key) for key, last_used in touched.items()],
+    )
+
+
+def flush_stats():
+    """Write pending hit/miss counts and last_used updates to the database."""
+    counts, touched = _take_pending()
+    if not counts and not touched:
+        return
+    conn = get_db_connection(DB_PATH)
+    with conn:
+        _write_pending(conn, counts, touched)
+
+
+def get_cached(kind: str, key: str):
+    """Return the cached response for ``key``, or None on a miss/expiry."""
+    now = time.time()
+    conn = get_db_connection(DB_PATH)
+    row = conn.execute(
+        "SELECT response FROM llm_cache WHERE key=? AND created_at>=?",
+        (key, now - LLM_CACHE_TTL_SECONDS),
+    ).fetchone()
+    with _lock:
+        _counts[(kind, "misses" if row is None else "hits")] += 1
+        if row is not None:
+            _touched[key] = now
+        due = time.monotonic() - _flushed_at >= LLM_CACHE_FLUSH_SECONDS
+    if due:
+        flush_stats()
+    return None if row is None else json.loads(row[0])
+
+
+def put_cached(kind: str, key: str, response: dict):
+    """Store ``response`` and evict expired or least recently used entries."""
+    payload = json.dumps(response)
+    now = time.time()
+    counts, touched = _take_pending()
+    conn = get_db_connection(DB_PATH)
+    with conn:
+        # Pending last_used updates land first, so eviction sees them.
+        _write_pending(conn, counts, touched)
+        conn.execute(
+            "REPLACE INTO llm_cache (key, kind, response, size, created_at, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, kind, payload, len(payload), now, now),
+        )
+        _evict(conn, now)
+
+
+def _evict(conn, now: float):
+    conn.execute(
+        "DELETE FROM llm_cache WHERE created_at<?", (now - LLM_CACHE_TTL_SECONDS,)
+    )
+    count, total = conn.execute(
+        "SELECT count(*), coalesce(sum(size), 0) FROM llm_cache"
+    ).fetchone()
+    if count <= LLM_CACHE_MAX_ENTRIES and total <= LLM_CACHE_MAX_BYTES:
+        return
+    # Walk entries from least recently used and drop until both budgets fit.
+    doomed = []
+    rows = conn.execute("SELECT key, size FROM llm_cache ORDER BY last_used")
+    for key, size in rows:
+        if count <= LLM_CACHE_MAX_ENTRIES and total <= LLM_CACHE_MAX_BYTES:
+            break
+        doomed.append((key,))
+        count -= 1
+        total -= size
+    conn.executemany("DELETE FROM llm_cache WHERE key=?", doomed)
+
+
+def cache_stats() -> dict:
+    """Return ``{kind: {"hits", "misses"}}`` plus entry and byte totals."""
+    conn = get_db_connection(DB_PATH)
+    stats = {
+        kind: {"hits": hits, "misses": misses}
+        for kind, hits, misses in conn.execute(
+            "SELECT kind, hits, misses FROM llm_cache_stats"
+        )
+    }
+    with _lock:
+        pending = dict(_counts)
+    for (kind, column), count in pending.items():
+        stats.setdefault(kind, {"hits": 0, "misses": 0})[column] += count
+    entries, size = conn.execute(
+        "SELECT count(*), coalesce(sum(size), 0) FROM llm_cache"
+    ).fetchone()
+    stats["total"] = {"entries": entries, "bytes": size}
+    return stats
+
+
+def clear_cache():
+    conn = get_db_connection(DB_PATH)
+    with conn:
+        conn.execute("DELETE FROM llm_cache")
@@ -0,0 +1,107 @@
+# Shared Groq LLM clients
+import json
+import os
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+    from langchain_groq import ChatGroq
+
+DEFAULT_MODEL_NAME = "openai/gpt-oss-20b"
+
+# HTTP settings, overridable from .env / the environment
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "60"))
+GROQ_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "10"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "2"))
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+GROQ_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "10"))
+# Ask the provider for structured JSON output on non-streamed JSON calls.
+GROQ_JSON_MODE = os.getenv("GROQ_JSON_MODE", "1") not in ("0", "false", "False", "")
+# Call kwargs for JSON mode. Groq cannot stream in JSON mode, so these are
+# passed per call (where langchain_groq falls back to a plain request) and
+# never baked into a client that is also used for streaming.
+JSON_MODE_KWARGS = (
+    {"response_format": {"type": "json_object"}} if GROQ_JSON_MODE else {}
+)
+# Alternative API endpoint, e.g. benchmarks/fake_llm_server.py for load tests.
+GROQ_API_BASE = os.getenv("GROQ_API_BASE") or None
+
+_lock = threading.Lock()
+_http_client = None
+_clients = {}
+_stats = {"created": 0, "reused": 0}
+
+
+def get_http_client() -> "httpx.Client":
+    """Return the process-wide pooled HTTP client used by every LLM client.
+
+    Sharing one client keeps TCP/TLS connections alive between calls and
+    across sessions instead of re-handshaking on each click.
+    """
+    global _http_client
+    # Imported on first use so that pages without LLM calls never load it.
+    import httpx
+
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                timeout=httpx.Timeout(GROQ_TIMEOUT, connect=GROQ_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=GROQ_MAX_CONNECTIONS,
+                    max_keepalive_connections=GROQ_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            )
+        return _http_client
+
+
+def get_llm(
+    api_key: str,
+    model_name: str = DEFAULT_MODEL_NAME,
+    temperature: float = 1,
+    **params,
+) -> "ChatGroq":
+    """Return a cached ``ChatGroq`` for this key, model and parameter set.
+
+    Extra ``params`` are passed to ``ChatGroq`` and take part in the cache key.
+    """
+    key = (api_key, model_name, temperature, json.dumps(params, sort_keys=True))
+    with _lock:
+        llm = _clients.get(key)
+        if llm is not None:
+            _stats["reused"] += 1
+            return llm
+    from langchain_groq import ChatGroq
+
+    http_client = get_http_client()
+    llm = ChatGroq(
+        groq_api_key=api_key,
+        model_name=model_name,
+        temperature=temperature,
+        request_timeout=GROQ_TIMEOUT,
+        max_retries=GROQ_MAX_RETRIES,
+        http_client=http_client,
+        groq_api_base=GROQ_API_BASE,
+        **params,
+    )
+    with _lock:
+        # Another session may have built the same client concurrently.
+        llm = _clients.setdefault(key, llm)
+        _stats["created"] += 1
+    return llm
+
+
+def client_stats() -> dict:
+    """Counts of LLM clients built versus served warm from the pool."""
+    with _lock:
+        return dict(_stats, pooled=len(_clients))
+
+
+def reset_clients():
+    """Drop pooled LLM clients and close the shared HTTP client."""
+    global _http_client
+    with _lock:
+        _clients.clear()
+        http_client, _http_client = _http_client, None
+    if http_client is not None:
+        http_client.close()
@@ -0,0 +1,270 @@
+# Parsing and repair of JSON returned by LLMs
+import json
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from instrumentation import METRICS_ENABLED, inc, timed
+from llm_client import JSON_MODE_KWARGS
+from llm_streaming import stream_json_response
+from prompt_builder import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Extra LLM calls allowed when a response cannot be parsed even after repair.
+LLM_PARSE_RETRIES = int(os.getenv("LLM_PARSE_RETRIES", "1"))
+
+NO_JSON_ERROR = (
+    "Groq LLM did not return any JSON. Please try again or refine your prompt."
+)
+INVALID_JSON_ERROR = "Groq LLM returned a response, but it was not valid JSON. Please try again or refine your prompt."
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)```", re.DOTALL)
+_TRAILING_KEY_RE = re.compile(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*:?\s*$')
+# Where an object can start: a brace followed by a key, as when streaming.
+_OBJECT_START_RE = re.compile(r'\{\s*"')
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _record(kind: str, outcome: str):
+    with _stats_lock:
+        _stats[(kind, outcome)] += 1
+
+
+def parse_stats() -> dict:
+    """Return ``{kind: {outcome: count}}`` for this process.
+
+    Outcomes are ``parsed`` (clean), ``repaired`` (a retry saved by repair),
+    ``failed`` and ``retried``.
+    """
+    stats = {}
+    with _stats_lock:
+        for (kind, outcome), count in _stats.items():
+            stats.setdefault(kind, {})[outcome] = count
+    return stats
+
+
+def _count_tokens(kind: str, prompt: str, response_text: str, usage):
+    # Provider-reported usage when available, otherwise the local estimate.
+    usage = usage or {}
+    inc(
+        "llm_prompt_tokens_total",
+        usage.get("input_tokens") or estimate_tokens(prompt),
+        kind=kind,
+    )
+    inc(
+        "llm_completion_tokens_total",
+        usage.get("output_tokens") or estimate_tokens(response_text),
+        kind=kind,
+    )
+
+
+def strip_code_fences(text: str) -> str:
+    """Return the contents of the first fenced block, or ``text`` unchanged."""
+    match = _FENCE_RE.search(text)
+    return match.group(1) if match else text
+
+
+def scan_json_objects(text: str):
+    """Yield ``(start, end)`` spans of balanced top-level ``{...}`` blocks.
+
+    A single pass that tracks string literals, so braces inside strings do not
+    count. As when streaming, a top-level brace only starts an object when a
+    key (``{"``) follows it, so an unbalanced brace in the prose cannot
+    swallow the object after it. If the text ends inside an object, a final
+    ``(start, None)`` span marks the truncated tail.
+    """
+    depth = 0
+    start = None
+    in_string = False
+    escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            # Quotes in the surrounding prose are not JSON strings.
+            in_string = depth > 0
+        elif ch == "{":
+            if depth == 0:
+                if not _OBJECT_START_RE.match(text, i):
+                    continue
+                start = i
+            depth += 1
+        elif ch == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                yield start, i + 1
+    if depth > 0:
+        yield start, None
+
+
+def _strip_trailing_comma(out: list):
+    i = len(out) - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    if i >= 0 and out[i] == ",":
+        del out[i]
+
+
+def repair_json(fragment: str) -> str:
+    """Best-effort fix of trailing commas and truncation in a JSON object."""
+    out = []
+    closers = []
+    in_string = False
+    escaped = False
+    for ch in fragment:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            _strip_trailing_comma(out)
+            if closers:
+                closers.pop()
+        out.append(ch)
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+    text = "".join(out).rstrip()
+    if closers and closers[-1] == "}":
+        # Drop a dangling key that never received a value.
+        text = _TRAILING_KEY_RE.sub(r"\1", text)
+    text = text.rstrip().rstrip(",").rstrip(":").rstrip()
+    return text + "".join(reversed(closers))
+
+
+def _parse_spans(text: str, spans: list, kind: str):
+    """Return the first span that parses, else the first one repair fixes."""
+    for start, end in spans:
+        if end is None:
+            continue
+        try:
+            parsed = json.loads(text[start:end])
+        except ValueError:
+            continue
+        if isinstance(parsed, dict):
+            _record(kind, "parsed")
+            return parsed
+    for start, end in spans:
+        try:
+            parsed = json.loads(repair_json(text[start:end]))
+        except ValueError:
+            continue
+        if isinstance(parsed, dict):
+            _record(kind, "repaired")
+            logger.info("%s: repaired malformed JSON instead of retrying", kind)
+            return parsed
+    return None
+
+
+def parse_json_response(text: str, kind: str = "llm") -> dict:
+    """Extract the JSON object from an LLM response.
+
+    Tries, in order: each top-level object in the (fence-stripped) text, the
+    same object after :func:`repair_json`, then a repaired truncated tail.
+    Objects nested in one that fails are never taken for the reply, and each
+    character is scanned once. Raises ``ValueError`` if nothing yields a JSON
+    object.
+    """
+    text = strip_code_fences(text)
+    spans = list(scan_json_objects(text))
+    if not spans and "{" not in text:
+        _record(kind, "failed")
+        logger.warning("%s: response contained no JSON object", kind)
+        raise ValueError(NO_JSON_ERROR)
+    parsed = _parse_spans(text, spans, kind)
+    if parsed is not None:
+        return parsed
+    _record(kind, "failed")
+    logger.warning("%s: could not parse or repair JSON response", kind)
+    raise ValueError(INVALID_JSON_ERROR)
+
+
+def invoke_json(
+    llm,
+    prompt: str,
+    kind: str,
+    on_section=None,
+    retries=None,
+    parse=None,
+    json_mode=False,
+):
+    """Call ``llm`` and return the JSON object from its response.
+
+    Streams when ``on_section`` is given (see ``stream_json_response``). If
+    given, ``parse`` turns the object into the caller's type (e.g.
+    ``Resume.from_dict``); a ``ValueError`` from it counts as an unparseable
+    response. Those are retried up to ``retries`` times.
+
+    ``json_mode`` requests the provider's JSON-object output on non-streamed
+    calls only: Groq cannot stream in that mode, so streamed replies rely on
+    the incremental parser and repair instead.
+
+    A streamed object is only used as is when every member parsed; otherwise
+    the full text goes through :func:`parse_json_response` (and repair).
+    Sections already passed to ``on_section`` are not sent again on a retry.
+    """
+    retries = LLM_PARSE_RETRIES if retries is None else retries
+    error = ValueError(INVALID_JSON_ERROR)
+    shown = set()
+
+    def emit(key, value):
+        if key not in shown:
+            shown.add(key)
+            on_section(key, value)
+
+    for attempt in range(retries + 1):
+        if attempt:
+            _record(kind, "retried")
+            logger.warning("%s: retrying LLM call (attempt %d)", kind, attempt + 1)
+        mode = "invoke" if on_section is None else "stream"
+        usage = None
+        with timed("llm_request_seconds", kind=kind, mode=mode):
+            if on_section is not None:
+                response_text, streamed = stream_json_response(llm, prompt, emit)
+            else:
+                response = llm.invoke(prompt, **(JSON_MODE_KWARGS if json_mode else {}))
+                usage = getattr(response, "usage_metadata", None)
+                # Convert AIMessage to string if needed
+                response_text = (
+                    str(response.content)
+                    if hasattr(response, "content")
+                    else str(response)
+                )
+        if METRICS_ENABLED:
+            _count_tokens(kind, prompt, response_text, usage)
+        if on_section is not None and streamed is not None:
+            _record(kind, "parsed")
+            parsed = streamed
+        else:
+            try:
+                parsed = parse_json_response(response_text, kind)
+            except ValueError as e:
+                error = e
+                continue
+        if parse is None:
+            return parsed
+        try:
+            return parse(parsed)
+        except ValueError as e:
+            logger.warning("%s: response does not fit the expected shape: %s", kind, e)
+            error = e
+    raise error
@@ -0,0 +1,126 @@
+# Streaming helpers for LLM responses that contain a JSON object
+import json
+
+
+class IncrementalJSONObjectParser:
+    """Parse a streamed JSON object, emitting top-level members as they close.
+
+    Text before the opening brace (prose, code fences) is skipped; a brace
+    only starts the object when a key (``{"``) follows it. Members that are
+    not valid JSON, and empty members such as a trailing comma's, are listed
+    in ``failed`` rather than emitted. Each call to :meth:`feed` scans only
+    the new characters and the current member is kept as a list of pieces,
+    so the total work is linear in the response length.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        # A top-level brace whose next non-blank character has not arrived.
+        self._brace_pending = False
+        # Pieces of the current top-level member, or None outside the object.
+        self._member = None
+        # Number of members closed so far, including empty ones.
+        self._closed = 0
+        self.members = {}
+        # Raw text of members that could not be parsed.
+        self.failed = []
+        self.complete = False
+
+    def feed(self, chunk: str):
+        """Consume ``chunk`` and return newly completed ``(key, value)`` pairs."""
+        if self.complete or not chunk:
+            return []
+        done = []
+        # Offset in ``chunk`` where the unstored part of the member begins.
+        start = 0
+        for i, ch in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if self._depth == 0:
+                if self._brace_pending and not ch.isspace():
+                    self._brace_pending = False
+                    if ch == '"':
+                        self._depth = 1
+                        self._in_string = True
+                        self._member = []
+                        start = i
+                        continue
+                if ch == "{":
+                    self._brace_pending = True
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._close_member(self._take(chunk, start, i), done, True)
+                    self.complete = True
+                    return done
+            elif ch == "," and self._depth == 1:
+                self._close_member(self._take(chunk, start, i), done, False)
+                self._member = []
+                start = i + 1
+        if self._member is not None:
+            self._member.append(chunk[start:])
+        return done
+
+    def _take(self, chunk: str, start: int, end: int) -> str:
+        self._member.append(chunk[start:end])
+        member = "".join(self._member)
+        self._member = None
+        return member
+
+    def _close_member(self, member: str, done: list, last: bool):
+        self._closed += 1
+        if not member.strip():
+            # Only ``{}`` may close on an empty member; anything else is a
+            # trailing or doubled comma.
+            if not (last and self._closed == 1):
+                self.failed.append(member)
+            return
+        try:
+            parsed = json.loads("{" + member + "}")
+        except ValueError:
+            self.failed.append(member)
+            return
+        for key, value in parsed.items():
+            self.members[key] = value
+            done.append((key, value))
+
+    @property
+    def result(self):
+        """The parsed object once the closing brace has been seen, if every
+        member parsed and there was at least one; else None."""
+        if not self.complete or self.failed or not self.members:
+            return None
+        return dict(self.members)
+
+
+def stream_json_response(llm, prompt: str, on_section):
+    """Stream ``prompt`` through ``llm``, calling ``on_section(key, value)``
+    for every top-level JSON member as soon as it is complete.
+
+    Returns ``(response_text, parsed)`` where ``parsed`` is the full object,
+    or None if the stream did not produce a complete, cleanly parsed JSON
+    object (the caller should then parse or repair ``response_text``).
+    """
+    parser = IncrementalJSONObjectParser()
+    chunks = []
+    for chunk in llm.stream(prompt):
+        text = chunk.content if hasattr(chunk, "content") else chunk
+        if not isinstance(text, str):
+            text = str(text)
+        chunks.append(text)
+        for key, value in parser.feed(text):
+            on_section(key, value)
+    return "".join(chunks), parser.result
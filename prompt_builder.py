@@ -0,0 +1,223 @@
+# Compact, token-budgeted prompt construction for LLM calls
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from instrumentation import METRICS_ENABLED
+from resume_model import Resume
+
+logger = logging.getLogger(__name__)
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6000"))
+# Job descriptions are never cut below this, even when the resume is huge.
+MIN_JOB_DESC_TOKENS = int(os.getenv("MIN_JOB_DESC_TOKENS", "400"))
+
+# Entry fields that only matter to the UI, never to the model.
+ENTRY_UI_KEYS = frozenset({"present"})
+# Fields identifying an entry across a rewrite, for sections with UI fields.
+ENTRY_IDENTITY = {
+    "experience": ("company", "start"),
+    "education": ("school", "start"),
+    "projects": ("title", "start"),
+}
+
+_JOB_DESC_KEYWORDS = re.compile(
+    r"require|responsib|qualif|skill|experience|must|should|nice to have|"
+    r"you will|you'll|stack|degree|years",
+    re.IGNORECASE,
+)
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+
+_totals = Counter()
+_totals_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English/JSON)."""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def compact_resume(resume: Resume):
+    """Return ``resume``'s content without empty values and UI-only keys.
+
+    Returns None when nothing is left.
+    """
+    return _compact(resume.to_dict())
+
+
+def _compact(data):
+    # None means "nothing left", so empty entries vanish from lists.
+    if isinstance(data, dict):
+        compact = {}
+        for key, value in data.items():
+            if key in ENTRY_UI_KEYS:
+                continue
+            value = _compact(value)
+            if value is not None:
+                compact[key] = value
+        return compact or None
+    if isinstance(data, list):
+        compact = [v for v in (_compact(item) for item in data) if v is not None]
+        return compact or None
+    if isinstance(data, str):
+        data = data.strip()
+        return data or None
+    return data
+
+
+def compact_json(data) -> str:
+    """Serialize ``data`` without indentation or separator whitespace."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _identity(entry, fields) -> tuple:
+    return tuple(" ".join(getattr(entry, name).split()).casefold() for name in fields)
+
+
+def restore_ui_fields(original: Resume, rewritten: Resume) -> Resume:
+    """Copy UI-only entry flags (e.g. ``present``) back onto LLM output.
+
+    Entries are matched on their identity fields (e.g. company and start), so
+    reordered, dropped or merged entries never take another entry's flags.
+    An unmatched entry falls back to the entry at the same position only when
+    the section kept its length and that entry is unmatched too.
+    """
+    for section, fields in ENTRY_IDENTITY.items():
+        entries = getattr(rewritten, section)
+        source = getattr(original, section)
+        if not entries or not source:
+            continue
+        by_identity = {}
+        for source_entry in source:
+            by_identity.setdefault(_identity(source_entry, fields), []).append(
+                source_entry
+            )
+        matches = []
+        for entry in entries:
+            candidates = by_identity.get(_identity(entry, fields))
+            matches.append(candidates.pop(0) if candidates else None)
+        if len(entries) == len(source):
+            claimed = {id(match) for match in matches if match is not None}
+            matches = [
+                source[i] if match is None and id(source[i]) not in claimed else match
+                for i, match in enumerate(matches)
+            ]
+        for entry, source_entry in zip(entries, matches):
+            if source_entry is None:
+                continue
+            for key in ENTRY_UI_KEYS:
+                if hasattr(entry, key):
+                    setattr(entry, key, getattr(source_entry, key))
+    return rewritten
+
+
+def fit_job_description(job_desc: str, max_tokens: int) -> str:
+    """Return ``job_desc`` as written if it fits ``max_tokens``; otherwise
+    normalize whitespace, drop repeated lines and, if still over, keep the
+    most informative lines (bullets and requirement keywords first) in their
+    original order. A line too long for what is left of the budget is cut at
+    a sentence or word boundary, so non-empty input never comes back empty.
+    """
+    job_desc = job_desc or ""
+    if estimate_tokens(job_desc) <= max_tokens:
+        return job_desc
+    lines = []
+    seen = set()
+    for line in job_desc.splitlines():
+        line = " ".join(line.split())
+        if line and line.lower() not in seen:
+            seen.add(line.lower())
+            lines.append(line)
+    text = "\n".join(lines)
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    def score(item):
+        i, line = item
+        value = 0
+        if _BULLET.match(line):
+            value += 2
+        if _JOB_DESC_KEYWORDS.search(line):
+            value += 2
+        # Prefer earlier lines among equals: titles and summaries come first.
+        return (-value, i)
+
+    budget = max_tokens * 4
+    kept = []
+    for i, line in sorted(enumerate(lines), key=score):
+        if len(line) + 1 > budget:
+            if budget <= 1:
+                continue
+            line = lines[i] = _truncate(line, budget - 1)
+        kept.append(i)
+        budget -= len(line) + 1
+    return "\n".join(lines[i] for i in sorted(kept))
+
+
+def _truncate(line: str, limit: int) -> str:
+    # Prefer the last sentence end, then the last space, as long as that
+    # keeps at least half of ``limit``; otherwise cut mid-word.
+    cut = line[:limit]
+    for boundary in (". ", " "):
+        end = cut.rfind(boundary)
+        if end >= limit // 2:
+            return cut[: end + 1].rstrip()
+    return cut
+
+
+def build_prompt(
+    template: str,
+    resume: Resume,
+    job_desc=None,
+    kind: str = "llm",
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+):
+    """Fill ``template``'s ``{resume}`` and ``{job_desc}`` placeholders compactly.
+
+    Returns ``(prompt, stats)`` where ``stats`` holds the estimated tokens of
+    the prompt and, when instrumentation is enabled, of the old indented-JSON
+    prompt and the difference saved; building that baseline is skipped
+    otherwise.
+    """
+    resume_json = compact_json(compact_resume(resume) or {})
+    fitted_job_desc = ""
+    if job_desc is not None:
+        fixed = estimate_tokens(template) + estimate_tokens(resume_json)
+        fitted_job_desc = fit_job_description(
+            job_desc, max(token_budget - fixed, MIN_JOB_DESC_TOKENS)
+        )
+    prompt = template.format(resume=resume_json, job_desc=fitted_job_desc)
+    stats = {"tokens": estimate_tokens(prompt)}
+    if METRICS_ENABLED:
+        baseline = template.format(
+            resume=json.dumps(resume.to_dict(), indent=2), job_desc=job_desc or ""
+        )
+        stats["baseline_tokens"] = estimate_tokens(baseline)
+        stats["saved_tokens"] = stats["baseline_tokens"] - stats["tokens"]
+    with _totals_lock:
+        _totals[(kind, "requests")] += 1
+        _totals[(kind, "tokens")] += stats["tokens"]
+        if METRICS_ENABLED:
+            _totals[(kind, "saved_tokens")] += stats["saved_tokens"]
+    if METRICS_ENABLED:
+        logger.info(
+            "%s prompt: ~%d tokens (~%d saved vs. indented JSON)",
+            kind,
+            stats["tokens"],
+            stats["saved_tokens"],
+        )
+    else:
+        logger.info("%s prompt: ~%d tokens", kind, stats["tokens"])
+    return prompt, stats
+
+
+def prompt_stats() -> dict:
+    """Return cumulative ``{kind: {"requests", "tokens", "saved_tokens"}}``."""
+    stats = {}
+    with _totals_lock:
+        for (kind, name), value in _totals.items():
+            stats.setdefault(kind, {})[name] = value
+    return stats
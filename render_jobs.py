@@ -0,0 +1,174 @@
+# Background render jobs (PDF/ZIP exports) backed by a local job table
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from utils import get_db_connection, register_schema
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "db/jobs.db"
+RENDER_JOB_WORKERS = int(os.getenv("RENDER_JOB_WORKERS", "2"))
+RENDER_JOB_TTL_SECONDS = float(os.getenv("RENDER_JOB_TTL_SECONDS", str(24 * 3600)))
+
+ACTIVE_STATUSES = ("pending", "running")
+
+
+def _fail_interrupted_jobs(conn):
+    # Workers live in this process, so active jobs left by a previous run are dead.
+    conn.execute(
+        "UPDATE render_jobs SET status='failed', error='Interrupted by a restart.' "
+        "WHERE status IN ('pending', 'running')"
+    )
+
+
+register_schema(
+    DB_PATH,
+    """
+    CREATE TABLE IF NOT EXISTS render_jobs (
+        id TEXT PRIMARY KEY,
+        user TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        job_key TEXT NOT NULL,
+        file_name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        progress REAL NOT NULL DEFAULT 0,
+        error TEXT,
+        result BLOB,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_render_jobs_user
+        ON render_jobs (user, created_at);
+    -- At most one active job per identical request.
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_render_jobs_active
+        ON render_jobs (user, job_key) WHERE status IN ('pending', 'running');
+    """,
+)
+register_schema(DB_PATH, _fail_interrupted_jobs)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=RENDER_JOB_WORKERS, thread_name_prefix="render-job"
+            )
+        return _executor
+
+
+def _update(job_id: str, **fields):
+    fields["updated_at"] = time.time()
+    assignments = ", ".join(f"{name}=?" for name in fields)
+    conn = get_db_connection(DB_PATH)
+    with conn:
+        conn.execute(
+            f"UPDATE render_jobs SET {assignments} WHERE id=?",
+            (*fields.values(), job_id),
+        )
+
+
+def _run(job_id: str, render):
+    _update(job_id, status="running")
+
+    def on_progress(done, total):
+        _update(job_id, progress=done / total if total else 1.0)
+
+    try:
+        result = render(on_progress)
+    except Exception as e:
+        logger.exception("render job %s failed", job_id)
+        _update(job_id, status="failed", error=str(e) or type(e).__name__)
+    else:
+        _update(job_id, status="done", progress=1.0, result=result)
+
+
+def submit_job(user: str, kind: str, job_key: str, render, file_name: str) -> str:
+    """Queue ``render(on_progress) -> bytes`` and return the job id.
+
+    ``job_key`` identifies the output: if the same user already has an active
+    or finished job for it, that job's id is returned instead of a new one.
+    """
+    now = time.time()
+    conn = get_db_connection(DB_PATH)
+    with conn:
+        conn.execute(
+            "DELETE FROM render_jobs WHERE updated_at<? AND status NOT IN (?, ?)",
+            (now - RENDER_JOB_TTL_SECONDS, *ACTIVE_STATUSES),
+        )
+        row = conn.execute(
+            "SELECT id FROM render_jobs WHERE user=? AND job_key=? "
+            "AND status IN ('pending', 'running', 'done') "
+            "ORDER BY created_at DESC LIMIT 1",
+            (user, job_key),
+        ).fetchone()
+        if row:
+            return row[0]
+        job_id = uuid.uuid4().hex
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO render_jobs "
+            "(id, user, kind, job_key, file_name, status, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, 'pending', ?, ?)",
+            (job_id, user, kind, job_key, file_name, now, now),
+        )
+        if cursor.rowcount == 0:
+            # Another session queued the same job between our check and insert.
+            return conn.execute(
+                "SELECT id FROM render_jobs WHERE user=? AND job_key=? "
+                "AND status IN ('pending', 'running')",
+                (user, job_key),
+            ).fetchone()[0]
+    _get_executor().submit(_run, job_id, render)
+    return job_id
+
+
+def _status_dict(row):
+    keys = ("id", "kind", "file_name", "status", "progress", "error", "created_at")
+    return dict(zip(keys, row))
+
+
+def poll_job(job_id: str):
+    """Return the job's status fields (without the result), or None."""
+    conn = get_db_connection(DB_PATH)
+    row = conn.execute(
+        "SELECT id, kind, file_name, status, progress, error, created_at "
+        "FROM render_jobs WHERE id=?",
+        (job_id,),
+    ).fetchone()
+    return _status_dict(row) if row else None
+
+
+def list_jobs(user: str, limit: int = 10):
+    """Return the user's most recent jobs, newest first."""
+    conn = get_db_connection(DB_PATH)
+    rows = conn.execute(
+        "SELECT id, kind, file_name, status, progress, error, created_at "
+        "FROM render_jobs WHERE user=? ORDER BY created_at DESC LIMIT ?",
+        (user, limit),
+    ).fetchall()
+    return [_status_dict(row) for row in rows]
+
+
+def fetch_result(job_id: str):
+    """Return the rendered bytes of a finished job, or None."""
+    conn = get_db_connection(DB_PATH)
+    row = conn.execute(
+        "SELECT result FROM render_jobs WHERE id=? AND status='done'", (job_id,)
+    ).fetchone()
+    return bytes(row[0]) if row and row[0] is not None else None
+
+
+def dismiss_job(user: str, job_id: str):
+    """Forget a finished or failed job."""
+    conn = get_db_connection(DB_PATH)
+    with conn:
+        conn.execute(
+            "DELETE FROM render_jobs WHERE id=? AND user=? AND status NOT IN (?, ?)",
+            (job_id, user, *ACTIVE_STATUSES),
+        )
@@ -1,55 +1,265 @@
 # Resume adaptation via Groq API
 import streamlit as st
 import json
-from resume_storage import load_resumes, save_resume
-from utils import get_groq_api_key
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from resume_storage import get_resume, list_resumes, save_resume, save_resumes
+from utils import get_groq_api_key, validate_resume_name
+from llm_cache import cache_stats, get_cached, make_key, put_cached
+from llm_client import DEFAULT_MODEL_NAME, get_llm
+from llm_response import invoke_json
+from prompt_builder import build_prompt, compact_resume, restore_ui_fields
+from resume_components import (
+    render_resume_editor,
+    resume_search_box,
+    streamed_section_renderer,
+)
+from resume_model import Resume, resume_from_reply
 
+logger = logging.getLogger(__name__)
 
-# Use ChatGroq for LLM calls
-from langchain_groq import ChatGroq
+# Bump PROMPT_VERSION whenever the prompt changes so cached responses expire.
+PROMPT_VERSION = "adapt-v2"
+MODEL_NAME = DEFAULT_MODEL_NAME
+TEMPERATURE = 1
+# How often saving a batch re-picks names that were taken concurrently.
+SAVE_ATTEMPTS = 3
 
+ADAPT_PROMPT = """You are an expert resume writer and job matching specialist. Your job is to:
+- Analyze the resume and the job description below.
+- Adapt and rewrite the resume to best match the job requirements, highlighting relevant skills, experience, and achievements.
+- Use strong action verbs, quantifiable results, and ensure the resume is ATS-friendly and tailored for the specific role.
+- Make sure the resume is concise, impactful, and avoids unnecessary repetition.
+- Return ONLY the result as a JSON object with the same structure as the input resume. Do not include any explanation or extra text, only the JSON object.
+Resume:
+{resume}
+Job Description:
+{job_desc}
+"""
 
-def call_groq_api(resume, job_desc, api_key):
-    llm = ChatGroq(
-        groq_api_key=api_key,
-        model_name="openai/gpt-oss-20b",
-        temperature=1,
-    )
-    prompt = f"""
-    You are an expert resume writer and job matching specialist. Your job is to:
-    - Analyze the resume and the job description below.
-    - Adapt and rewrite the resume to best match the job requirements, highlighting relevant skills, experience, and achievements.
-    - Use strong action verbs, quantifiable results, and ensure the resume is ATS-friendly and tailored for the specific role.
-    - Make sure the resume is concise, impactful, and avoids unnecessary repetition.
-    - Return ONLY the result as a JSON object with the same structure as the input resume. Do not include any explanation or extra text, only the JSON object.
-    Resume:
-    {json.dumps(resume, indent=2)}
-    Job Description:
-    {job_desc}
+
+def adapt_resume(resume, job_desc, api_key, use_cache=True, on_section=None):
+    """Adapt ``resume`` to ``job_desc`` without touching the Streamlit UI.
+
+    Safe to run from worker threads. Returns ``(adapted_resume, from_cache)``
+    with a validated :class:`Resume`, and raises ``ValueError`` when the model
+    does not return a valid resume.
     """
-    response = llm.invoke(prompt)
-    # Convert AIMessage to string if needed
-    response_text = (
-        str(response.content) if hasattr(response, "content") else str(response)
+    # Key on the compacted resume so UI-only edits (e.g. flags) still hit.
+    compact = compact_resume(resume) or {}
+    cache_key = make_key(
+        "adapt",
+        compact or None,
+        job_desc,
+        MODEL_NAME,
+        TEMPERATURE,
+        PROMPT_VERSION,
     )
-    import re
+    if use_cache:
+        cached = get_cached("adapt", cache_key)
+        if cached is not None:
+            return restore_ui_fields(resume, Resume.from_dict(cached)), True
+    llm = get_llm(api_key, model_name=MODEL_NAME, temperature=TEMPERATURE)
+    prompt, _ = build_prompt(ADAPT_PROMPT, resume, job_desc, kind="adapt")
+    adapted_resume = restore_ui_fields(
+        resume,
+        invoke_json(
+            llm,
+            prompt,
+            "adapt",
+            on_section=on_section,
+            # A reply that kept none of the resume's sections is retried.
+            parse=lambda data: resume_from_reply(data, compact),
+            json_mode=True,
+        ),
+    )
+    # A reply that lost sections (e.g. a truncated response that had to be
+    # repaired) is still returned, but not cached for later calls.
+    missing = set(compact) - set(adapted_resume.sections())
+    if missing:
+        logger.warning("adapt: not caching a reply without %s", sorted(missing))
+    else:
+        put_cached("adapt", cache_key, adapted_resume.to_dict())
+    return adapted_resume, False
+
+
+def call_groq_api(resume, job_desc, api_key, use_cache=True, on_section=None):
+    try:
+        adapted_resume, from_cache = adapt_resume(
+            resume, job_desc, api_key, use_cache=use_cache, on_section=on_section
+        )
+    except ValueError as e:
+        st.error(str(e))
+        return None
+    if from_cache:
+        st.caption("Served from the response cache.")
+    return adapted_resume
+
+
+# Batch adaptation
+
+
+def split_job_descriptions(text: str):
+    """Split text into job descriptions separated by lines of ``---``."""
+    parts = re.split(r"^\s*-{3,}\s*$", text or "", flags=re.MULTILINE)
+    return [p.strip() for p in parts if p.strip()]
+
+
+def read_job_descriptions_file(uploaded_file):
+    """Read job descriptions from an uploaded ``.txt``/``.md`` or ``.json`` file.
+
+    JSON files hold a list of strings or of objects with a ``description``.
+    Raises ``ValueError`` with a message for the user when a JSON file is
+    malformed or not such a list.
+    """
+    raw = uploaded_file.getvalue().decode("utf-8", errors="replace")
+    if not uploaded_file.name.lower().endswith(".json"):
+        return split_job_descriptions(raw)
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        raise ValueError("The uploaded file is not valid JSON.") from None
+    if not isinstance(data, list):
+        raise ValueError(
+            "The uploaded JSON file must hold a list of job descriptions "
+            '(strings or objects with a "description").'
+        )
+    job_descs = []
+    for item in data:
+        if isinstance(item, dict):
+            item = item.get("description", "")
+        if isinstance(item, str) and item.strip():
+            job_descs.append(item.strip())
+    return job_descs
+
+
+def adapt_resume_batch(resume, job_descs, api_key, max_workers=4, use_cache=True):
+    """Adapt ``resume`` to every job description on a bounded thread pool.
+
+    Yields ``(index, adapted_resume, from_cache, error)`` in completion order.
+    """
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            pool.submit(adapt_resume, resume, job_desc, api_key, use_cache): i
+            for i, job_desc in enumerate(job_descs)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                adapted, from_cache = future.result()
+            except Exception as e:
+                yield i, None, False, e
+            else:
+                yield i, adapted, from_cache, None
+    finally:
+        # When the script is stopped or rerun mid-batch, drop the queued
+        # calls instead of waiting for every one of them to finish.
+        pool.shutdown(wait=False, cancel_futures=True)
+
 
-    match = re.search(r"\{.*\}", response_text, re.DOTALL)
-    if match:
-        json_str = match.group(0)
+def _job_title(job_desc: str) -> str:
+    first_line = job_desc.strip().splitlines()[0]
+    return first_line if len(first_line) <= 60 else first_line[:57] + "..."
+
+
+def free_resume_names(prefix: str, count: int, taken):
+    """Return ``count`` names ``{prefix}_{n}`` not in ``taken``, lowest ``n``
+    first, so saving never overwrites an existing resume."""
+    names = []
+    n = 0
+    while len(names) < count:
+        n += 1
+        name = f"{prefix}_{n}"
+        if name not in taken:
+            names.append(name)
+    return names
+
+
+def batch_adaptation_section(user, selected_resume_name, resume_data, bypass_cache):
+    pasted = st.text_area(
+        "Paste Job Descriptions (separate postings with a line containing ---)"
+    )
+    uploaded = st.file_uploader(
+        "...or upload them (.txt/.md separated by ---, or a .json list)",
+        type=["txt", "md", "json"],
+    )
+    job_descs = split_job_descriptions(pasted)
+    if uploaded is not None:
         try:
-            adapted_resume = json.loads(json_str)
-            return adapted_resume
-        except Exception:
-            st.error(
-                "Groq LLM returned a response, but it was not valid JSON. Please try again or refine your prompt."
+            job_descs += read_job_descriptions_file(uploaded)
+        except ValueError as e:
+            st.error(str(e))
+    concurrency = st.slider("Concurrent requests", 1, 16, 4)
+    st.caption(f"{len(job_descs)} job description(s) ready.")
+
+    if st.button("Adapt for All Jobs", disabled=not job_descs):
+        api_key = get_groq_api_key()
+        if not api_key:
+            st.error("Groq API key not found in .env file.")
+            return
+        progress = st.progress(0.0, text=f"0/{len(job_descs)} adapted")
+        rows = [st.empty() for _ in job_descs]
+        for i, row in enumerate(rows):
+            row.markdown(f"⏳ Job {i + 1}: {_job_title(job_descs[i])}")
+        results = [None] * len(job_descs)
+        batch = adapt_resume_batch(
+            resume_data,
+            job_descs,
+            api_key,
+            max_workers=concurrency,
+            use_cache=not bypass_cache,
+        )
+        for done, (i, adapted, from_cache, error) in enumerate(batch, start=1):
+            title = _job_title(job_descs[i])
+            if error is not None:
+                rows[i].markdown(f"❌ Job {i + 1}: {title} — {error}")
+            else:
+                results[i] = adapted
+                note = " (cached)" if from_cache else ""
+                rows[i].markdown(f"✅ Job {i + 1}: {title}{note}")
+            progress.progress(
+                done / len(job_descs), text=f"{done}/{len(job_descs)} adapted"
             )
-            return None
-    else:
-        st.error(
-            "Groq LLM did not return any JSON. Please try again or refine your prompt."
+        # Keep results across the rerun triggered by the save button.
+        st.session_state["batch_adaptations"] = {
+            "resume": selected_resume_name,
+            "results": results,
+        }
+
+    batch_state = st.session_state.get("batch_adaptations")
+    if not batch_state or batch_state["resume"] != selected_resume_name:
+        return
+    succeeded = [(i, r) for i, r in enumerate(batch_state["results"]) if r]
+    if not succeeded:
+        return
+    prefix = st.text_input(
+        "Name prefix for the saved resumes", value=f"{selected_resume_name}_job"
+    )
+    if st.button(f"Save {len(succeeded)} Adapted Resumes"):
+        taken = {r["name"] for r in list_resumes(user)}
+        for _ in range(SAVE_ATTEMPTS):
+            names = free_resume_names(prefix, len(succeeded), taken)
+            new_resumes = {
+                name: adapted for name, (_, adapted) in zip(names, succeeded)
+            }
+            if not all(validate_resume_name(name) for name in new_resumes):
+                st.error("Invalid name prefix (letters, digits and underscores only).")
+                return
+            # Names taken since the listing (e.g. in another tab) are only
+            # reported back, never overwritten; pick again around them.
+            conflicts = save_resumes(user, new_resumes, insert_only=True)
+            if not conflicts:
+                break
+            taken.update(conflicts)
+        else:
+            st.error("Other saves keep taking these names. Please try again.")
+            return
+        st.session_state.pop("batch_adaptations", None)
+        st.success(
+            f"Saved {len(new_resumes)} adapted resumes: {', '.join(new_resumes)}."
         )
-        return None
 
 
 def resume_adapter_page():
@@ -58,39 +268,51 @@ def resume_adapter_page():
     if not user:
         st.warning("Please log in.")
         return
-    resumes = load_resumes(user)
+    resumes = list_resumes(user)
     if not resumes:
         st.info("No resumes found. Please create one first.")
         return
+    resume_search_box(user, "adapter_resume")
     selected_resume_name = st.selectbox(
-        "Select Resume to Adapt", [r["name"] for r in resumes]
+        "Select Resume to Adapt", [r["name"] for r in resumes], key="adapter_resume"
+    )
+    resume_data = get_resume(user, selected_resume_name)
+    mode = st.radio("Mode", ["Single job", "Batch"], horizontal=True)
+    bypass_cache = st.checkbox(
+        "Bypass response cache",
+        help="Always call Groq, even for a resume and job description seen before.",
     )
-    resume_data = next(r for r in resumes if r["name"] == selected_resume_name)
+    stats = cache_stats().get("adapt", {"hits": 0, "misses": 0})
+    st.caption(f"Response cache: {stats['hits']} hits, {stats['misses']} misses")
+    if mode == "Batch":
+        batch_adaptation_section(user, selected_resume_name, resume_data, bypass_cache)
+        return
     job_desc = st.text_area("Paste Job Description Here")
+    stream_output = st.checkbox(
+        "Stream output",
+        value=True,
+        help="Show each section as soon as the model finishes writing it.",
+    )
     if st.button("Adapt Resume"):
         api_key = get_groq_api_key()
         if not api_key:
             st.error("Groq API key not found in .env file.")
             return
+        on_section = streamed_section_renderer() if stream_output else None
         with st.spinner("Adapting resume using Groq LLM..."):
-            adapted = call_groq_api(resume_data, job_desc, api_key)
+            adapted = call_groq_api(
+                resume_data,
+                job_desc,
+                api_key,
+                use_cache=not bypass_cache,
+                on_section=on_section,
+            )
         if adapted:
             st.success("Resume adapted!")
             # Show editable form for adapted resume
             st.markdown("## Adapted Resume (Editable)")
-            edited_resume = json.loads(json.dumps(adapted))
-            for k, v in edited_resume.items():
-                if isinstance(v, str):
-                    edited_resume[k] = st.text_area(k.title(), value=v)
-                elif isinstance(v, list):
-                    st.markdown(f"### {k.title()}")
-                    for i, item in enumerate(v):
-                        for subk, subv in item.items():
-                            edited_resume[k][i][subk] = st.text_input(
-                                f"{k.title()} {i + 1} - {subk.title()}",
-                                value=subv,
-                                key=f"{k}_{subk}_{i}",
-                            )
+            # A fresh object from adapt_resume, so it can be edited in place.
+            edited_resume = render_resume_editor(adapted)
             # Save options
             if st.button("Save as New Resume"):
                 new_name = st.text_input("New Resume Name")
@@ -1,8 +1,204 @@
 # Resume builder forms
+import hashlib
+import json
+import os
+import time
 import streamlit as st
-from resume_storage import save_resume, load_resumes
+from instrumentation import inc
+from resume_components import (
+    render_contact_info,
+    render_section,
+    render_text_section,
+    resume_search_box,
+)
+from resume_storage import (
+    delete_resume,
+    diff_versions,
+    get_resume,
+    list_resumes,
+    list_versions,
+    restore_version,
+    save_resume,
+)
 from utils import validate_resume_name
 
+# Section title -> (resume key, entry fields or None for a single value,
+# whether entries have bullet points)
+SECTIONS = {
+    "Contact Info": ("contact", None, False),
+    "Summary": ("summary", None, False),
+    "Experience": (
+        "experience",
+        ["company", "title", "bullets", "start", "end", "tech_stack"],
+        True,
+    ),
+    "Education": ("education", ["school", "degree", "field", "start", "end"], False),
+    "Projects": ("projects", ["title", "bullets", "start", "end", "tech_stack"], True),
+    "Skills": ("skills", None, False),
+    "Certificates": ("certificates", ["name", "issuer", "date"], False),
+    "Publications": ("publications", ["title", "publisher", "date", "link"], False),
+}
+DEFAULT_SECTIONS = ["Contact Info", "Summary"]
+NEW_RESUME = "New Resume"
+
+# "Batched" puts every section's inputs in one form and autosaves the draft
+# once it has been unchanged for one interval; "Live" applies every input.
+EDIT_MODES = ("Batched (autosave)", "Live")
+BUILDER_AUTOSAVE_SECONDS = float(os.getenv("BUILDER_AUTOSAVE_SECONDS", "5"))
+
+
+def draft_hash(draft: dict) -> str:
+    return hashlib.sha256(
+        json.dumps(draft, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+def _render_section(title: str, draft: dict, key_prefix: str, in_form: bool):
+    key, fields, has_bullets = SECTIONS[title]
+    if key == "contact":
+        draft[key] = render_contact_info(draft, key_prefix)
+    elif fields is None:
+        draft[key] = render_text_section(title, key, draft, key_prefix)
+    else:
+        draft[key] = render_section(
+            title, fields, draft, has_bullets, key_prefix, in_form
+        )
+
+
+@st.fragment
+def section_editor(title: str, draft: dict, key_prefix: str):
+    """Edit one section of the draft.
+
+    As a fragment, its own widgets only rerun this function, not the page.
+    """
+    _render_section(title, draft, key_prefix, False)
+
+
+def batched_editor(titles, draft: dict, key_prefix: str) -> bool:
+    """Edit the given sections in one form and return whether Save was clicked.
+
+    Inputs reach the draft together when the form is submitted. Save Resume
+    is one of the form's submit buttons, so it always sees pending input.
+    """
+    with st.form(f"{key_prefix}form"):
+        for title in titles:
+            _render_section(title, draft, key_prefix, True)
+        cols = st.columns([1, 1])
+        with cols[0]:
+            st.form_submit_button("Apply changes", type="primary")
+        with cols[1]:
+            return st.form_submit_button("Save Resume")
+
+
+def draft_status(user: str, resume_name: str, enabled: bool = False):
+    """Show whether the draft has unsaved changes and, if ``enabled``,
+    save it once its content has stopped changing for one interval.
+
+    Nothing is written unless the draft differs from what was last saved.
+    """
+    draft = st.session_state.get("builder_draft")
+    if draft is None or st.session_state.get("builder_draft_of") != resume_name:
+        return
+    current = draft_hash(draft)
+    if current == st.session_state.get("builder_saved_hash"):
+        saved_at = st.session_state.get("builder_saved_at")
+        st.caption(f"All changes saved at {saved_at}." if saved_at else "No changes.")
+        return
+    if enabled and current == st.session_state.get("builder_pending_hash"):
+        save_resume(user, resume_name, draft)
+        inc("builder_autosaves_total")
+        st.session_state["builder_saved_hash"] = current
+        st.session_state["builder_saved_at"] = time.strftime("%H:%M:%S")
+        st.caption(f"Autosaved at {st.session_state['builder_saved_at']}.")
+        return
+    # Debounce: remember this version and save it if it is still current
+    # on the next tick.
+    st.session_state["builder_pending_hash"] = current
+    st.caption("Unsaved changes." + (" Autosaving…" if enabled else ""))
+
+
+@st.fragment(run_every=BUILDER_AUTOSAVE_SECONDS)
+def autosave_status(user: str, resume_name: str):
+    """:func:`draft_status` with autosave, rerun every interval.
+
+    Only called in Batched mode, so Live sessions never rerun on a timer.
+    """
+    draft_status(user, resume_name, enabled=True)
+
+
+def describe_patch(ops):
+    """Render JSON Patch operations as short ``+``/``-``/``~`` lines."""
+    symbols = {"add": "+", "remove": "-", "replace": "~"}
+    lines = []
+    for op in ops:
+        line = f"{symbols.get(op['op'], '?')} {op['path'] or '/'}"
+        if "value" in op:
+            value = json.dumps(op["value"])
+            line += f" = {value[:117] + '...' if len(value) > 120 else value}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _reload_draft():
+    # Drop the draft so the next run loads the restored version.
+    st.session_state.pop("builder_draft_of", None)
+    st.rerun()
+
+
+def version_history(user: str, resume_name: str):
+    """List saved versions, show what changed since one, and restore it."""
+    versions = list_versions(user, resume_name)
+    if not versions:
+        st.caption("No saved versions yet.")
+        return
+    labels = {
+        v["version"]: f"v{v['version']} · "
+        + time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(v["created_at"]))
+        for v in versions
+    }
+    current = versions[0]["version"]
+    selected = st.selectbox(
+        "Version", list(labels), format_func=labels.get, key="builder_history_version"
+    )
+    if selected != current:
+        ops = diff_versions(user, resume_name, selected, current)
+        if ops is None:
+            st.warning("This version is no longer available.")
+        else:
+            st.caption(f"Changes from v{selected} to the current version:")
+            st.code(describe_patch(ops) or "No differences.", language="diff")
+        if st.button(f"Restore v{selected}"):
+            if restore_version(user, resume_name, selected):
+                _reload_draft()
+            st.error("This version is no longer available.")
+    if len(versions) > 1 and st.button("Undo last save"):
+        if restore_version(user, resume_name, versions[1]["version"]):
+            _reload_draft()
+        st.error("The previous version is no longer available.")
+
+
+def load_draft(user: str, selected_resume: str):
+    """Return ``(draft, key_prefix)`` for the selected resume.
+
+    The draft lives in session state and collects edits from every section
+    fragment until it is saved; selecting another resume starts a new one.
+    """
+    if st.session_state.get("builder_draft_of") != selected_resume:
+        draft = {}
+        if selected_resume != NEW_RESUME:
+            resume = get_resume(user, selected_resume)
+            draft = resume.to_dict() if resume else {}
+        version = st.session_state.get("builder_draft_version", 0) + 1
+        st.session_state["builder_draft"] = draft
+        st.session_state["builder_draft_of"] = selected_resume
+        st.session_state["builder_draft_version"] = version
+        # Set after the first render, which normalizes the loaded data.
+        st.session_state["builder_saved_hash"] = None
+        st.session_state.pop("builder_saved_at", None)
+    # Fresh widget keys per draft, so no input keeps another resume's value.
+    prefix = f"builder{st.session_state['builder_draft_version']}_"
+    return st.session_state["builder_draft"], prefix
+
 
 def resume_builder_page():
     st.title("Resume Builder")
@@ -10,336 +206,109 @@ def resume_builder_page():
     if not user:
         st.warning("Please log in.")
         return
-    resumes = load_resumes(user)
+    resumes = list_resumes(user)
     st.subheader("Your Resumes")
+    resume_search_box(user, "builder_resume")
     selected_resume = st.selectbox(
-        "Select Resume", [r["name"] for r in resumes] + ["New Resume"]
+        "Select Resume",
+        [r["name"] for r in resumes] + [NEW_RESUME],
+        key="builder_resume",
     )
-    if selected_resume == "New Resume":
+    if selected_resume == NEW_RESUME:
         resume_name = st.text_input("Resume Name")
         if not validate_resume_name(resume_name):
             st.error("Invalid or duplicate resume name.")
             return
-        resume_data = {}
     else:
-        resume_data = next(r for r in resumes if r["name"] == selected_resume)
-        resume_name = resume_data["name"]
+        resume_name = selected_resume
+    draft, key_prefix = load_draft(user, selected_resume)
+    batched = st.radio("Editing mode", EDIT_MODES, horizontal=True) == EDIT_MODES[0]
 
     # Section selection
-    all_sections = [
-        "Contact Info",
-        "Summary",
-        "Experience",
-        "Education",
-        "Projects",
-        "Skills",
-        "Certificates",
-        "Publications",
-    ]
-    # Only use valid section names for default
     valid_defaults = [
-        s
-        for s in (resume_data.keys() if resume_data else ["Contact Info", "Summary"])
-        if s in all_sections
-    ]
+        title for title, (key, _, _) in SECTIONS.items() if key in draft
+    ] or DEFAULT_SECTIONS
     selected_sections = st.multiselect(
-        "Select sections to add", all_sections, default=valid_defaults
+        "Select sections to add", list(SECTIONS), default=valid_defaults
     )
-
-    # Contact Info (now before Summary)
-    if "Contact Info" in selected_sections:
-        st.subheader("Contact Info")
-        contact = resume_data.get("contact", {})
-        contact["full_name"] = st.text_input(
-            "Full Name", value=contact.get("full_name", "")
-        )
-        contact["phone"] = st.text_input("Phone Number", value=contact.get("phone", ""))
-        contact["email"] = st.text_input("Email", value=contact.get("email", ""))
-        contact["location"] = st.text_input(
-            "Location", value=contact.get("location", "")
-        )
-        contact["linkedin"] = st.text_input(
-            "LinkedIn", value=contact.get("linkedin", "")
-        )
-        contact["github"] = st.text_input("GitHub", value=contact.get("github", ""))
-        resume_data["contact"] = contact
-
-    # Summary (after Contact Info)
-    if "Summary" in selected_sections:
-        st.subheader("Summary")
-        resume_data["summary"] = st.text_area(
-            "Summary", value=resume_data.get("summary", "")
-        )
-
-    # Helper for multi-entry sections
-    def multi_entry_section(section, fields):
-        st.subheader(section)
-        entries = resume_data.get(section.lower(), [])
-        if f"{section}_count" not in st.session_state:
-            st.session_state[f"{section}_count"] = len(entries) if entries else 1
-        # count = st.session_state[f"{section}_count"]
-        if st.button(f"+ Add {section}"):
-            st.session_state[f"{section}_count"] += 1
-        # Remove entry by index
-        remove_indices = []
-        entries = entries[: st.session_state[f"{section}_count"]]
-        while len(entries) < st.session_state[f"{section}_count"]:
-            entries.append({f: "" for f in fields})
-        for i in range(st.session_state[f"{section}_count"]):
-            cols = st.columns([6, 1])
-            with cols[0]:
-                st.markdown(f"**{section} {i + 1}**")
-                for f in fields:
-                    # For 'end' field in Experience, Education, Projects, add 'Present' option
-                    if f == "end" and section in [
-                        "Experience",
-                        "Education",
-                        "Projects",
-                    ]:
-                        present_key = f"{section}_present_{i}"
-                        is_present = st.checkbox(
-                            "Present",
-                            value=entries[i].get("present", False),
-                            key=present_key,
-                        )
-                        if is_present:
-                            entries[i][f] = "Present"
-                            entries[i]["present"] = True
-                        else:
-                            entries[i][f] = st.text_input(
-                                f"{f.title()} {i + 1}",
-                                value=entries[i].get(f, ""),
-                                key=f"{section}_{f}_{i}",
-                            )
-                            entries[i]["present"] = False
-                    else:
-                        entries[i][f] = st.text_input(
-                            f"{f.title()} {i + 1}",
-                            value=entries[i].get(f, ""),
-                            key=f"{section}_{f}_{i}",
-                        )
-            with cols[1]:
-                if st.button("Remove", key=f"remove_{section}_{i}"):
-                    remove_indices.append(i)
-        # Actually remove marked entries
-        if remove_indices:
-            for idx in sorted(remove_indices, reverse=True):
-                entries.pop(idx)
-            st.session_state[f"{section}_count"] = len(entries)
-        resume_data[section.lower()] = entries
-
-    # Experience
-    if "Experience" in selected_sections:
-        def experience_section():
-            section = "Experience"
-            fields = ["company", "title", "bullets", "start", "end", "tech_stack"]
-            st.subheader(section)
-            entries = resume_data.get(section.lower(), [])
-            if f"{section}_count" not in st.session_state:
-                st.session_state[f"{section}_count"] = len(entries) if entries else 1
-            if st.button(f"+ Add {section}"):
-                st.session_state[f"{section}_count"] += 1
-            remove_indices = []
-            entries = entries[: st.session_state[f"{section}_count"]]
-            while len(entries) < st.session_state[f"{section}_count"]:
-                entries.append({f: "" for f in fields})
-                entries[-1]["bullets"] = [""]
-            for i in range(st.session_state[f"{section}_count"]):
-                cols = st.columns([6, 1])
-                with cols[0]:
-                    st.markdown(f"**{section} {i + 1}**")
-                    for f in fields:
-                        if f == "bullets":
-                            # Bullet point logic inspired by projects section
-                            if f"bullets_count_{i}" not in st.session_state:
-                                existing_bullets = entries[i].get("bullets", [])
-                                if isinstance(existing_bullets, str):
-                                    existing_bullets = [existing_bullets]
-                                st.session_state[f"bullets_count_{i}"] = len(existing_bullets) if existing_bullets else 1
-                            bullets = entries[i].get("bullets", [])
-                            if isinstance(bullets, str):
-                                bullets = [bullets]
-                            bullets = bullets[: st.session_state[f"bullets_count_{i}"]]
-                            while len(bullets) < st.session_state[f"bullets_count_{i}"]:
-                                bullets.append("")
-                            for j in range(st.session_state[f"bullets_count_{i}"]):
-                                bullets[j] = st.text_input(
-                                    f"Experience {i + 1} - Bullet {j + 1}",
-                                    value=bullets[j],
-                                    key=f"exp_{i}_bullet_{j}",
-                                )
-                            bullet_cols = st.columns([1, 1])
-                            with bullet_cols[0]:
-                                if st.button("+ Add Bullet", key=f"add_bullet_{i}"):
-                                    st.session_state[f"bullets_count_{i}"] += 1
-                            with bullet_cols[1]:
-                                if st.button("Remove Bullet", key=f"remove_bullet_{i}"):
-                                    if st.session_state[f"bullets_count_{i}"] > 1:
-                                        st.session_state[f"bullets_count_{i}"] -= 1
-                            entries[i]["bullets"] = bullets[: st.session_state[f"bullets_count_{i}"]]
-                        elif f == "end":
-                            present_key = f"{section}_present_{i}"
-                            is_present = st.checkbox(
-                                "Present",
-                                value=entries[i].get("present", False),
-                                key=present_key
-                            )
-                            if is_present:
-                                entries[i][f] = "Present"
-                                entries[i]["present"] = True
-                            else:
-                                entries[i][f] = st.text_input(
-                                    f"{f.title()} {i + 1}",
-                                    value=entries[i].get(f, ""),
-                                    key=f"{section}_{f}_{i}"
-                                )
-                                entries[i]["present"] = False
-                        else:
-                            entries[i][f] = st.text_input(f, value=entries[i].get(f, ""), key=f"{section}_{f}_{i}")
-                with cols[1]:
-                    if st.button("Remove", key=f"remove_{section}_{i}"):
-                        remove_indices.append(i)
-            if remove_indices:
-                for idx in sorted(remove_indices, reverse=True):
-                    entries.pop(idx)
-                st.session_state[f"{section}_count"] = len(entries)
-            resume_data[section.lower()] = entries
-        experience_section()
-
-    # Education
-    if "Education" in selected_sections:
-        multi_entry_section("Education", ["school", "degree", "field", "start", "end"])
-
-    # Projects
-    if "Projects" in selected_sections:
-        def projects_section():
-            section = "Projects"
-            fields = ["title", "bullets", "start", "end", "tech_stack"]
-            st.subheader(section)
-            entries = resume_data.get(section.lower(), [])
-            if f"{section}_count" not in st.session_state:
-                st.session_state[f"{section}_count"] = len(entries) if entries else 1
-            if st.button(f"+ Add {section}"):
-                st.session_state[f"{section}_count"] += 1
-            remove_indices = []
-            entries = entries[: st.session_state[f"{section}_count"]]
-            while len(entries) < st.session_state[f"{section}_count"]:
-                entries.append({f: "" for f in fields})
-                entries[-1]["bullets"] = [""]
-            for i in range(st.session_state[f"{section}_count"]):
-                cols = st.columns([6, 1])
-                with cols[0]:
-                    st.markdown(f"**{section} {i + 1}**")
-                    for f in fields:
-                        if f == "bullets":
-                            if f"bullets_count_{section}_{i}" not in st.session_state:
-                                existing_bullets = entries[i].get("bullets", [])
-                                if isinstance(existing_bullets, str):
-                                    existing_bullets = [existing_bullets]
-                                st.session_state[f"bullets_count_{section}_{i}"] = len(existing_bullets) if existing_bullets else 1
-                            bullets = entries[i].get("bullets", [])
-                            if isinstance(bullets, str):
-                                bullets = [bullets]
-                            bullets = bullets[: st.session_state[f"bullets_count_{section}_{i}"]]
-                            while len(bullets) < st.session_state[f"bullets_count_{section}_{i}"]:
-                                bullets.append("")
-                            for j in range(st.session_state[f"bullets_count_{section}_{i}"]):
-                                bullets[j] = st.text_input(
-                                    f"Project {i + 1} - Bullet {j + 1}",
-                                    value=bullets[j],
-                                    key=f"proj_{i}_bullet_{j}",
-                                )
-                            bullet_cols = st.columns([1, 1])
-                            with bullet_cols[0]:
-                                if st.button("+ Add Bullet", key=f"add_bullet_{section}_{i}"):
-                                    st.session_state[f"bullets_count_{section}_{i}"] += 1
-                            with bullet_cols[1]:
-                                if st.button("Remove Bullet", key=f"remove_bullet_{section}_{i}"):
-                                    if st.session_state[f"bullets_count_{section}_{i}"] > 1:
-                                        st.session_state[f"bullets_count_{section}_{i}"] -= 1
-                            entries[i]["bullets"] = bullets[: st.session_state[f"bullets_count_{section}_{i}"]]
-                        else:
-                            entries[i][f] = st.text_input(f, value=entries[i].get(f, ""), key=f"{section}_{f}_{i}")
-                with cols[1]:
-                    if st.button("Remove", key=f"remove_{section}_{i}"):
-                        remove_indices.append(i)
-            if remove_indices:
-                for idx in sorted(remove_indices, reverse=True):
-                    entries.pop(idx)
-                st.session_state[f"{section}_count"] = len(entries)
-            resume_data[section.lower()] = entries
-        projects_section()
-
-    # Skills
-    if "Skills" in selected_sections:
-        st.subheader("Skills")
-        resume_data["skills"] = st.text_area(
-            "Skills", value=resume_data.get("skills", "")
-        )
-
-    # Certificates
-    if "Certificates" in selected_sections:
-        multi_entry_section("Certificates", ["name", "issuer", "date"])
-
-    # Publications
-    if "Publications" in selected_sections:
-        multi_entry_section("Publications", ["title", "publisher", "date", "link"])
+    titles = [title for title in SECTIONS if title in selected_sections]
+    if batched:
+        save_clicked = batched_editor(titles, draft, key_prefix)
+    else:
+        for title in titles:
+            section_editor(title, draft, key_prefix)
+    # A new resume has no saved baseline until its first save creates it.
+    if selected_resume != NEW_RESUME and st.session_state["builder_saved_hash"] is None:
+        st.session_state["builder_saved_hash"] = draft_hash(draft)
 
     # Save/update/duplicate
-    if st.button("Save Resume"):
-        save_resume(user, resume_name, resume_data)
-        st.success("Resume saved.")
+    if not batched:
+        save_clicked = st.button("Save Resume")
+    if save_clicked:
+        current = draft_hash(draft)
+        if current == st.session_state["builder_saved_hash"]:
+            st.info("No changes to save.")
+        else:
+            save_resume(user, resume_name, draft)
+            st.session_state["builder_saved_hash"] = current
+            st.session_state["builder_saved_at"] = time.strftime("%H:%M:%S")
+            st.success("Resume saved.")
+    if selected_resume == NEW_RESUME:
+        st.caption("Autosave starts once the resume has been saved.")
+    elif batched:
+        autosave_status(user, resume_name)
+    else:
+        draft_status(user, resume_name)
 
     # Visualize Resume
-    if selected_resume != "New Resume":
+    if selected_resume != NEW_RESUME:
         st.markdown("### Actions")
         if st.button("Visualize Resume"):
             st.markdown("## Resume Preview")
-            preview = next((r for r in resumes if r["name"] == selected_resume), None)
-            if preview:
-                contact = preview.get("contact", {})
+            preview = get_resume(user, selected_resume)
+            if preview and preview.sections():
+                contact = preview.contact
                 if contact:
                     st.markdown(
-                        f"**Contact Info**: {contact.get('phone', '')} | {contact.get('email', '')} | {contact.get('location', '')} | [LinkedIn]({contact.get('linkedin', '')}) | [GitHub]({contact.get('github', '')})"
+                        f"**Contact Info**: {contact.phone} | {contact.email} | {contact.location} | [LinkedIn]({contact.linkedin}) | [GitHub]({contact.github})"
                     )
-                if preview.get("summary"):
-                    st.markdown(f"**Summary**: {preview['summary']}")
-                if preview.get("experience"):
+                if preview.summary:
+                    st.markdown(f"**Summary**: {preview.summary}")
+                if preview.experience:
                     st.markdown("**Experience**:")
-                    for exp in preview["experience"]:
+                    for exp in preview.experience:
                         st.markdown(
-                            f"- **{exp.get('title', '')}** at {exp.get('company', '')} ({exp.get('start', '')} - {exp.get('end', '')})\n  {exp.get('bullets', '')}"
+                            f"- **{exp.title}** at {exp.company} ({exp.start} - {exp.end})\n  {'; '.join(exp.bullets)}"
                         )
-                if preview.get("education"):
+                if preview.education:
                     st.markdown("**Education**:")
-                    for edu in preview["education"]:
+                    for edu in preview.education:
                         st.markdown(
-                            f"- **{edu.get('degree', '')}** in {edu.get('field', '')} at {edu.get('school', '')} ({edu.get('start', '')} - {edu.get('end', '')})"
+                            f"- **{edu.degree}** in {edu.field} at {edu.school} ({edu.start} - {edu.end})"
                         )
-                if preview.get("projects"):
+                if preview.projects:
                     st.markdown("**Projects**:")
-                    for proj in preview["projects"]:
+                    for proj in preview.projects:
                         st.markdown(
-                            f"- **{proj.get('title', '')}**: {proj.get('description', '')} [Tech: {proj.get('tech', '')}] [Link]({proj.get('link', '')})"
+                            f"- **{proj.title}**: {'; '.join(proj.bullets)} [Tech: {proj.tech_stack}] [Link]({proj.link})"
                         )
-                if preview.get("skills"):
-                    st.markdown(f"**Skills**: {preview['skills']}")
-                if preview.get("certificates"):
+                if preview.skills:
+                    st.markdown(f"**Skills**: {preview.skills}")
+                if preview.certificates:
                     st.markdown("**Certificates**:")
-                    for cert in preview["certificates"]:
-                        st.markdown(
-                            f"- {cert.get('name', '')} ({cert.get('issuer', '')}, {cert.get('date', '')})"
-                        )
-                if preview.get("publications"):
+                    for cert in preview.certificates:
+                        st.markdown(f"- {cert.name} ({cert.issuer}, {cert.date})")
+                if preview.publications:
                     st.markdown("**Publications**:")
-                    for pub in preview["publications"]:
+                    for pub in preview.publications:
                         st.markdown(
-                            f"- {pub.get('title', '')} ({pub.get('publisher', '')}, {pub.get('date', '')}) [Link]({pub.get('link', '')})"
+                            f"- {pub.title} ({pub.publisher}, {pub.date}) [Link]({pub.link})"
                         )
             else:
                 st.info("No resume data to preview.")
+        with st.expander("Version history"):
+            version_history(user, resume_name)
         if st.button("Delete Resume"):
-            from resume_storage import delete_resume
-
             delete_resume(user, resume_name)
+            st.session_state.pop("builder_draft_of", None)
             st.success(f"Resume '{resume_name}' deleted.")
@@ -1,20 +1,29 @@
 """Resume components module for handling different sections of a resume."""
 
-from typing import Dict, List, Any, Optional
+import re
+from typing import Dict, List, Any
 import streamlit as st
+from resume_model import ENTRY_TYPES, TEXT_SECTIONS, Resume
+from resume_storage import RESUME_SEARCH, search_resumes
 
+# Multi-entry sections whose "end" field can be replaced by a "Present" checkbox.
+PRESENT_SECTIONS = ("Experience", "Education", "Projects")
 
-def render_contact_info(resume_data: Dict[str, Any]) -> Dict[str, str]:
+
+def render_contact_info(
+    resume_data: Dict[str, Any], key_prefix: str = ""
+) -> Dict[str, str]:
     """Render the contact information section of the resume.
 
     Args:
         resume_data: Dictionary containing resume data
+        key_prefix: Prefix for widget keys, to keep several editors apart
 
     Returns:
         Updated contact information dictionary
     """
     st.subheader("Contact Info")
-    contact = resume_data.get("contact", {})
+    contact = resume_data.get("contact") or {}
     fields = {
         "full_name": "Full Name",
         "phone": "Phone Number",
@@ -25,71 +34,143 @@ def render_contact_info(resume_data: Dict[str, Any]) -> Dict[str, str]:
     }
 
     for field, label in fields.items():
-        contact[field] = st.text_input(label, value=contact.get(field, ""))
+        contact[field] = st.text_input(
+            label, value=contact.get(field, ""), key=f"{key_prefix}contact_{field}"
+        )
 
     return contact
 
 
-def render_text_section(title: str, key: str, resume_data: Dict[str, Any]) -> str:
+def render_text_section(
+    title: str, key: str, resume_data: Dict[str, Any], key_prefix: str = ""
+) -> str:
     """Render a simple text section (like Summary or Skills).
 
     Args:
         title: Section title to display
         key: Dictionary key for the section
         resume_data: Dictionary containing resume data
+        key_prefix: Prefix for widget keys, to keep several editors apart
 
     Returns:
         Updated text content
     """
     st.subheader(title)
-    return st.text_area(title, value=resume_data.get(key, ""))
+    return st.text_area(title, value=resume_data.get(key, ""), key=f"{key_prefix}{key}")
+
+
+def _add_to_count(count_key: str, delta: int, minimum: int = 0) -> None:
+    st.session_state[count_key] = max(minimum, st.session_state[count_key] + delta)
+
+
+def _clear_widget_state(prefix: str, keep: str) -> None:
+    # Entry widgets are keyed by position; after a removal they must
+    # re-initialize from the data instead of keeping their old positions.
+    for key in list(st.session_state.keys()):
+        if isinstance(key, str) and key.startswith(prefix) and key != keep:
+            del st.session_state[key]
+
+
+def _button(in_form: bool):
+    # Inside st.form only submit buttons are allowed; they apply the form too.
+    return st.form_submit_button if in_form else st.button
+
+
+def _sync_entries(entries: List[Dict[str, Any]], fields: List[str], prefix: str):
+    # Copy widget values (e.g. unsaved form input) into the entries before
+    # their positional widget state is thrown away.
+    for i, entry in enumerate(entries):
+        for f in fields:
+            if f == "bullets":
+                count = st.session_state.get(f"{prefix}bullets_count_{i}")
+                if count is None:
+                    continue
+                old = entry.get("bullets") or []
+                entry["bullets"] = [
+                    st.session_state.get(
+                        f"{prefix}{i}_bullet_{j}", old[j] if j < len(old) else ""
+                    )
+                    for j in range(count)
+                ]
+            elif f"{prefix}{f}_{i}" in st.session_state:
+                entry[f] = st.session_state[f"{prefix}{f}_{i}"]
+        if st.session_state.get(f"{prefix}present_{i}"):
+            entry["present"] = True
+            entry["end"] = "Present"
+        elif f"{prefix}present_{i}" in st.session_state:
+            entry["present"] = False
+
+
+def _remove_entry(
+    entries: List[Dict[str, Any]],
+    fields: List[str],
+    i: int,
+    prefix: str,
+    count_key: str,
+) -> None:
+    _sync_entries(entries, fields, prefix)
+    if i < len(entries):
+        entries.pop(i)
+    st.session_state[count_key] = len(entries)
+    _clear_widget_state(prefix, count_key)
 
 
-def handle_bullets(entries: List[Dict[str, Any]], i: int, section: str) -> List[str]:
+def handle_bullets(
+    entries: List[Dict[str, Any]],
+    i: int,
+    section: str,
+    key_prefix: str = "",
+    in_form: bool = False,
+) -> List[str]:
     """Handle bullet points for a section entry.
 
     Args:
         entries: List of section entries
         i: Current entry index
         section: Section name
+        key_prefix: Prefix for widget keys, to keep several editors apart
+        in_form: Whether the entry is rendered inside ``st.form``
 
     Returns:
         List of bullet points
     """
-    if f"bullets_count_{i}" not in st.session_state:
-        existing_bullets = entries[i].get("bullets", [])
-        if isinstance(existing_bullets, str):
-            existing_bullets = [existing_bullets]
-        st.session_state[f"bullets_count_{i}"] = (
-            len(existing_bullets) if existing_bullets else 1
-        )
-
-    bullets = entries[i].get("bullets", [])
-    if isinstance(bullets, str):
-        bullets = [bullets]
-    bullets = bullets[: st.session_state[f"bullets_count_{i}"]]
-
-    while len(bullets) < st.session_state[f"bullets_count_{i}"]:
+    prefix = f"{key_prefix}{section}_"
+    count_key = f"{prefix}bullets_count_{i}"
+    bullets = list(entries[i].get("bullets") or [])
+    if count_key not in st.session_state:
+        st.session_state[count_key] = len(bullets) if bullets else 1
+    count = st.session_state[count_key]
+
+    bullets = bullets[:count]
+    while len(bullets) < count:
         bullets.append("")
 
-    for j in range(st.session_state[f"bullets_count_{i}"]):
+    for j in range(count):
         bullets[j] = st.text_input(
             f"{section} {i + 1} - Bullet {j + 1}",
             value=bullets[j],
-            key=f"{section.lower()}_{i}_bullet_{j}",
+            key=f"{prefix}{i}_bullet_{j}",
         )
 
     bullet_cols = st.columns([1, 1])
+    button = _button(in_form)
     with bullet_cols[0]:
-        if st.button("+ Add Bullet", key=f"add_bullet_{section}_{i}"):
-            st.session_state[f"bullets_count_{i}"] += 1
+        button(
+            "+ Add Bullet",
+            key=f"{prefix}add_bullet_{i}",
+            on_click=_add_to_count,
+            args=(count_key, 1),
+        )
 
     with bullet_cols[1]:
-        if st.button("Remove Bullet", key=f"remove_bullet_{section}_{i}"):
-            if st.session_state[f"bullets_count_{i}"] > 1:
-                st.session_state[f"bullets_count_{i}"] -= 1
+        button(
+            "Remove Bullet",
+            key=f"{prefix}remove_bullet_{i}",
+            on_click=_add_to_count,
+            args=(count_key, -1, 1),
+        )
 
-    return bullets[: st.session_state[f"bullets_count_{i}"]]
+    return bullets
 
 
 def render_section_entry(
@@ -98,37 +179,62 @@ def render_section_entry(
     entries: List[Dict[str, Any]],
     i: int,
     has_bullets: bool = False,
-) -> Optional[Dict[str, Any]]:
+    key_prefix: str = "",
+    in_form: bool = False,
+) -> Dict[str, Any]:
     """Render a single entry in a section.
 
+    The entry is updated in place. Its "Remove" button deletes it from
+    ``entries`` before the next run.
+
     Args:
         section: Section name
         fields: List of field names
         entries: List of section entries
         i: Current entry index
         has_bullets: Whether the section has bullet points
+        key_prefix: Prefix for widget keys, to keep several editors apart
+        in_form: Whether the entry is rendered inside ``st.form``
 
     Returns:
-        Updated entry dictionary or None if entry should be removed
+        Updated entry dictionary
     """
+    prefix = f"{key_prefix}{section}_"
     cols = st.columns([6, 1])
     entry = entries[i]
 
     with cols[0]:
         st.markdown(f"**{section} {i + 1}**")
         for f in fields:
+            label = f"{f.replace('_', ' ').title()} {i + 1}"
             if f == "bullets" and has_bullets:
-                entry["bullets"] = handle_bullets(entries, i, section)
+                entry["bullets"] = handle_bullets(
+                    entries, i, section, key_prefix, in_form
+                )
+            elif f == "end" and section in PRESENT_SECTIONS:
+                entry["present"] = st.checkbox(
+                    "Present",
+                    value=bool(entry.get("present", False)),
+                    key=f"{prefix}present_{i}",
+                )
+                if entry["present"]:
+                    entry["end"] = "Present"
+                else:
+                    entry["end"] = st.text_input(
+                        label, value=entry.get("end", ""), key=f"{prefix}end_{i}"
+                    )
             else:
                 entry[f] = st.text_input(
-                    f"{f.title()} {i + 1}",
-                    value=entry.get(f, ""),
-                    key=f"{section}_{f}_{i}",
+                    label, value=entry.get(f, ""), key=f"{prefix}{f}_{i}"
                 )
 
     with cols[1]:
-        if st.button("Remove", key=f"remove_{section}_{i}"):
-            return None
+        _button(in_form)(
+            "Remove",
+            key=f"{prefix}remove_{i}",
+            on_click=_remove_entry,
+            args=(entries, fields, i, prefix, f"{prefix}count"),
+        )
 
     return entry
 
@@ -138,6 +244,8 @@ def render_section(
     fields: List[str],
     resume_data: Dict[str, Any],
     has_bullets: bool = False,
+    key_prefix: str = "",
+    in_form: bool = False,
 ) -> List[Dict[str, Any]]:
     """Render a complete section of the resume.
 
@@ -146,30 +254,192 @@ def render_section(
         fields: List of field names
         resume_data: Dictionary containing resume data
         has_bullets: Whether the section has bullet points
+        key_prefix: Prefix for widget keys, to keep several editors apart
+        in_form: Whether the section is rendered inside ``st.form``
 
     Returns:
-        Updated list of entries for the section
+        Updated list of entries for the section (also stored in
+        ``resume_data``)
     """
     st.subheader(section)
-    entries = resume_data.get(section.lower(), [])
+    prefix = f"{key_prefix}{section}_"
+    count_key = f"{prefix}count"
+    entries = resume_data.get(section.lower()) or []
+
+    if count_key not in st.session_state:
+        st.session_state[count_key] = len(entries) if entries else 1
+
+    _button(in_form)(
+        f"+ Add {section}",
+        key=f"{prefix}add",
+        on_click=_add_to_count,
+        args=(count_key, 1),
+    )
+
+    count = st.session_state[count_key]
+    entries = entries[:count]
+    while len(entries) < count:
+        entries.append({f: ([""] if f == "bullets" else "") for f in fields})
+    # Remove buttons edit this list, so it must be the one kept in resume_data.
+    resume_data[section.lower()] = entries
+
+    for i in range(count):
+        render_section_entry(
+            section, fields, entries, i, has_bullets, key_prefix, in_form
+        )
+
+    return entries
 
-    if f"{section}_count" not in st.session_state:
-        st.session_state[f"{section}_count"] = len(entries) if entries else 1
 
-    if st.button(f"+ Add {section}"):
-        st.session_state[f"{section}_count"] += 1
+def _field_label(name: str) -> str:
+    return name.replace("_", " ").title()
 
-    entries = entries[: st.session_state[f"{section}_count"]]
-    while len(entries) < st.session_state[f"{section}_count"]:
-        entries.append({f: "" for f in fields})
 
-    updated_entries = []
-    for i in range(st.session_state[f"{section}_count"]):
-        entry = render_section_entry(section, fields, entries, i, has_bullets)
-        if entry is not None:
-            updated_entries.append(entry)
+def render_resume_editor(resume: Resume, key_prefix: str = "") -> Resume:
+    """Render an editable form for every section of a resume.
 
-    if len(updated_entries) < len(entries):
-        st.session_state[f"{section}_count"] = len(updated_entries)
+    Used for model output (adapted or enhanced resumes), whose sections are
+    already fixed. The resume is updated in place, so pass a fresh object
+    rather than one that is shared or cached.
 
-    return updated_entries
+    Args:
+        resume: Resume to edit
+        key_prefix: Prefix for widget keys, to keep several editors apart
+
+    Returns:
+        The same resume, with the widget values applied
+    """
+    prefix = f"{key_prefix}edit_"
+    if resume.contact is not None:
+        st.markdown("### Contact")
+        for name in type(resume.contact).__dataclass_fields__:
+            setattr(
+                resume.contact,
+                name,
+                st.text_input(
+                    _field_label(name),
+                    value=getattr(resume.contact, name),
+                    key=f"{prefix}contact_{name}",
+                ),
+            )
+    for key in TEXT_SECTIONS:
+        if getattr(resume, key) is not None:
+            setattr(
+                resume,
+                key,
+                st.text_area(
+                    _field_label(key), value=getattr(resume, key), key=f"{prefix}{key}"
+                ),
+            )
+    for key in ENTRY_TYPES:
+        entries = getattr(resume, key)
+        if not entries:
+            continue
+        st.markdown(f"### {_field_label(key)}")
+        for i, entry in enumerate(entries):
+            for name in type(entry).__dataclass_fields__:
+                label = f"{_field_label(key)} {i + 1} - {_field_label(name)}"
+                widget_key = f"{prefix}{key}_{name}_{i}"
+                if name == "bullets":
+                    text = st.text_area(
+                        f"{label} (one per line)",
+                        value="\n".join(entry.bullets),
+                        key=widget_key,
+                    )
+                    entry.bullets = [b for b in text.splitlines() if b.strip()]
+                elif name == "present":
+                    entry.present = st.checkbox(
+                        label, value=entry.present, key=widget_key
+                    )
+                else:
+                    setattr(
+                        entry,
+                        name,
+                        st.text_input(
+                            label, value=getattr(entry, name), key=widget_key
+                        ),
+                    )
+    return resume
+
+
+def render_streamed_section(key: str, value: Any) -> None:
+    """Render one top-level resume section as it arrives from a streamed LLM response.
+
+    Args:
+        key: Top-level JSON key of the section (e.g. ``experience``)
+        value: Parsed section value
+    """
+    st.markdown(f"#### {key.replace('_', ' ').title()}")
+    if isinstance(value, str):
+        st.markdown(value)
+    else:
+        st.json(value, expanded=False)
+
+
+def streamed_section_renderer():
+    """Create a callback that renders streamed sections into a fresh container.
+
+    Returns:
+        Callable taking ``(key, value)``, suitable as an ``on_section`` hook
+    """
+    container = st.container()
+
+    def render(key: str, value: Any) -> None:
+        with container:
+            render_streamed_section(key, value)
+
+    return render
+
+
+# Private-use characters around matched words; they cannot occur in the
+# escaped text, unlike any Markdown marker.
+_MATCH_START, _MATCH_END = "\ue000", "\ue001"
+_MARKDOWN_SPECIAL = re.compile(r"([\\`*_{}\[\]()#+\-.!|<>~$])")
+
+
+def _markdown_text(text: str) -> str:
+    return _MARKDOWN_SPECIAL.sub(r"\\\1", " ".join(text.split()))
+
+
+def _select_resume(select_key: str, name: str) -> None:
+    st.session_state[select_key] = name
+
+
+def resume_search_box(user: str, select_key: str, limit: int = 10) -> None:
+    """Render a search box over the user's resumes with ranked matches.
+
+    Each match shows an excerpt with the matched words highlighted, and an
+    "Open" button that selects the resume in the page's selectbox.
+
+    Args:
+        user: Owner of the resumes to search
+        select_key: Widget key of the selectbox listing the resumes
+        limit: Maximum number of matches to show
+    """
+    if not RESUME_SEARCH:
+        return
+    query = st.text_input(
+        "Search resumes",
+        key=f"{select_key}_search",
+        placeholder="Skills, technologies, experience…",
+    )
+    if not query.strip():
+        return
+    results = search_resumes(user, query, limit, (_MATCH_START, _MATCH_END))
+    if not results:
+        st.caption("No matching resumes.")
+        return
+    for result in results:
+        snippet = (
+            _markdown_text(result["snippet"])
+            .replace(_MATCH_START, "**")
+            .replace(_MATCH_END, "**")
+        )
+        cols = st.columns([6, 1])
+        cols[0].markdown(f"**{_markdown_text(result['name'])}** · {snippet}")
+        cols[1].button(
+            "Open",
+            key=f"{select_key}_open_{result['name']}",
+            on_click=_select_resume,
+            args=(select_key, result["name"]),
+        )
@@ -1,50 +1,142 @@
 # Resume enhancement via Groq API
 import streamlit as st
 
-import json
-from resume_storage import load_resumes, save_resume
+from resume_storage import get_resume, list_resumes, save_resume
 from utils import get_groq_api_key
-from langchain_groq import ChatGroq
+from llm_cache import cache_stats, get_cached, make_key, put_cached
+from llm_client import DEFAULT_MODEL_NAME, get_llm
+from llm_response import invoke_json
+from prompt_builder import build_prompt, compact_resume, restore_ui_fields
+from resume_components import (
+    render_resume_editor,
+    resume_search_box,
+    streamed_section_renderer,
+)
+from resume_model import Resume, resume_from_reply
 
+# Bump PROMPT_VERSION whenever the prompt changes so cached responses expire.
+PROMPT_VERSION = "enhance-v4"
+MODEL_NAME = DEFAULT_MODEL_NAME
+TEMPERATURE = 1
 
-def call_groq_enhance_api(resume, api_key):
-    llm = ChatGroq(
-        groq_api_key=api_key,
-        model_name="openai/gpt-oss-20b",
-        temperature=1,
+ENHANCE_PROMPT = """You are an expert resume coach and professional writer. Your job is to:
+- Analyze the resume sections below for clarity, impact, and relevance to modern hiring standards.
+- Rewrite and enhance each section to maximize achievements, skills, and strengths, using strong action verbs and quantifiable results wherever possible.
+- Ensure the resume is ATS-friendly, concise, and tailored for high-impact roles in tech, business, or academia.
+- Provide constructive feedback and suggestions for further improvement.
+- Return ONLY the result as a JSON object with the same keys and structure as the input sections, and a 'feedback' field with your suggestions. Do not include any explanation or extra text, only the JSON object.
+Resume sections:
+{resume}
+"""
+
+
+def _section_cache_key(section, value):
+    return make_key(
+        "enhance-section",
+        {section: value},
+        None,
+        MODEL_NAME,
+        TEMPERATURE,
+        PROMPT_VERSION,
     )
-    prompt = f"""
-    You are an expert resume coach and professional writer. Your job is to:
-    - Analyze the resume below for clarity, impact, and relevance to modern hiring standards.
-    - Rewrite and enhance each section to maximize achievements, skills, and strengths, using strong action verbs and quantifiable results wherever possible.
-    - Ensure the resume is ATS-friendly, concise, and tailored for high-impact roles in tech, business, or academia.
-    - Provide constructive feedback and suggestions for further improvement.
-    - Return ONLY the result as a JSON object with the same structure as the input resume, and a 'feedback' field with your suggestions. Do not include any explanation or extra text, only the JSON object.
-    Resume:
-    {json.dumps(resume, indent=2)}
+
+
+def enhance_resume(resume, api_key, use_cache=True, on_section=None):
+    """Enhance ``resume`` without touching the Streamlit UI.
+
+    Every section's enhanced output is stored under a hash of its content, so
+    only sections that changed since they were last enhanced are sent to the
+    model; the rest are served from storage and merged back in. The feedback
+    of the call that enhanced a section is stored with it, so the returned
+    feedback still covers sections that were not re-sent.
+
+    Returns ``(enhanced_resume, feedback, sent_sections, reused_sections)``
+    and raises ``ValueError`` when the model does not return a valid resume.
     """
-    response = llm.invoke(prompt)
-    response_text = (
-        str(response.content) if hasattr(response, "content") else str(response)
+    sections = resume.to_dict()
+    reused, changed, reused_feedback = {}, {}, []
+    for section, value in sections.items():
+        cached = None
+        if use_cache:
+            cached = get_cached("enhance-section", _section_cache_key(section, value))
+        if cached is not None:
+            reused[section] = cached["value"]
+            reused_feedback.append(cached.get("feedback") or "")
+            if on_section is not None:
+                on_section(section, cached["value"])
+        else:
+            changed[section] = value
+
+    # Sections left empty by compaction (e.g. no publications) are kept as
+    # they are rather than sent on their own.
+    changed = {
+        section: changed[section]
+        for section in compact_resume(resume.subset(changed)) or {}
+    }
+    result, feedback = {}, ""
+    if changed:
+        enhanced_sections, feedback = _enhance_sections(
+            resume.subset(changed), api_key, on_section
+        )
+        result = enhanced_sections.to_dict()
+        for section, value in changed.items():
+            if section in result:
+                put_cached(
+                    "enhance-section",
+                    _section_cache_key(section, value),
+                    {"value": result[section], "feedback": feedback},
+                )
+
+    enhanced = {}
+    for section, value in sections.items():
+        if section in reused:
+            enhanced[section] = reused[section]
+        else:
+            enhanced[section] = result.get(section, value)
+    enhanced = restore_ui_fields(resume, Resume.from_dict(enhanced, resume.name))
+    # dict.fromkeys drops repeats (one call's feedback is stored with each
+    # of its sections) and keeps the order.
+    feedback = "\n\n".join(f for f in dict.fromkeys([feedback] + reused_feedback) if f)
+    return enhanced, feedback, list(changed), list(reused)
+
+
+def _parse_enhanced(parsed, expected=()):
+    feedback = parsed.get("feedback") or ""
+    if isinstance(feedback, list):
+        feedback = "\n".join(f"- {item}" for item in feedback)
+    return resume_from_reply(parsed, expected), str(feedback)
+
+
+def _enhance_sections(resume, api_key, on_section=None):
+    llm = get_llm(api_key, model_name=MODEL_NAME, temperature=TEMPERATURE)
+    prompt, _ = build_prompt(ENHANCE_PROMPT, resume, kind="enhance")
+    sent = list(compact_resume(resume) or {})
+    return invoke_json(
+        llm,
+        prompt,
+        "enhance",
+        on_section=on_section,
+        parse=lambda parsed: _parse_enhanced(parsed, sent),
+        json_mode=True,
     )
-    import re
-
-    match = re.search(r"\{.*\}", response_text, re.DOTALL)
-    if match:
-        json_str = match.group(0)
-        try:
-            enhanced_resume = json.loads(json_str)
-            return enhanced_resume
-        except Exception:
-            st.error(
-                "Groq LLM returned a response, but it was not valid JSON. Please try again or refine your prompt."
-            )
-            return None
-    else:
-        st.error(
-            "Groq LLM did not return any JSON. Please try again or refine your prompt."
+
+
+def call_groq_enhance_api(resume, api_key, use_cache=True, on_section=None):
+    try:
+        enhanced_resume, feedback, sent, reused = enhance_resume(
+            resume, api_key, use_cache=use_cache, on_section=on_section
+        )
+    except ValueError as e:
+        st.error(str(e))
+        return None, None
+    if not sent:
+        st.caption("No sections changed since they were last enhanced.")
+    elif reused:
+        st.caption(
+            f"Re-sent {len(sent)} changed section(s); "
+            f"{len(reused)} served from previous enhancements."
         )
-        return None
+    return enhanced_resume, feedback
 
 
 def resume_enhancer_page():
@@ -53,38 +145,44 @@ def resume_enhancer_page():
     if not user:
         st.warning("Please log in.")
         return
-    resumes = load_resumes(user)
+    resumes = list_resumes(user)
     if not resumes:
         st.info("No resumes found. Please create one first.")
         return
+    resume_search_box(user, "enhancer_resume")
     selected_resume_name = st.selectbox(
-        "Select Resume to Enhance", [r["name"] for r in resumes]
+        "Select Resume to Enhance", [r["name"] for r in resumes], key="enhancer_resume"
+    )
+    resume_data = get_resume(user, selected_resume_name)
+    stream_output = st.checkbox(
+        "Stream output",
+        value=True,
+        help="Show each section as soon as the model finishes writing it.",
     )
-    resume_data = next(r for r in resumes if r["name"] == selected_resume_name)
+    bypass_cache = st.checkbox(
+        "Bypass response cache",
+        help="Re-send every section, even those unchanged since their last enhancement.",
+    )
+    stats = cache_stats().get("enhance-section", {"hits": 0, "misses": 0})
+    st.caption(f"Section cache: {stats['hits']} hits, {stats['misses']} misses")
     if st.button("Enhance Resume"):
         api_key = get_groq_api_key()
         if not api_key:
             st.error("Groq API key not found in .env file.")
             return
+        on_section = streamed_section_renderer() if stream_output else None
         with st.spinner("Enhancing resume using Groq LLM..."):
-            enhanced = call_groq_enhance_api(resume_data, api_key)
+            enhanced, feedback = call_groq_enhance_api(
+                resume_data,
+                api_key,
+                use_cache=not bypass_cache,
+                on_section=on_section,
+            )
         if enhanced:
             st.success("Resume enhanced!")
             st.markdown("## Enhanced Resume (Editable)")
-            edited_resume = json.loads(json.dumps(enhanced))
-            feedback = edited_resume.pop("feedback", None)
-            for k, v in edited_resume.items():
-                if isinstance(v, str):
-                    edited_resume[k] = st.text_area(k.title(), value=v)
-                elif isinstance(v, list):
-                    st.markdown(f"### {k.title()}")
-                    for i, item in enumerate(v):
-                        for subk, subv in item.items():
-                            edited_resume[k][i][subk] = st.text_input(
-                                f"{k.title()} {i + 1} - {subk.title()}",
-                                value=subv,
-                                key=f"{k}_{subk}_{i}",
-                            )
+            # A fresh object from enhance_resume, so it can be edited in place.
+            edited_resume = render_resume_editor(enhanced)
             if feedback:
                 st.markdown(f"### Feedback\n{feedback}")
             if st.button("Save as New Resume"):
@@ -1,121 +1,388 @@
-import streamlit as st
-import json
-from resume_storage import load_resumes
-from utils import get_groq_api_key
-from langchain_groq import ChatGroq
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+import functools
+import hashlib
 import io
+import json
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import streamlit as st
+from instrumentation import observe
+from render_jobs import (
+    ACTIVE_STATUSES,
+    dismiss_job,
+    fetch_result,
+    list_jobs,
+    submit_job,
+)
+from resume_components import resume_search_box
+from resume_model import Contact
+from resume_storage import get_resume, list_resumes
+
+# Bump TEMPLATE_VERSION whenever the layout below changes so cached PDFs expire.
+TEMPLATE_VERSION = "2"
+PDF_CACHE_DIR = "db/pdf_cache"
+PDF_CACHE_MEMORY_BYTES = int(os.getenv("PDF_CACHE_MEMORY_BYTES", str(32 * 1024 * 1024)))
+PDF_EXPORT_WORKERS = int(os.getenv("PDF_EXPORT_WORKERS", "0")) or os.cpu_count() or 1
+PDF_CACHE_DISK_BYTES = int(os.getenv("PDF_CACHE_DISK_BYTES", str(256 * 1024 * 1024)))
+
+
+@functools.lru_cache(maxsize=None)
+def get_styles():
+    """Build the ReportLab stylesheet once per process."""
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    sheet = getSampleStyleSheet()
+    return {name: sheet[name] for name in ("Title", "Normal", "Heading2", "Italic")}
+
+
+class _PdfCache:
+    """Rendered PDF bytes keyed by content hash: an in-memory LRU in front of
+    an on-disk LRU, each bounded by a byte budget."""
+
+    def __init__(self, directory: str, memory_bytes: int, disk_bytes: int):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key: str):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+            os.utime(self._path(key))
+        except OSError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes):
+        self._remember(key, data)
+        if len(data) > self.disk_bytes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+        self._evict_disk()
+
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.memory_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.memory_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
 
+    def _evict_disk(self):
+        try:
+            files = [e for e in os.scandir(self.directory) if e.name.endswith(".pdf")]
+        except OSError:
+            return
+        stats = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in files]
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in sorted(stats):
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+_pdf_cache = _PdfCache(PDF_CACHE_DIR, PDF_CACHE_MEMORY_BYTES, PDF_CACHE_DISK_BYTES)
+
+
+def pdf_cache_key(resume) -> str:
+    """Hash of the rendered content; the resume's own name is not printed."""
+    material = json.dumps(
+        [TEMPLATE_VERSION, resume.to_dict()], sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def generate_pdf(resume):
+    """Generate a PDF of a :class:`~resume_model.Resume` in memory.
+
+    Identical content is rendered once and then served from the PDF cache.
+    """
+    start = time.perf_counter()
+    key = pdf_cache_key(resume)
+    data = _pdf_cache.get(key)
+    cache = "hit"
+    if data is None:
+        cache = "miss"
+        data = render_pdf(resume)
+        _pdf_cache.put(key, data)
+    observe("pdf_generate_seconds", time.perf_counter() - start, cache=cache)
+    return io.BytesIO(data)
+
+
+def render_pdf(resume) -> bytes:
+    """Lay out ``resume`` with ReportLab and return the PDF bytes."""
+    # ReportLab is only loaded by sessions (and workers) that render a PDF.
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
 
-def generate_pdf(resume_data):
-    """Generate a PDF resume in memory from resume_data."""
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer)
-    styles = getSampleStyleSheet()
+    styles = get_styles()
     story = []
 
     # Contact info
-    contact = resume_data.get("contact", {})
-    story.append(Paragraph(f"<b>{contact.get('full_name', '')}</b>", styles["Title"]))
+    contact = resume.contact or Contact()
+    story.append(Paragraph(f"<b>{contact.full_name}</b>", styles["Title"]))
     story.append(Spacer(1, 12))
-    story.append(Paragraph(f"Email: {contact.get('email', '')}", styles["Normal"]))
-    story.append(Paragraph(f"Phone: {contact.get('phone', '')}", styles["Normal"]))
-    story.append(
-        Paragraph(f"Location: {contact.get('location', '')}", styles["Normal"])
-    )
-    if contact.get("linkedin"):
-        story.append(Paragraph(f"LinkedIn: {contact['linkedin']}", styles["Normal"]))
-    if contact.get("github"):
-        story.append(Paragraph(f"GitHub: {contact['github']}", styles["Normal"]))
+    story.append(Paragraph(f"Email: {contact.email}", styles["Normal"]))
+    story.append(Paragraph(f"Phone: {contact.phone}", styles["Normal"]))
+    story.append(Paragraph(f"Location: {contact.location}", styles["Normal"]))
+    if contact.linkedin:
+        story.append(Paragraph(f"LinkedIn: {contact.linkedin}", styles["Normal"]))
+    if contact.github:
+        story.append(Paragraph(f"GitHub: {contact.github}", styles["Normal"]))
     story.append(Spacer(1, 12))
 
     # Summary
-    if "summary" in resume_data and resume_data["summary"]:
+    if resume.summary:
         story.append(Paragraph("<b>Summary</b>", styles["Heading2"]))
-        story.append(Paragraph(resume_data["summary"], styles["Normal"]))
+        story.append(Paragraph(resume.summary, styles["Normal"]))
         story.append(Spacer(1, 12))
 
     # Experience
-    if "experience" in resume_data:
+    if resume.experience is not None:
         story.append(Paragraph("<b>Experience</b>", styles["Heading2"]))
-        for exp in resume_data["experience"]:
+        for exp in resume.experience:
             story.append(
                 Paragraph(
-                    f"{exp.get('title', '')} at {exp.get('company', '')} "
-                    f"({exp.get('start', '')} - {exp.get('end', '')})",
+                    f"{exp.title} at {exp.company} ({exp.start} - {exp.end})",
                     styles["Normal"],
                 )
             )
-            if exp.get("bullets"):
-                for bullet in exp["bullets"]:
-                    story.append(Paragraph(f"• {bullet}", styles["Normal"]))
-            if exp.get("tech_stack"):
-                story.append(Paragraph(f"Tech: {exp['tech_stack']}", styles["Italic"]))
+            for bullet in exp.bullets:
+                story.append(Paragraph(f"• {bullet}", styles["Normal"]))
+            if exp.tech_stack:
+                story.append(Paragraph(f"Tech: {exp.tech_stack}", styles["Italic"]))
             story.append(Spacer(1, 6))
 
     # Education
-    if "education" in resume_data:
+    if resume.education is not None:
         story.append(Paragraph("<b>Education</b>", styles["Heading2"]))
-        for edu in resume_data["education"]:
+        for edu in resume.education:
             story.append(
                 Paragraph(
-                    f"{edu.get('degree', '')} in {edu.get('field', '')} "
-                    f"at {edu.get('school', '')} ({edu.get('start', '')} - {edu.get('end', '')})",
+                    f"{edu.degree} in {edu.field} "
+                    f"at {edu.school} ({edu.start} - {edu.end})",
                     styles["Normal"],
                 )
             )
             story.append(Spacer(1, 6))
 
     # Projects
-    if "projects" in resume_data:
+    if resume.projects is not None:
         story.append(Paragraph("<b>Projects</b>", styles["Heading2"]))
-        for proj in resume_data["projects"]:
+        for proj in resume.projects:
             story.append(
-                Paragraph(
-                    f"{proj.get('name', '')} ({proj.get('start', '')} - {proj.get('end', '')})",
-                    styles["Normal"],
-                )
+                Paragraph(f"{proj.title} ({proj.start} - {proj.end})", styles["Normal"])
             )
-            if proj.get("bullets"):
-                for bullet in proj["bullets"]:
-                    story.append(Paragraph(f"• {bullet}", styles["Normal"]))
-            if proj.get("tech_stack"):
-                story.append(Paragraph(f"Tech: {proj['tech_stack']}", styles["Italic"]))
+            for bullet in proj.bullets:
+                story.append(Paragraph(f"• {bullet}", styles["Normal"]))
+            if proj.tech_stack:
+                story.append(Paragraph(f"Tech: {proj.tech_stack}", styles["Italic"]))
+            if proj.link:
+                story.append(Paragraph(f"Link: {proj.link}", styles["Normal"]))
             story.append(Spacer(1, 6))
 
     # Skills
-    if "skills" in resume_data and resume_data["skills"]:
+    if resume.skills:
         story.append(Paragraph("<b>Skills</b>", styles["Heading2"]))
-        story.append(Paragraph(resume_data["skills"], styles["Normal"]))
+        story.append(Paragraph(resume.skills, styles["Normal"]))
 
     # Certificates
-    if "certificates" in resume_data:
+    if resume.certificates is not None:
         story.append(Paragraph("<b>Certificates</b>", styles["Heading2"]))
-        for cert in resume_data["certificates"]:
+        for cert in resume.certificates:
             story.append(
                 Paragraph(
-                    f"{cert.get('name', '')} - {cert.get('issuer', '')} ({cert.get('date', '')})",
-                    styles["Normal"],
+                    f"{cert.name} - {cert.issuer} ({cert.date})", styles["Normal"]
                 )
             )
 
     # Publications
-    if "publications" in resume_data:
+    if resume.publications is not None:
         story.append(Paragraph("<b>Publications</b>", styles["Heading2"]))
-        for pub in resume_data["publications"]:
+        for pub in resume.publications:
             story.append(
                 Paragraph(
-                    f"{pub.get('title', '')} ({pub.get('publisher', '')}, {pub.get('date', '')})",
-                    styles["Normal"],
+                    f"{pub.title} ({pub.publisher}, {pub.date})", styles["Normal"]
                 )
             )
-            if pub.get("link"):
-                story.append(Paragraph(f"Link: {pub['link']}", styles["Normal"]))
+            if pub.link:
+                story.append(Paragraph(f"Link: {pub.link}", styles["Normal"]))
 
     doc.build(story)
-    buffer.seek(0)
-    return buffer
+    return buffer.getvalue()
+
+
+def _render_timed(resume):
+    # Runs in a pool worker: metrics observed there would never reach the
+    # app's process, so the render time is returned alongside the bytes.
+    start = time.perf_counter()
+    data = render_pdf(resume)
+    return data, time.perf_counter() - start
+
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared render pool, started on first use.
+
+    Workers are spawned rather than forked: forking the multi-threaded
+    Streamlit server could copy held locks into the children.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=PDF_EXPORT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+def export_resumes_zip(resumes, on_progress=None) -> bytes:
+    """Render ``{name: resume}`` to PDFs and return them as a ZIP archive.
+
+    Cached PDFs are written straight away; the rest are rendered in parallel
+    across the process pool and added to the archive as each one finishes.
+    ``on_progress(done, total)`` is called after every file.
+    """
+    total = len(resumes)
+    done = 0
+    buffer = io.BytesIO()
+    # PDF page streams are already compressed, so deflating them again is wasted CPU.
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        pending = {}
+        for name, resume_data in resumes.items():
+            start = time.perf_counter()
+            key = pdf_cache_key(resume_data)
+            data = _pdf_cache.get(key)
+            if data is None:
+                pending[name] = (key, resume_data)
+                continue
+            observe("pdf_generate_seconds", time.perf_counter() - start, cache="hit")
+            archive.writestr(f"{name}.pdf", data)
+            done += 1
+            if on_progress:
+                on_progress(done, total)
+        if len(pending) == 1:
+            # Not worth a round trip through the pool.
+            [(name, (key, resume_data))] = pending.items()
+            data, seconds = _render_timed(resume_data)
+            observe("pdf_generate_seconds", seconds, cache="miss")
+            _pdf_cache.put(key, data)
+            archive.writestr(f"{name}.pdf", data)
+            done += 1
+            if on_progress:
+                on_progress(done, total)
+        elif pending:
+            pool = get_process_pool()
+            futures = {
+                pool.submit(_render_timed, resume_data): (name, key)
+                for name, (key, resume_data) in pending.items()
+            }
+            for future in as_completed(futures):
+                name, key = futures[future]
+                data, seconds = future.result()
+                observe("pdf_generate_seconds", seconds, cache="miss")
+                _pdf_cache.put(key, data)
+                archive.writestr(f"{name}.pdf", data)
+                done += 1
+                if on_progress:
+                    on_progress(done, total)
+    return buffer.getvalue()
+
+
+def generate_pdf_in_pool(resume) -> bytes:
+    """Like :func:`generate_pdf`, but render cache misses in the process pool."""
+    start = time.perf_counter()
+    key = pdf_cache_key(resume)
+    data = _pdf_cache.get(key)
+    cache = "hit"
+    if data is None:
+        cache = "miss"
+        data, _ = get_process_pool().submit(_render_timed, resume).result()
+        _pdf_cache.put(key, data)
+    observe("pdf_generate_seconds", time.perf_counter() - start, cache=cache)
+    return data
+
+
+def _pdf_job_key(resume, file_name: str) -> str:
+    # Identical content exported under another name is a different download;
+    # its render is still shared through the PDF cache.
+    material = json.dumps([pdf_cache_key(resume), file_name])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _bulk_job_key(resumes) -> str:
+    material = json.dumps(
+        sorted((name, pdf_cache_key(data)) for name, data in resumes.items())
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def export_jobs_panel(user, polling: bool = False):
+    """Show the user's export jobs with progress and downloads.
+
+    ``polling`` is set when the panel reruns on a timer; once no job is
+    active any more it reruns the page, which renders it without the timer.
+    """
+    jobs = list_jobs(user)
+    if polling and not any(job["status"] in ACTIVE_STATUSES for job in jobs):
+        st.rerun()
+    if not jobs:
+        return
+    st.markdown("### Export Jobs")
+    for job in jobs:
+        cols = st.columns([4, 3, 1])
+        cols[0].markdown(f"**{job['file_name']}**")
+        if job["status"] in ACTIVE_STATUSES:
+            cols[1].progress(job["progress"], text=job["status"].title())
+        elif job["status"] == "failed":
+            cols[1].error(job["error"] or "Failed")
+        else:
+            mime = "application/zip" if job["kind"] == "zip" else "application/pdf"
+            cols[1].download_button(
+                label="⬇️ Download",
+                data=functools.partial(fetch_result, job["id"]),
+                file_name=job["file_name"],
+                mime=mime,
+                key=f"download_{job['id']}",
+            )
+        if job["status"] not in ACTIVE_STATUSES:
+            if cols[2].button("✕", key=f"dismiss_{job['id']}"):
+                dismiss_job(user, job["id"])
+                st.rerun()
 
 
 def resume_export_pdf_page():
@@ -124,23 +391,45 @@ def resume_export_pdf_page():
     if not user:
         st.warning("Please log in.")
         return
-    resumes = load_resumes(user)
+    resumes = list_resumes(user)
     if not resumes:
         st.info("No resumes found. Please create one first.")
         return
+    resume_search_box(user, "export_resume")
     selected_resume_name = st.selectbox(
-        "Select Resume to Export", [r["name"] for r in resumes]
+        "Select Resume to Export", [r["name"] for r in resumes], key="export_resume"
     )
-    resume_data = next(r for r in resumes if r["name"] == selected_resume_name)
+    resume_data = get_resume(user, selected_resume_name)
 
     if st.button("Export as PDF"):
-        with st.spinner("Generating PDF resume..."):
-            pdf_file = generate_pdf(resume_data)
-
-        st.success("PDF resume generated!")
-        st.download_button(
-            label="⬇️ Download your professional resume PDF",
-            data=pdf_file,
-            file_name=f"{selected_resume_name}.pdf",
-            mime="application/pdf",
+        # Rendering happens on background workers; the job list below picks
+        # up the file on a later rerun, even after a page refresh.
+        file_name = f"{selected_resume_name}.pdf"
+        submit_job(
+            user,
+            "pdf",
+            _pdf_job_key(resume_data, file_name),
+            lambda on_progress: generate_pdf_in_pool(resume_data),
+            file_name,
         )
+        st.success("PDF export queued.")
+
+    st.markdown("### Bulk Export")
+    all_names = [r["name"] for r in resumes]
+    bulk_names = st.multiselect(
+        "Resumes to include in the ZIP", all_names, default=all_names
+    )
+    if st.button("Export Selected as ZIP", disabled=not bulk_names):
+        selected = {name: get_resume(user, name) for name in bulk_names}
+        submit_job(
+            user,
+            "zip",
+            _bulk_job_key(selected),
+            lambda on_progress: export_resumes_zip(selected, on_progress),
+            f"{user}_resumes.zip",
+        )
+        st.success(f"ZIP export of {len(bulk_names)} resumes queued.")
+
+    active = any(job["status"] in ACTIVE_STATUSES for job in list_jobs(user))
+    # Poll only while something is still rendering.
+    st.fragment(run_every=2 if active else None)(export_jobs_panel)(user, active)
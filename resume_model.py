@@ -0,0 +1,248 @@
+# Typed resume model shared by storage, the pages, PDF export and LLM prompts
+import dataclasses
+import functools
+from typing import List, Optional
+
+# Top-level sections in display order.
+SECTION_KEYS = (
+    "contact",
+    "summary",
+    "experience",
+    "education",
+    "projects",
+    "skills",
+    "certificates",
+    "publications",
+)
+TEXT_SECTIONS = ("summary", "skills")
+
+
+def _text(value, where: str) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, list):
+        # e.g. skills returned as a list by the model
+        return ", ".join(t for t in (_text(v, where) for v in value) if t)
+    raise ValueError(f"Expected text for {where}, got {type(value).__name__}")
+
+
+def _bullets(value, where: str) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list):
+        return [_text(v, where) for v in value]
+    raise ValueError(f"Expected bullet points for {where}")
+
+
+@functools.lru_cache(maxsize=None)
+def _field_names(cls) -> tuple:
+    return tuple(f.name for f in dataclasses.fields(cls))
+
+
+class _Entry:
+    """Shared parsing and serialization of the section entry classes."""
+
+    __slots__ = ()
+    # Older or model-produced field names -> current field name.
+    ALIASES = {}
+
+    @classmethod
+    def from_dict(cls, data, where: str):
+        if not isinstance(data, dict):
+            raise ValueError(f"Expected an object for {where}")
+        data = dict(data)
+        for old, new in cls.ALIASES.items():
+            if old in data and not data.get(new):
+                data[new] = data[old]
+        values = {}
+        for name in _field_names(cls):
+            value = data.get(name)
+            if name == "bullets":
+                values[name] = _bullets(value, f"{where}.bullets")
+            elif name == "present":
+                values[name] = bool(value)
+            else:
+                values[name] = _text(value, f"{where}.{name}")
+        return cls(**values)
+
+    def to_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in _field_names(type(self))}
+        if "bullets" in data:
+            data["bullets"] = list(data["bullets"])
+        return data
+
+
+@dataclasses.dataclass(slots=True)
+class Contact(_Entry):
+    full_name: str = ""
+    phone: str = ""
+    email: str = ""
+    location: str = ""
+    linkedin: str = ""
+    github: str = ""
+
+
+@dataclasses.dataclass(slots=True)
+class Experience(_Entry):
+    company: str = ""
+    title: str = ""
+    bullets: List[str] = dataclasses.field(default_factory=list)
+    start: str = ""
+    end: str = ""
+    present: bool = False
+    tech_stack: str = ""
+
+
+@dataclasses.dataclass(slots=True)
+class Education(_Entry):
+    school: str = ""
+    degree: str = ""
+    field: str = ""
+    start: str = ""
+    end: str = ""
+    present: bool = False
+
+
+@dataclasses.dataclass(slots=True)
+class Project(_Entry):
+    ALIASES = {"name": "title", "tech": "tech_stack", "description": "bullets"}
+
+    title: str = ""
+    bullets: List[str] = dataclasses.field(default_factory=list)
+    start: str = ""
+    end: str = ""
+    present: bool = False
+    tech_stack: str = ""
+    link: str = ""
+
+
+@dataclasses.dataclass(slots=True)
+class Certificate(_Entry):
+    name: str = ""
+    issuer: str = ""
+    date: str = ""
+
+
+@dataclasses.dataclass(slots=True)
+class Publication(_Entry):
+    title: str = ""
+    publisher: str = ""
+    date: str = ""
+    link: str = ""
+
+
+ENTRY_TYPES = {
+    "experience": Experience,
+    "education": Education,
+    "projects": Project,
+    "certificates": Certificate,
+    "publications": Publication,
+}
+
+
+@dataclasses.dataclass(slots=True)
+class Resume:
+    """A validated resume. Sections left as None are not part of it.
+
+    ``name`` is the storage key and is not part of the content.
+    """
+
+    contact: Optional[Contact] = None
+    summary: Optional[str] = None
+    experience: Optional[List[Experience]] = None
+    education: Optional[List[Education]] = None
+    projects: Optional[List[Project]] = None
+    skills: Optional[str] = None
+    certificates: Optional[List[Certificate]] = None
+    publications: Optional[List[Publication]] = None
+    name: str = ""
+
+    @classmethod
+    def from_dict(cls, data, name: str = None) -> "Resume":
+        """Validate and normalize a resume dict (stored, edited or LLM output).
+
+        Unknown keys are dropped. Raises ``ValueError`` when a section has
+        the wrong shape.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("Expected a resume object")
+        if name is None:
+            name = data.get("name") or ""
+        resume = cls(name=name)
+        if data.get("contact") is not None:
+            resume.contact = Contact.from_dict(data["contact"], "contact")
+        for key in TEXT_SECTIONS:
+            if data.get(key) is not None:
+                setattr(resume, key, _text(data[key], key))
+        for key, entry_type in ENTRY_TYPES.items():
+            entries = data.get(key)
+            if entries is None:
+                continue
+            if isinstance(entries, dict):
+                entries = [entries]
+            if not isinstance(entries, list):
+                raise ValueError(f"Expected a list for {key}")
+            setattr(
+                resume,
+                key,
+                [
+                    entry_type.from_dict(entry, f"{key}[{i}]")
+                    for i, entry in enumerate(entries)
+                ],
+            )
+        return resume
+
+    def to_dict(self) -> dict:
+        """The resume content as plain JSON data, without ``name``."""
+        data = {}
+        for key in SECTION_KEYS:
+            value = getattr(self, key)
+            if value is None:
+                continue
+            if isinstance(value, str):
+                data[key] = value
+            elif isinstance(value, list):
+                data[key] = [entry.to_dict() for entry in value]
+            else:
+                data[key] = value.to_dict()
+        return data
+
+    def sections(self):
+        """Keys of the sections this resume has, in display order."""
+        return [key for key in SECTION_KEYS if getattr(self, key) is not None]
+
+    def subset(self, keys) -> "Resume":
+        """A resume with only the sections in ``keys`` (sharing their objects)."""
+        return Resume(
+            **{key: getattr(self, key) for key in SECTION_KEYS if key in keys}
+        )
+
+
+def as_resume(data, name: str = None) -> Resume:
+    """Return ``data`` as a :class:`Resume`, validating it if it is a dict."""
+    if isinstance(data, Resume):
+        return data
+    return Resume.from_dict(data, name)
+
+
+def resume_from_reply(data, expected=()) -> Resume:
+    """Validate a resume returned by the LLM.
+
+    Like :meth:`Resume.from_dict`, but also raises ``ValueError`` when the
+    reply holds no resume section, or none of the ``expected`` ones (e.g. a
+    wrapper object or a stray entry), so callers retry it instead of showing
+    an empty resume.
+    """
+    resume = Resume.from_dict(data)
+    sections = set(resume.sections())
+    if not sections or (expected and not sections & set(expected)):
+        raise ValueError(
+            "Groq LLM returned JSON without the resume's sections. Please try again."
+        )
+    return resume
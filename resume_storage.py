@@ -1,54 +1,930 @@
 # Resume storage and CRUD operations
+import hashlib
+import itertools
 import json
-from utils import get_db_connection
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from json_patch import apply_patch, make_patch
+from resume_model import Resume, as_resume
+from utils import add_missing_columns, get_db_connection, register_schema
+
+try:
+    import msgpack
+except ImportError:  # optional: enables the "msgpack" codecs
+    msgpack = None
+
+logger = logging.getLogger(__name__)
 
 DB_PATH = "db/resumes.db"
 
-# Resume CRUD functions
+# Versioned storage: each save appends a JSON Patch against the previous
+# version, with a full snapshot every RESUME_SNAPSHOT_EVERY versions so that
+# loading replays a bounded number of patches. History older than
+# RESUME_HISTORY_LIMIT versions is pruned at snapshot boundaries.
+RESUME_VERSIONING = os.getenv("RESUME_VERSIONING", "1").lower() not in ("0", "false")
+RESUME_SNAPSHOT_EVERY = int(os.getenv("RESUME_SNAPSHOT_EVERY", "20"))
+RESUME_HISTORY_LIMIT = int(os.getenv("RESUME_HISTORY_LIMIT", "200"))
+
+
+# Section blob codecs. Every blob row records the codec that wrote it, so
+# formats can be mixed while migrate_blobs() re-encodes older rows.
+class Codec:
+    """How section blobs are stored in ``resume_blobs.data``.
+
+    ``encode(value, text)`` receives the section and its compact JSON text
+    (already computed for hashing); ``decode(data)`` returns the section.
+    """
+
+    __slots__ = ("name", "encode", "decode")
+
+    def __init__(self, name: str, encode, decode):
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+
+
+CODECS = {}
+
+
+def register_codec(name: str, encode, decode):
+    CODECS[name] = Codec(name, encode, decode)
+
+
+RESUME_ZLIB_LEVEL = int(os.getenv("RESUME_ZLIB_LEVEL", "6"))
+
+register_codec("json", lambda value, text: text, json.loads)
+register_codec(
+    "zlib",
+    lambda value, text: zlib.compress(text.encode("utf-8"), RESUME_ZLIB_LEVEL),
+    lambda data: json.loads(zlib.decompress(data)),
+)
+if msgpack is not None:
+    register_codec("msgpack", lambda value, text: msgpack.packb(value), msgpack.unpackb)
+    register_codec(
+        "msgpack+zlib",
+        lambda value, text: zlib.compress(msgpack.packb(value), RESUME_ZLIB_LEVEL),
+        lambda data: msgpack.unpackb(zlib.decompress(data)),
+    )
+
+# Codec for new blobs: the binary msgpack format when installed, else JSON.
+RESUME_CODEC = os.getenv("RESUME_CODEC") or ("msgpack" if msgpack else "json")
+if RESUME_CODEC not in CODECS:
+    logger.warning(
+        "Unknown or unavailable RESUME_CODEC %r; using 'json'.", RESUME_CODEC
+    )
+    RESUME_CODEC = "json"
+# Re-encode blobs written with another codec in a background thread.
+RESUME_CODEC_MIGRATE = os.getenv("RESUME_CODEC_MIGRATE", "1").lower() not in (
+    "0",
+    "false",
+)
+
+
+def _migrate_resume_metadata(conn):
+    # Blobs written before codecs existed are plain JSON text.
+    add_missing_columns(conn, "resume_blobs", {"codec": "TEXT NOT NULL DEFAULT 'json'"})
+    # Databases created before the metadata columns existed get them backfilled.
+    added = add_missing_columns(
+        conn,
+        "resumes",
+        {
+            "size": "INTEGER NOT NULL DEFAULT 0",
+            "updated_at": "REAL NOT NULL DEFAULT 0",
+            "version": "INTEGER NOT NULL DEFAULT 0",
+            "snapshot_version": "INTEGER NOT NULL DEFAULT 0",
+            "sections": "TEXT NOT NULL DEFAULT '{}'",
+            "search_id": "INTEGER NOT NULL DEFAULT 0",
+        },
+    )
+    if "size" in added:
+        conn.execute("UPDATE resumes SET size = length(data)")
+    if "sections" in added:
+        _convert_to_manifests(conn)
+
+
+register_schema(
+    DB_PATH,
+    """
+    CREATE TABLE IF NOT EXISTS resumes (
+        user TEXT NOT NULL,
+        name TEXT NOT NULL,
+        data TEXT NOT NULL,
+        size INTEGER NOT NULL DEFAULT 0,
+        updated_at REAL NOT NULL DEFAULT 0,
+        -- Latest version in resume_versions (0: no history kept).
+        version INTEGER NOT NULL DEFAULT 0,
+        snapshot_version INTEGER NOT NULL DEFAULT 0,
+        -- Manifest {section: blob hash}; "data" is only read by migrations.
+        sections TEXT NOT NULL DEFAULT '{}',
+        -- Row of this resume in resume_search (0: not indexed).
+        search_id INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user, name)
+    );
+    -- Section payloads shared by every manifest (resume or snapshot) that
+    -- holds the same content; deleted when the last reference goes away.
+    CREATE TABLE IF NOT EXISTS resume_blobs (
+        hash TEXT PRIMARY KEY,  -- sha256 of the section's compact JSON
+        codec TEXT NOT NULL DEFAULT 'json',
+        data TEXT NOT NULL,  -- text or bytes, as written by the codec
+        size INTEGER NOT NULL,  -- length of the compact JSON
+        refs INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS resume_versions (
+        user TEXT NOT NULL,
+        name TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        -- 'snapshot' (body is a manifest) or 'patch' (against version - 1)
+        kind TEXT NOT NULL,
+        body TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (user, name, version)
+    );
+    """,
+)
+register_schema(DB_PATH, _migrate_resume_metadata)
+# Covering index: listing never touches the table rows holding the JSON blobs.
+register_schema(
+    DB_PATH,
+    """
+    CREATE INDEX IF NOT EXISTS idx_resumes_listing
+        ON resumes (user, name, size, updated_at);
+    """,
+)
+
+# In-process resume cache
+
+RESUME_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "512"))
+
+
+class _ResumeCache:
+    """LRU of decoded resumes and listings shared by all sessions.
+
+    Every write bumps the user's content version; entries tagged with an
+    older version are treated as misses, so writes never serve stale data.
+    Versions are kept for at most ``max_entries`` recently written users;
+    users without a kept version are at the floor, the newest version
+    forgotten so far, so a read sampled before an eviction cannot be cached
+    after it.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = OrderedDict()
+        # Versions come from one increasing counter, so a new version is
+        # always above the floor and above every version handed out before.
+        self._counter = itertools.count(1)
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def _version(self, user: str) -> int:
+        return self._versions.get(user, self._floor)
+
+    def version(self, user: str) -> int:
+        with self._lock:
+            return self._version(user)
+
+    def get(self, user: str, key):
+        with self._lock:
+            entry = self._entries.get((user, key))
+            if entry is None:
+                return None
+            if entry[0] != self._version(user):
+                del self._entries[(user, key)]
+                return None
+            self._entries.move_to_end((user, key))
+            return entry[1]
+
+    def put(self, user: str, key, version: int, value):
+        with self._lock:
+            # A write landed while the value was being read; don't cache it.
+            if version != self._version(user):
+                return
+            self._entries[(user, key)] = (version, value)
+            self._entries.move_to_end((user, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user: str):
+        with self._lock:
+            self._versions[user] = next(self._counter)
+            self._versions.move_to_end(user)
+            while len(self._versions) > self.max_entries:
+                forgotten, version = self._versions.popitem(last=False)
+                self._floor = max(self._floor, version)
+                for key in [key for key in self._entries if key[0] == forgotten]:
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = _ResumeCache(RESUME_CACHE_MAX_ENTRIES)
+# Sentinel key for a user's listing, distinct from any resume name.
+_LISTING = object()
 
 
-def save_resume(user: str, name: str, data: dict):
+def clear_resume_cache():
+    _cache.clear()
+
+
+# Content-addressed section blobs
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _decode(codec: str, data):
+    try:
+        return CODECS[codec].decode(data)
+    except KeyError:
+        raise ValueError(
+            f"Resume data was written with the unavailable codec {codec!r}"
+        ) from None
+
+
+def _retain_document(conn, document: dict):
+    """Store each top-level section of ``document`` as a blob, or take a
+    reference on an identical stored one. Returns ``(manifest, size)``."""
+    manifest = {}
+    sections = {}
+    for key, value in document.items():
+        text = _dumps(value)
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        manifest[key] = digest
+        sections[digest] = (value, text)
+    hashes = list(sections)
+    existing = {
+        row[0]
+        for row in conn.execute(
+            "SELECT hash FROM resume_blobs "
+            f"WHERE hash IN ({','.join('?' * len(hashes))})",
+            hashes,
+        )
+    }
+    # Only sections not stored yet are encoded.
+    codec = CODECS[RESUME_CODEC]
+    conn.executemany(
+        "INSERT INTO resume_blobs (hash, codec, data, size, refs) "
+        "VALUES (?, ?, ?, ?, 0) ON CONFLICT (hash) DO NOTHING",
+        [
+            (digest, codec.name, codec.encode(value, text), len(text))
+            for digest, (value, text) in sections.items()
+            if digest not in existing
+        ],
+    )
+    _retain(conn, manifest)
+    return manifest, sum(len(sections[digest][1]) for digest in manifest.values())
+
+
+def _retain(conn, manifest: dict):
+    conn.executemany(
+        "UPDATE resume_blobs SET refs = refs + 1 WHERE hash=?",
+        [(digest,) for digest in manifest.values()],
+    )
+
+
+def _release(conn, manifest: dict):
+    """Drop one reference per manifest entry and delete unreferenced blobs."""
+    hashes = [(digest,) for digest in manifest.values()]
+    conn.executemany("UPDATE resume_blobs SET refs = refs - 1 WHERE hash=?", hashes)
+    conn.executemany("DELETE FROM resume_blobs WHERE hash=? AND refs <= 0", hashes)
+
+
+def _load_manifest(conn, manifest: dict) -> dict:
+    hashes = list(set(manifest.values()))
+    if not hashes:
+        return {}
+    blobs = {
+        digest: (codec, data)
+        for digest, codec, data in conn.execute(
+            "SELECT hash, codec, data FROM resume_blobs "
+            f"WHERE hash IN ({','.join('?' * len(hashes))})",
+            hashes,
+        )
+    }
+    return {key: _decode(*blobs[digest]) for key, digest in manifest.items()}
+
+
+def migrate_blobs(codec: str = None, batch_size: int = 200) -> int:
+    """Re-encode blobs written with another codec to ``codec`` (default:
+    ``RESUME_CODEC``) and return how many were converted.
+
+    Works in short batches, each in its own transaction, so the app stays
+    usable while it runs. Blobs in codecs unavailable here are left alone.
+    """
+    target = CODECS[codec or RESUME_CODEC]
+    others = [name for name in CODECS if name != target.name]
+    if not others:
+        return 0
     conn = get_db_connection(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "REPLACE INTO resumes (user, name, data) VALUES (?, ?, ?)",
-        (user, name, json.dumps(data)),
+    converted = 0
+    while True:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT hash, codec, data FROM resume_blobs "
+                f"WHERE codec IN ({','.join('?' * len(others))}) LIMIT ?",
+                (*others, batch_size),
+            ).fetchall()
+            updates = []
+            for digest, old_codec, data in rows:
+                value = CODECS[old_codec].decode(data)
+                updates.append(
+                    (target.name, target.encode(value, _dumps(value)), digest)
+                )
+            conn.executemany(
+                "UPDATE resume_blobs SET codec=?, data=? WHERE hash=?", updates
+            )
+        converted += len(rows)
+        if len(rows) < batch_size:
+            return converted
+
+
+def _migrate_blobs_in_background():
+    try:
+        converted = migrate_blobs()
+    except Exception:
+        logger.exception("Re-encoding resume blobs failed")
+        return
+    logger.info("Re-encoded %d resume blobs as %s", converted, RESUME_CODEC)
+
+
+def _start_blob_migration(conn):
+    # Called once per process after the schema is in place; the thread's
+    # first transaction waits for this bootstrap to commit.
+    if not RESUME_CODEC_MIGRATE:
+        return
+    pending = conn.execute(
+        "SELECT 1 FROM resume_blobs WHERE codec<>? LIMIT 1", (RESUME_CODEC,)
+    ).fetchone()
+    if pending:
+        threading.Thread(
+            target=_migrate_blobs_in_background,
+            daemon=True,
+            name="resume-blob-migration",
+        ).start()
+
+
+register_schema(DB_PATH, _start_blob_migration)
+
+
+# Full-text search
+
+# Searchable text of each resume, in an FTS5 table whose rowid is stored in
+# ``resumes.search_id``. Maintained in the same transaction as every write,
+# so searching never decodes a blob.
+SEARCH_COLUMNS = ("summary", "skills", "experience", "projects", "tech_stack")
+# bm25 weight per column (user and name are not indexed; owner only scopes).
+SEARCH_RANK = "bm25(0.0, 0.0, 1.0, 2.0, 1.0, 1.0, 2.0, 0.0)"
+SEARCH_SNIPPET_TOKENS = int(os.getenv("SEARCH_SNIPPET_TOKENS", "12"))
+
+
+def _has_fts5() -> bool:
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute("CREATE VIRTUAL TABLE probe USING fts5(text)")
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+    return True
+
+
+RESUME_SEARCH = _has_fts5()
+if not RESUME_SEARCH:
+    logger.warning("SQLite was built without FTS5; resume search is disabled.")
+
+
+def _search_owner(user: str) -> str:
+    # A single indexed token per user, so a query's MATCH expression itself is
+    # scoped to one user's rows instead of ranking every user's matches.
+    return "u" + hashlib.sha256(user.encode("utf-8")).hexdigest()[:32]
+
+
+def _search_text(document: dict):
+    """Column values for the search index, from a normalized document."""
+    experience = document.get("experience") or []
+    projects = document.get("projects") or []
+    return (
+        document.get("summary") or "",
+        document.get("skills") or "",
+        "\n".join(
+            text
+            for entry in experience
+            for text in (entry["title"], entry["company"], *entry["bullets"])
+            if text
+        ),
+        "\n".join(
+            text
+            for entry in projects
+            for text in (entry["title"], *entry["bullets"])
+            if text
+        ),
+        "\n".join(
+            entry["tech_stack"]
+            for entry in experience + projects
+            if entry["tech_stack"]
+        ),
+    )
+
+
+def _index_resume(conn, user: str, name: str, document: dict):
+    if not RESUME_SEARCH:
+        return
+    (search_id,) = conn.execute(
+        "SELECT search_id FROM resumes WHERE user=? AND name=?", (user, name)
+    ).fetchone()
+    if search_id:
+        conn.execute("DELETE FROM resume_search WHERE rowid=?", (search_id,))
+    search_id = conn.execute(
+        f"INSERT INTO resume_search (user, name, {', '.join(SEARCH_COLUMNS)}, owner) "
+        f"VALUES (?, ?{', ?' * len(SEARCH_COLUMNS)}, ?)",
+        (user, name, *_search_text(document), _search_owner(user)),
+    ).lastrowid
+    conn.execute(
+        "UPDATE resumes SET search_id=? WHERE user=? AND name=?",
+        (search_id, user, name),
     )
-    conn.commit()
-    conn.close()
+
+
+def _create_search_index(conn):
+    if not RESUME_SEARCH:
+        return
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(resume_search)")}
+    if "owner" in columns:
+        return
+    if columns:
+        # Indexes built before the owner column are rebuilt from scratch.
+        conn.execute("DROP TABLE resume_search")
+    conn.execute("UPDATE resumes SET search_id=0")
+    conn.execute(
+        "CREATE VIRTUAL TABLE resume_search USING fts5("
+        f"user UNINDEXED, name UNINDEXED, {', '.join(SEARCH_COLUMNS)}, owner, "
+        "tokenize='porter unicode61')"
+    )
+    # Existing resumes are indexed once, when the table is first created.
+    for user, name, sections in conn.execute(
+        "SELECT user, name, sections FROM resumes"
+    ).fetchall():
+        try:
+            document = Resume.from_dict(_load_manifest(conn, json.loads(sections)))
+        except ValueError:
+            logger.warning("Not indexing unreadable resume %r of %r", name, user)
+            continue
+        _index_resume(conn, user, name, document.to_dict())
+
+
+register_schema(DB_PATH, _create_search_index)
+
+
+# Version history helpers
+
+
+def _materialize(conn, rows):
+    """Rebuild a document from ``(kind, body)`` rows in version order."""
+    document = None
+    for kind, body in rows:
+        if kind == "snapshot":
+            document = _load_manifest(conn, json.loads(body))
+        else:
+            document = apply_patch(document, json.loads(body), in_place=True)
+    return document
+
+
+def _convert_to_manifests(conn):
+    # One-off migration from whole-document storage: snapshot bodies and
+    # resume rows become manifests over deduplicated section blobs.
+    for user, name, version, body in conn.execute(
+        "SELECT user, name, version, body FROM resume_versions WHERE kind='snapshot'"
+    ).fetchall():
+        manifest, _ = _retain_document(conn, json.loads(body))
+        body = _dumps(manifest)
+        conn.execute(
+            "UPDATE resume_versions SET body=?, size=? "
+            "WHERE user=? AND name=? AND version=?",
+            (body, len(body), user, name, version),
+        )
+    for user, name, data, version, snapshot_version in conn.execute(
+        "SELECT user, name, data, version, snapshot_version FROM resumes"
+    ).fetchall():
+        if version:
+            rows = conn.execute(
+                "SELECT kind, body FROM resume_versions WHERE user=? AND name=? "
+                "AND version BETWEEN ? AND ? ORDER BY version",
+                (user, name, snapshot_version, version),
+            ).fetchall()
+            document = _materialize(conn, rows) or {}
+        else:
+            document = json.loads(data)
+        manifest, _ = _retain_document(conn, document)
+        conn.execute(
+            "UPDATE resumes SET data='', sections=? WHERE user=? AND name=?",
+            (_dumps(manifest), user, name),
+        )
+
+
+def _read_current(conn, user: str, name: str):
+    """Return ``(document, manifest, version, snapshot_version)``; document
+    and manifest are None if the resume does not exist."""
+    row = conn.execute(
+        "SELECT sections, version, snapshot_version FROM resumes "
+        "WHERE user=? AND name=?",
+        (user, name),
+    ).fetchone()
+    if row is None:
+        return None, None, 0, 0
+    manifest = json.loads(row[0])
+    return _load_manifest(conn, manifest), manifest, row[1], row[2]
+
+
+def _insert_version(conn, user, name, version, kind, body, now):
+    conn.execute(
+        "INSERT INTO resume_versions "
+        "(user, name, version, kind, body, size, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (user, name, version, kind, body, len(body), now),
+    )
+
+
+def _drop_history(conn, user: str, name: str, before: int = None):
+    """Delete version rows (older than ``before``) and release the blobs
+    their snapshots reference."""
+    where = "user=? AND name=?"
+    params = (user, name)
+    if before is not None:
+        where += " AND version<?"
+        params += (before,)
+    for (body,) in conn.execute(
+        f"SELECT body FROM resume_versions WHERE {where} AND kind='snapshot'", params
+    ).fetchall():
+        _release(conn, json.loads(body))
+    conn.execute(f"DELETE FROM resume_versions WHERE {where}", params)
+
+
+def _prune_history(conn, user: str, name: str, version: int):
+    # Keep whole snapshot-to-snapshot spans, so every kept version can be built.
+    cutoff = conn.execute(
+        "SELECT max(version) FROM resume_versions "
+        "WHERE user=? AND name=? AND kind='snapshot' AND version<=?",
+        (user, name, version - RESUME_HISTORY_LIMIT),
+    ).fetchone()[0]
+    if cutoff:
+        _drop_history(conn, user, name, cutoff)
+
+
+def _write_resume(conn, user: str, name: str, data: dict, now: float) -> bool:
+    """Store ``data`` as the new current version; returns False when it is
+    identical to the stored one and nothing was written."""
+    previous, old_manifest, version, snapshot_version = _read_current(conn, user, name)
+    ops = None
+    if previous is not None:
+        ops = make_patch(previous, data)
+        if not ops:
+            return False
+    manifest, size = _retain_document(conn, data)
+    sections = _dumps(manifest)
+
+    kind = None
+    if not RESUME_VERSIONING:
+        version = snapshot_version = 0
+    else:
+        if previous is not None and version == 0:
+            # First versioned save: history starts with the stored content.
+            version = snapshot_version = 1
+            _retain(conn, old_manifest)
+            _insert_version(conn, user, name, 1, "snapshot", _dumps(old_manifest), now)
+        version += 1
+        body = None if ops is None else _dumps(ops)
+        # A snapshot only costs a manifest, since the blobs are shared.
+        if (
+            body is None
+            or version - snapshot_version > RESUME_SNAPSHOT_EVERY
+            or len(body) >= len(sections)
+        ):
+            _retain(conn, manifest)
+            kind, body, snapshot_version = "snapshot", sections, version
+        else:
+            kind = "patch"
+        _insert_version(conn, user, name, version, kind, body, now)
+
+    conn.execute(
+        "INSERT INTO resumes (user, name, data, sections, size, updated_at, "
+        "version, snapshot_version) VALUES (?, ?, '', ?, ?, ?, ?, ?) "
+        "ON CONFLICT (user, name) DO UPDATE SET sections=excluded.sections, "
+        "size=excluded.size, updated_at=excluded.updated_at, "
+        "version=excluded.version, snapshot_version=excluded.snapshot_version",
+        (user, name, sections, size, now, version, snapshot_version),
+    )
+    _index_resume(conn, user, name, data)
+    if old_manifest is not None:
+        _release(conn, old_manifest)
+    if kind is None:
+        _drop_history(conn, user, name)
+    elif kind == "snapshot":
+        _prune_history(conn, user, name, version)
+    return True
+
+
+# Resume CRUD functions
+
+
+def save_resume(user: str, name: str, data) -> bool:
+    """Save ``data`` (a :class:`Resume`, or a dict that is validated first) as
+    the current version of resume ``name``.
+
+    Returns False (and writes nothing) if the content did not change.
+    """
+    document = as_resume(data).to_dict()
+    conn = get_db_connection(DB_PATH)
+    with conn:
+        # Read-modify-write: take the write lock before reading the head.
+        conn.execute("BEGIN IMMEDIATE")
+        written = _write_resume(conn, user, name, document, time.time())
+    if written:
+        _cache.invalidate(user)
+    return written
+
+
+def save_resumes(user: str, resumes: dict, insert_only: bool = False):
+    """Save several ``{name: data}`` resumes in a single transaction.
+
+    With ``insert_only``, nothing is written if any of the names already
+    exists. Returns the names that already existed.
+    """
+    documents = {name: as_resume(data).to_dict() for name, data in resumes.items()}
+    now = time.time()
+    conn = get_db_connection(DB_PATH)
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        existing = [
+            name
+            for name in documents
+            if conn.execute(
+                "SELECT 1 FROM resumes WHERE user=? AND name=?", (user, name)
+            ).fetchone()
+        ]
+        if insert_only and existing:
+            return existing
+        for name, document in documents.items():
+            _write_resume(conn, user, name, document, now)
+    _cache.invalidate(user)
+    return existing
+
+
+def list_resumes(user: str):
+    """List a user's resumes as ``{"name", "size", "updated_at"}`` dicts.
+
+    Only metadata is read, so this stays cheap however large the resumes are;
+    use :func:`get_resume` to decode a single document.
+    """
+    listing = _cache.get(user, _LISTING)
+    if listing is None:
+        version = _cache.version(user)
+        conn = get_db_connection(DB_PATH)
+        c = conn.cursor()
+        c.execute(
+            "SELECT name, size, updated_at FROM resumes WHERE user=? ORDER BY name",
+            (user,),
+        )
+        listing = [
+            {"name": r[0], "size": r[1], "updated_at": r[2]} for r in c.fetchall()
+        ]
+        _cache.put(user, _LISTING, version, listing)
+    return [dict(r) for r in listing]
+
+
+def get_resume(user: str, name: str):
+    """Return one resume as a :class:`Resume`, or None.
+
+    Served from the in-process cache when possible; callers get their own
+    objects and may mutate them freely.
+    """
+    document = _cache.get(user, name)
+    if document is None:
+        version = _cache.version(user)
+        conn = get_db_connection(DB_PATH)
+        with conn:
+            # One read transaction, so a concurrent save cannot delete the
+            # manifest's blobs between the two SELECTs.
+            conn.execute("BEGIN")
+            data, _, _, _ = _read_current(conn, user, name)
+        if data is None:
+            return None
+        # Validated once; the cache keeps the normalized document.
+        document = Resume.from_dict(data).to_dict()
+        _cache.put(user, name, version, document)
+    return Resume.from_dict(document, name)
 
 
 def load_resumes(user: str):
+    """Return all of a user's resumes as :class:`Resume` objects.
+
+    Resumes held by the in-process cache are not decoded again; the others
+    are decoded from one read transaction and cached like :func:`get_resume`.
+    """
+    version = _cache.version(user)
     conn = get_db_connection(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT name, data FROM resumes WHERE user=?", (user,))
-    rows = c.fetchall()
-    conn.close()
-    return [{"name": r[0], **json.loads(r[1])} for r in rows]
+    with conn:
+        # Manifests and blobs come from the same snapshot of the database.
+        conn.execute("BEGIN")
+        rows = conn.execute(
+            "SELECT name, sections FROM resumes WHERE user=? ORDER BY name", (user,)
+        ).fetchall()
+        documents = {name: _cache.get(user, name) for name, _ in rows}
+        blobs = {}
+        if None in documents.values():
+            # Every blob the user's resumes reference, each fetched once.
+            blobs = {
+                digest: (codec, data)
+                for digest, codec, data in conn.execute(
+                    "SELECT hash, codec, data FROM resume_blobs WHERE hash IN "
+                    "(SELECT j.value FROM resumes r, json_each(r.sections) j "
+                    "WHERE r.user=?)",
+                    (user,),
+                )
+            }
+    resumes = []
+    for name, sections in rows:
+        document = documents[name]
+        if document is None:
+            data = {
+                key: _decode(*blobs[digest])
+                for key, digest in json.loads(sections).items()
+            }
+            document = Resume.from_dict(data).to_dict()
+            _cache.put(user, name, version, document)
+        resumes.append(Resume.from_dict(document, name))
+    return resumes
 
 
-def update_resume(user: str, name: str, data: dict):
+def update_resume(user: str, name: str, data):
     save_resume(user, name, data)
 
 
 def duplicate_resume(user: str, old_name: str, new_name: str):
     conn = get_db_connection(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT data FROM resumes WHERE user=? AND name=?", (user, old_name))
-    row = c.fetchone()
-    if row:
-        c.execute(
-            "INSERT INTO resumes (user, name, data) VALUES (?, ?, ?)",
-            (user, new_name, row[0]),
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT sections, size, search_id FROM resumes WHERE user=? AND name=?",
+            (user, old_name),
+        ).fetchone()
+        if row is None:
+            return
+        sections, size, source_search_id = row
+        manifest = json.loads(sections)
+        now = time.time()
+        # Only the manifest is copied; the copy shares the section blobs.
+        version = 1 if RESUME_VERSIONING else 0
+        search_id = 0
+        if RESUME_SEARCH and source_search_id:
+            # The copy's index row is copied too, without decoding anything.
+            columns = ", ".join((*SEARCH_COLUMNS, "owner"))
+            search_id = conn.execute(
+                f"INSERT INTO resume_search (user, name, {columns}) "
+                f"SELECT user, ?, {columns} FROM resume_search WHERE rowid=?",
+                (new_name, source_search_id),
+            ).lastrowid
+        conn.execute(
+            "INSERT INTO resumes (user, name, data, sections, size, updated_at, "
+            "version, snapshot_version, search_id) "
+            "VALUES (?, ?, '', ?, ?, ?, ?, ?, ?)",
+            (user, new_name, sections, size, now, version, version, search_id),
         )
-        conn.commit()
-    conn.close()
+        _retain(conn, manifest)
+        if version:
+            # The copy starts its own history with a snapshot of the source.
+            _retain(conn, manifest)
+            _insert_version(conn, user, new_name, 1, "snapshot", sections, now)
+    _cache.invalidate(user)
 
 
 # Delete a resume
 def delete_resume(user: str, name: str):
     conn = get_db_connection(DB_PATH)
-    c = conn.cursor()
-    c.execute("DELETE FROM resumes WHERE user=? AND name=?", (user, name))
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT sections, search_id FROM resumes WHERE user=? AND name=?",
+            (user, name),
+        ).fetchone()
+        if row is not None:
+            conn.execute("DELETE FROM resumes WHERE user=? AND name=?", (user, name))
+            if RESUME_SEARCH and row[1]:
+                conn.execute("DELETE FROM resume_search WHERE rowid=?", (row[1],))
+            _release(conn, json.loads(row[0]))
+        _drop_history(conn, user, name)
+    _cache.invalidate(user)
+
+
+# Search
+
+
+def _match_query(user: str, text: str):
+    # Quote every word so punctuation (e.g. "C++", "node.js") is never read as
+    # FTS5 syntax; the last word also matches as a prefix while typing.
+    words = [word for word in (text or "").split() if re.search(r"\w", word)]
+    if not words:
+        return None
+    terms = " ".join('"' + word.replace('"', '""') + '"' for word in words) + "*"
+    columns = " ".join(SEARCH_COLUMNS)
+    # Only the user's own rows are matched and ranked.
+    return f'owner:"{_search_owner(user)}" AND {{{columns}}}: ({terms})'
+
+
+def search_resumes(user: str, query: str, limit: int = 20, markers=("[", "]")):
+    """Full-text search over a user's resumes, best matches first.
+
+    Every word of ``query`` must appear. Returns ``{"name", "snippet",
+    "score"}`` dicts; ``snippet`` is an excerpt of the best-matching section
+    with the matched words wrapped in ``markers``. Lower scores rank higher.
+    """
+    match = _match_query(user, query)
+    if not RESUME_SEARCH or match is None:
+        return []
+    conn = get_db_connection(DB_PATH)
+    # With ORDER BY rank, FTS5 returns rows already sorted, so snippets are
+    # only built for the rows kept. The MATCH expression is scoped to the
+    # user's owner token; user=? only guards against a token collision.
+    rows = conn.execute(
+        "SELECT name, snippet(resume_search, -1, ?, ?, '…', ?), rank "
+        "FROM resume_search WHERE resume_search MATCH ? AND rank MATCH ? "
+        "AND user=? ORDER BY rank LIMIT ?",
+        (*markers, SEARCH_SNIPPET_TOKENS, match, SEARCH_RANK, user, limit),
+    ).fetchall()
+    keys = ("name", "snippet", "score")
+    return [dict(zip(keys, row)) for row in rows]
+
+
+# Version history
+
+
+def list_versions(user: str, name: str):
+    """List the stored versions of a resume, newest first, as
+    ``{"version", "kind", "size", "created_at"}`` dicts."""
+    conn = get_db_connection(DB_PATH)
+    rows = conn.execute(
+        "SELECT version, kind, size, created_at FROM resume_versions "
+        "WHERE user=? AND name=? ORDER BY version DESC",
+        (user, name),
+    ).fetchall()
+    keys = ("version", "kind", "size", "created_at")
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def get_version(user: str, name: str, version: int):
+    """Return resume ``name`` as it was at ``version``, or None if that
+    version is not (or no longer) stored."""
+    conn = get_db_connection(DB_PATH)
+    with conn:
+        # Pruning may release the snapshot's blobs; read them in one snapshot.
+        conn.execute("BEGIN")
+        snapshot = conn.execute(
+            "SELECT max(version) FROM resume_versions "
+            "WHERE user=? AND name=? AND kind='snapshot' AND version<=?",
+            (user, name, version),
+        ).fetchone()[0]
+        if snapshot is None:
+            return None
+        rows = conn.execute(
+            "SELECT kind, body FROM resume_versions "
+            "WHERE user=? AND name=? AND version BETWEEN ? AND ? ORDER BY version",
+            (user, name, snapshot, version),
+        ).fetchall()
+        if len(rows) != version - snapshot + 1:
+            return None
+        document = _materialize(conn, rows)
+    return Resume.from_dict(document, name)
+
+
+def diff_versions(user: str, name: str, old_version: int, new_version=None):
+    """Return the JSON Patch from ``old_version`` to ``new_version`` (default:
+    the current resume), or None if either version is unavailable."""
+    old = get_version(user, name, old_version)
+    if new_version is None:
+        new = get_resume(user, name)
+    else:
+        new = get_version(user, name, new_version)
+    if old is None or new is None:
+        return None
+    return make_patch(old.to_dict(), new.to_dict())
+
+
+def restore_version(user: str, name: str, version: int) -> bool:
+    """Make ``version`` current again by saving it as a new version, so the
+    restore itself can be undone."""
+    resume = get_version(user, name, version)
+    if resume is None:
+        return False
+    save_resume(user, name, resume)
+    return True
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# Modules resolve their "db/..." paths when imported, so point the working
+# directory at a throw-away location before any of them is imported.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(tempfile.mkdtemp(prefix="resume-tests-"))
@@ -0,0 +1,29 @@
+import llm_cache
+from utils import get_db_connection
+
+
+def test_lookups_only_read_until_the_stats_are_flushed(monkeypatch):
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_FLUSH_SECONDS", 3600)
+    llm_cache.put_cached("read-only", "k1", {"a": 1})
+    conn = get_db_connection(llm_cache.DB_PATH)
+    changes = conn.total_changes
+    assert llm_cache.get_cached("read-only", "k1") == {"a": 1}
+    assert llm_cache.get_cached("read-only", "missing") is None
+    assert conn.total_changes == changes
+    assert llm_cache.cache_stats()["read-only"] == {"hits": 1, "misses": 1}
+
+    llm_cache.flush_stats()
+    assert conn.total_changes > changes
+    assert llm_cache.cache_stats()["read-only"] == {"hits": 1, "misses": 1}
+
+
+def test_eviction_sees_pending_last_used(monkeypatch):
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_FLUSH_SECONDS", 3600)
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_MAX_ENTRIES", 2)
+    llm_cache.clear_cache()
+    llm_cache.put_cached("lru", "old", {"n": 1})
+    llm_cache.put_cached("lru", "newer", {"n": 2})
+    assert llm_cache.get_cached("lru", "old") == {"n": 1}
+    llm_cache.put_cached("lru", "newest", {"n": 3})
+    assert llm_cache.get_cached("lru", "old") == {"n": 1}
+    assert llm_cache.get_cached("lru", "newer") is None
@@ -0,0 +1,58 @@
+import os
+import sys
+
+import groq
+import pytest
+
+import llm_client
+from llm_response import invoke_json
+
+sys.path.insert(0, os.path.join(os.path.dirname(llm_client.__file__), "benchmarks"))
+
+from fake_llm_server import FakeLLMConfig, start_in_thread  # noqa: E402
+
+PROMPT = 'Rewrite this resume:\n{"summary": "Engineer", "skills": "Python"}'
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    config = FakeLLMConfig()
+    server, base_url = start_in_thread(config)
+    monkeypatch.setattr(llm_client, "GROQ_API_BASE", base_url)
+    llm_client.reset_clients()
+    yield config
+    llm_client.reset_clients()
+    server.shutdown()
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_json_mode_requests_are_accepted(fake_server, stream):
+    llm = llm_client.get_llm("fake-key")
+    shown = []
+    on_section = (lambda key, value: shown.append(key)) if stream else None
+    result = invoke_json(llm, PROMPT, "test", on_section=on_section, json_mode=True)
+    assert result["summary"] == "Engineer (rewritten)"
+    assert fake_server.stats["errors"] == 0
+    assert fake_server.stats["streamed"] == (1 if stream else 0)
+    if stream:
+        assert "summary" in shown
+
+
+def test_fake_server_rejects_streaming_in_json_mode(fake_server):
+    llm = llm_client.get_llm(
+        "fake-key", model_kwargs={"response_format": {"type": "json_object"}}
+    )
+    with pytest.raises(groq.BadRequestError, match="does not support streaming"):
+        list(llm.stream(PROMPT))
+    assert fake_server.stats["errors"] == 1
+
+
+def test_clients_are_reused(fake_server):
+    before = llm_client.client_stats()
+    first = llm_client.get_llm("fake-key", temperature=0.5)
+    second = llm_client.get_llm("fake-key", temperature=0.5)
+    stats = llm_client.client_stats()
+    assert first is second
+    assert stats["created"] - before["created"] == 1
+    assert stats["reused"] - before["reused"] == 1
+    assert "(rewritten)" in first.invoke(PROMPT).content
@@ -0,0 +1,143 @@
+import time
+
+import pytest
+
+from llm_response import (
+    INVALID_JSON_ERROR,
+    NO_JSON_ERROR,
+    invoke_json,
+    parse_json_response,
+    repair_json,
+    scan_json_objects,
+)
+from llm_streaming import IncrementalJSONObjectParser
+from resume_model import resume_from_reply
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('{"a": 1}', {"a": 1}),
+        ('Here you go:\n```json\n{"a": {"b": "}"}}\n```', {"a": {"b": "}"}}),
+        ('Not this {one}, but {"a": 1}', {"a": 1}),
+        ('Opening brace { then:\n{"a": 1}', {"a": 1}),
+        ('Opening brace { then:\n{"a": [1, 2,],}', {"a": [1, 2]}),
+        ('{"a": 1, "b": [2, 3', {"a": 1, "b": [2, 3]}),
+        ('Brace { first, then a cut-off {"a": "x', {"a": "x"}),
+    ],
+)
+def test_parse_json_response(text, expected):
+    assert parse_json_response(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, error",
+    [("no json here", NO_JSON_ERROR), ("{not json}", INVALID_JSON_ERROR)],
+)
+def test_parse_json_response_errors(text, error):
+    with pytest.raises(ValueError, match=error[:20]):
+        parse_json_response(text)
+
+
+def test_parse_json_response_never_returns_a_nested_object():
+    text = (
+        '{"summary": "Engineer", "experience": [{"company": "A", "present": false}, '
+        '{"company": "B", "present": tru'
+    )
+    with pytest.raises(ValueError, match=INVALID_JSON_ERROR[:20]):
+        parse_json_response(text)
+
+
+def test_parse_json_response_scans_unclosed_objects_once():
+    start = time.perf_counter()
+    with pytest.raises(ValueError):
+        parse_json_response('{"a": [x ' * 8000)
+    assert time.perf_counter() - start < 1.0
+
+
+def test_scan_json_objects_marks_truncated_tail():
+    text = '{"a": "{"} and {"b": 1'
+    assert list(scan_json_objects(text)) == [(0, 10), (15, None)]
+
+
+@pytest.mark.parametrize(
+    "fragment, expected",
+    [
+        ('{"a": [1, 2,],}', '{"a": [1, 2]}'),
+        ('{"a": "tex', '{"a": "tex"}'),
+        ('{"a": 1, "b', '{"a": 1}'),
+        ('{"a": 1, "b":', '{"a": 1}'),
+        ('{"a": {"b": [1', '{"a": {"b": [1]}}'),
+    ],
+)
+def test_repair_json(fragment, expected):
+    assert repair_json(fragment) == expected
+
+
+def test_incremental_parser_skips_prose_braces():
+    parser = IncrementalJSONObjectParser()
+    members = []
+    for chunk in ("Sure {the} answer: {", '"a": 1, "b"', ": [2]} trailing"):
+        members += parser.feed(chunk)
+    assert members == [("a", 1), ("b", [2])]
+    assert parser.result == {"a": 1, "b": [2]}
+
+
+def test_incremental_parser_reports_failed_members():
+    parser = IncrementalJSONObjectParser()
+    parser.feed('{"a": 1, "b": [2,], "c": 3}')
+    assert parser.members == {"a": 1, "c": 3}
+    assert parser.failed and parser.result is None
+
+
+@pytest.mark.parametrize("text", ['{"a": 1,}', '{"a": 1,, "b": 2}'])
+def test_incremental_parser_rejects_empty_members(text):
+    parser = IncrementalJSONObjectParser()
+    parser.feed(text)
+    assert parser.complete and parser.result is None
+
+
+def test_incremental_parser_handles_single_character_chunks():
+    parser = IncrementalJSONObjectParser()
+    text = 'x {} { "a": "}{,", "b": {"c": [1, 2]}} tail'
+    members = [m for ch in text for m in parser.feed(ch)]
+    assert members == [("a", "}{,"), ("b", {"c": [1, 2]})]
+    assert parser.result == {"a": "}{,", "b": {"c": [1, 2]}}
+
+
+class _ScriptedLLM:
+    def __init__(self, *replies):
+        self.replies = list(replies)
+
+    def invoke(self, prompt, **kwargs):
+        return self.replies.pop(0)
+
+    def stream(self, prompt):
+        yield from self.replies.pop(0)
+
+
+def test_invoke_json_retries_unparseable_replies():
+    llm = _ScriptedLLM("no json", '{"a": 1}')
+    assert invoke_json(llm, "prompt", "test", retries=1) == {"a": 1}
+
+
+def test_invoke_json_repairs_a_degraded_stream():
+    shown = []
+    llm = _ScriptedLLM(['{"a": 1, ', '"b": [2,]}'])
+    result = invoke_json(
+        llm, "prompt", "test", on_section=lambda k, v: shown.append(k), retries=0
+    )
+    assert result == {"a": 1, "b": [2]}
+    assert shown == ["a"]
+
+
+@pytest.mark.parametrize("reply", ['{"resume": {"summary": "x"}}', '{"a": 1}'])
+def test_invoke_json_retries_replies_without_resume_sections(reply):
+    llm = _ScriptedLLM(reply, '{"summary": "Engineer"}')
+    resume = invoke_json(llm, "prompt", "test", parse=resume_from_reply, retries=1)
+    assert resume.summary == "Engineer"
+
+
+def test_resume_from_reply_requires_an_expected_section():
+    with pytest.raises(ValueError):
+        resume_from_reply({"skills": "Python"}, expected=["experience"])
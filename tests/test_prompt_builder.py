@@ -0,0 +1,51 @@
+from prompt_builder import fit_job_description, restore_ui_fields
+from resume_model import Resume
+
+
+def _jobs(*jobs):
+    return Resume.from_dict(
+        {
+            "experience": [
+                {"company": company, "start": start, "present": present}
+                for company, start, present in jobs
+            ]
+        }
+    )
+
+
+def _present(resume):
+    return [(e.company, e.present) for e in resume.experience]
+
+
+def test_restore_ui_fields_follows_reordered_entries():
+    original = _jobs(("Acme", "2021", True), ("Globex", "2018", False))
+    rewritten = _jobs(("Globex", "2018", False), ("ACME ", "2021", False))
+    restored = restore_ui_fields(original, rewritten)
+    assert _present(restored) == [("Globex", False), ("ACME ", True)]
+
+
+def test_restore_ui_fields_skips_dropped_and_unknown_entries():
+    original = _jobs(("Acme", "2021", True), ("Globex", "2018", True))
+    rewritten = _jobs(("Globex Corp", "2018", False))
+    assert _present(restore_ui_fields(original, rewritten)) == [("Globex Corp", False)]
+
+
+def test_restore_ui_fields_falls_back_to_position_when_lengths_match():
+    original = _jobs(("Acme", "2021", True), ("Globex", "2018", False))
+    rewritten = _jobs(("Acme Inc.", "2021", False), ("Globex", "2018", True))
+    restored = restore_ui_fields(original, rewritten)
+    assert _present(restored) == [("Acme Inc.", True), ("Globex", False)]
+
+
+def test_fit_job_description_keeps_text_that_fits():
+    job_desc = "Backend Engineer\n\n  - Python  \n  - Python  \n"
+    assert fit_job_description(job_desc, 100) == job_desc
+    assert fit_job_description(job_desc * 20, 20) == "Backend Engineer\n- Python"
+
+
+def test_fit_job_description_cuts_a_single_paragraph():
+    job_desc = "We need a backend engineer with Python and Kafka experience. " * 70
+    fitted = fit_job_description(job_desc, 400)
+    assert fitted and len(fitted) <= 1600
+    assert fitted.endswith("Kafka experience.")
+    assert job_desc.startswith(fitted)
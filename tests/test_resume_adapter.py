@@ -0,0 +1,27 @@
+import io
+
+import pytest
+
+from resume_adapter import read_job_descriptions_file
+
+
+def _upload(name: str, text: str):
+    upload = io.BytesIO(text.encode("utf-8"))
+    upload.name = name
+    return upload
+
+
+def test_reads_a_json_list():
+    upload = _upload("jobs.json", '["First", {"description": " Second "}, 3, ""]')
+    assert read_job_descriptions_file(upload) == ["First", "Second"]
+
+
+@pytest.mark.parametrize("text", ["42", '{"description": "x"}', "not json"])
+def test_rejects_json_that_is_not_a_list(text):
+    with pytest.raises(ValueError, match="uploaded"):
+        read_job_descriptions_file(_upload("jobs.json", text))
+
+
+def test_splits_text_files():
+    upload = _upload("jobs.txt", "First\n---\nSecond\n")
+    assert read_job_descriptions_file(upload) == ["First", "Second"]
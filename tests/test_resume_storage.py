@@ -0,0 +1,125 @@
+import threading
+import time
+
+import resume_storage
+
+
+def _resume(i: int) -> dict:
+    return {
+        "summary": f"Summary {i}",
+        "skills": f"Python {i}",
+        "experience": [{"company": f"Company {i}", "title": "Engineer"}],
+    }
+
+
+def test_reads_survive_concurrent_saves(monkeypatch):
+    # Without history every save releases the previous sections' blobs, so a
+    # reader that fetched the manifest outside a transaction can miss them.
+    monkeypatch.setattr(resume_storage, "RESUME_VERSIONING", False)
+    user = "concurrent-reader"
+    resume_storage.save_resume(user, "cv", _resume(0))
+    stop = threading.Event()
+    errors = []
+
+    def write():
+        i = 0
+        while not stop.is_set():
+            i += 1
+            resume_storage.save_resume(user, "cv", _resume(i % 50))
+
+    def read():
+        while not stop.is_set():
+            try:
+                resume_storage.clear_resume_cache()
+                assert resume_storage.get_resume(user, "cv") is not None
+                assert len(resume_storage.load_resumes(user)) == 1
+            except Exception as exc:  # noqa: BLE001 - collected for the assert
+                errors.append(exc)
+
+    threads = [threading.Thread(target=write)] + [
+        threading.Thread(target=read) for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(2.0)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_get_version_survives_pruning(monkeypatch):
+    monkeypatch.setattr(resume_storage, "RESUME_SNAPSHOT_EVERY", 2)
+    monkeypatch.setattr(resume_storage, "RESUME_HISTORY_LIMIT", 4)
+    user = "concurrent-history"
+    resume_storage.save_resume(user, "cv", _resume(0))
+    stop = threading.Event()
+    errors = []
+
+    def write():
+        i = 0
+        while not stop.is_set():
+            i += 1
+            resume_storage.save_resume(user, "cv", _resume(i))
+
+    def read():
+        while not stop.is_set():
+            try:
+                versions = resume_storage.list_versions(user, "cv")
+                if versions:
+                    # None is fine (pruned meanwhile); an exception is not.
+                    resume_storage.get_version(user, "cv", versions[-1]["version"])
+            except Exception as exc:  # noqa: BLE001 - collected for the assert
+                errors.append(exc)
+
+    threads = [threading.Thread(target=write)] + [
+        threading.Thread(target=read) for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(2.0)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_insert_only_batch_never_overwrites():
+    user = "batch-saver"
+    resume_storage.save_resume(user, "cv_2", _resume(0))
+    conflicts = resume_storage.save_resumes(
+        user, {"cv_1": _resume(1), "cv_2": _resume(2)}, insert_only=True
+    )
+    assert conflicts == ["cv_2"]
+    assert resume_storage.get_resume(user, "cv_1") is None
+    assert resume_storage.get_resume(user, "cv_2").summary == "Summary 0"
+
+
+def test_load_resumes_reflects_saves():
+    user = "bulk-loader"
+    resume_storage.save_resume(user, "cv", _resume(0))
+    assert [r.summary for r in resume_storage.load_resumes(user)] == ["Summary 0"]
+    resume_storage.save_resume(user, "cv", _resume(1))
+    assert [r.summary for r in resume_storage.load_resumes(user)] == ["Summary 1"]
+
+
+def test_search_is_scoped_to_the_user():
+    resume_storage.save_resume("searcher", "mine", {"skills": "Kafka, Rust"})
+    resume_storage.save_resume("searcher other", "theirs", {"skills": "Kafka"})
+    resume_storage.duplicate_resume("searcher", "mine", "copy")
+    results = resume_storage.search_resumes("searcher", "kafka")
+    assert sorted(r["name"] for r in results) == ["copy", "mine"]
+    assert all("[Kafka]" in r["snippet"] for r in results)
+    assert resume_storage.search_resumes("searcher other", "rust") == []
+
+
+def test_cache_rejects_reads_sampled_before_an_eviction():
+    cache = resume_storage._ResumeCache(2)
+    version = cache.version("alice")
+    for user in ("alice", "bob", "carol"):
+        cache.invalidate(user)
+    cache.put("alice", "cv", version, "STALE")
+    assert cache.get("alice", "cv") is None
+    # A read sampled after the eviction is cached as usual.
+    cache.put("alice", "cv", cache.version("alice"), "fresh")
+    assert cache.get("alice", "cv") == "fresh"
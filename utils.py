@@ -2,13 +2,172 @@
 import sqlite3
 import re
 import os
+import threading
+import weakref
+from instrumentation import METRICS_ENABLED, InstrumentedConnection
 
+# SQLite connection pool settings
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MAX_IDLE_CONNECTIONS = int(os.getenv("SQLITE_MAX_IDLE_CONNECTIONS", "8"))
 
-def get_db_connection(path: str):
-    conn = sqlite3.connect(path)
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA mmap_size=67108864",
+    "PRAGMA foreign_keys=ON",
+)
+
+_schemas = {}
+_bootstrapped = set()
+# Per-path locks held while a database's schema scripts run.
+_bootstrap_locks = {}
+_idle = {}
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+def _normalize_path(path: str) -> str:
+    return path if path == ":memory:" else os.path.abspath(path)
+
+
+def register_schema(path: str, script):
+    """Register DDL to run once per process before the first use of ``path``.
+
+    ``script`` is either an SQL script or a callable taking the connection,
+    for migrations that need to inspect the existing schema. Both must be
+    idempotent (``CREATE ... IF NOT EXISTS``).
+    """
+    with _pool_lock:
+        _schemas.setdefault(_normalize_path(path), []).append(script)
+        _bootstrapped.discard(_normalize_path(path))
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Leases hand a connection to exactly one thread at a time, so it is safe
+    # to move it between Streamlit's per-rerun script threads.
+    conn = sqlite3.connect(
+        path,
+        timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,
+        factory=InstrumentedConnection if METRICS_ENABLED else sqlite3.Connection,
+    )
+    if METRICS_ENABLED:
+        conn.metrics_label = os.path.basename(path)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
 
+def _bootstrap(path: str, conn: sqlite3.Connection):
+    # Other threads wait here until the schema is committed, and only then
+    # see the path as bootstrapped; if a script fails, the next call retries.
+    with _pool_lock:
+        lock = _bootstrap_locks.setdefault(path, threading.Lock())
+    with lock:
+        with _pool_lock:
+            if path in _bootstrapped:
+                return
+            scripts = list(_schemas.get(path, ()))
+        try:
+            for script in scripts:
+                if callable(script):
+                    script(conn)
+                else:
+                    conn.executescript(script)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        with _pool_lock:
+            _bootstrapped.add(path)
+
+
+def _release(path: str, conn: sqlite3.Connection):
+    """Return a connection to the idle pool when its owning thread exits."""
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.Error:
+        return
+    with _pool_lock:
+        idle = _idle.setdefault(path, [])
+        if len(idle) < SQLITE_MAX_IDLE_CONNECTIONS:
+            idle.append(conn)
+            return
+    conn.close()
+
+
+class _Lease:
+    """Thread-local handle on a pooled connection."""
+
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn):
+        self.conn = conn
+
+
+def get_db_connection(path: str):
+    """Return this thread's pooled connection for ``path``.
+
+    Connections are reused across calls and returned to a process-wide pool
+    when the thread finishes, so callers must not close them. Use the
+    connection as a context manager to commit or roll back a transaction.
+    """
+    path = _normalize_path(path)
+    leases = getattr(_local, "leases", None)
+    if leases is None:
+        leases = _local.leases = {}
+    lease = leases.get(path)
+    if lease is None:
+        with _pool_lock:
+            idle = _idle.get(path)
+            conn = idle.pop() if idle else None
+        if conn is None:
+            conn = _connect(path)
+        lease = leases[path] = _Lease(conn)
+        weakref.finalize(lease, _release, path, conn)
+    if path not in _bootstrapped:
+        _bootstrap(path, lease.conn)
+    return lease.conn
+
+
+def add_missing_columns(conn: sqlite3.Connection, table: str, columns: dict):
+    """Add ``{name: declaration}`` columns that an older ``table`` lacks.
+
+    Returns the names of the columns that were added.
+    """
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    added = []
+    for name, decl in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+            added.append(name)
+    return added
+
+
+def init_db(*paths: str):
+    """Bootstrap registered schemas; defaults to every registered database."""
+    for path in paths or list(_schemas):
+        get_db_connection(path)
+
+
+def close_db_connections():
+    """Close every idle pooled connection (e.g. before deleting DB files)."""
+    # Dropping this thread's leases returns its connections to the idle pool.
+    _local.leases = {}
+    with _pool_lock:
+        conns = [c for idle in _idle.values() for c in idle]
+        _idle.clear()
+        _bootstrapped.clear()
+    for conn in conns:
+        conn.close()
+
+
 def validate_resume_name(name: str) -> bool:
     # Only allow alphanumeric and underscores, min 3 chars
     return bool(re.match(r"^[\w]{3,}$", name))